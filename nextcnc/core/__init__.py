@@ -1,4 +1,4 @@
-from nextcnc.core.parser import parse_file, parse_string
+from nextcnc.core.parser import Segments, parse_file, parse_string
 from nextcnc.core.kinematics import segments_to_points, segment_to_points
 
-__all__ = ["parse_file", "parse_string", "segments_to_points", "segment_to_points"]
+__all__ = ["Segments", "parse_file", "parse_string", "segments_to_points", "segment_to_points"]
@@ -5,8 +5,11 @@ AST (Abstract Syntax Tree) nodes for G-code parsing.
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from typing import Any, Optional
+from dataclasses import dataclass, field, fields
+from enum import IntEnum
+from math import atan2, pi, sqrt
+from operator import attrgetter
+from typing import Any, ClassVar, Optional
 
 import numpy as np
 
@@ -14,6 +17,8 @@ import numpy as np
 class ASTNode(ABC):
     """Base class for all AST nodes."""
     
+    __slots__ = ()
+    
     @abstractmethod
     def accept(self, visitor: ASTVisitor) -> Any:
         """Accept a visitor."""
@@ -29,7 +34,7 @@ class ASTVisitor(ABC):
 # Program Structure
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class ProgramNode(ASTNode):
     """Root node for a G-code program."""
     program_number: Optional[int] = None
@@ -39,7 +44,7 @@ class ProgramNode(ASTNode):
         return visitor.visit_program(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class BlockNode(ASTNode):
     """A single block (line) of G-code."""
     block_number: Optional[int] = None
@@ -55,9 +60,21 @@ class BlockNode(ASTNode):
 # Words (Commands)
 # ============================================================================
 
-@dataclass
+# WordNode.KIND values, so interpreters can dispatch on a plain int
+# instead of an isinstance() chain
+KIND_WORD = 0
+KIND_G_CODE = 1
+KIND_M_CODE = 2
+KIND_COORDINATE = 3
+KIND_FEED = 4
+KIND_SPINDLE = 5
+KIND_TOOL = 6
+
+
+@dataclass(frozen=True, slots=True)
 class WordNode(ASTNode):
-    """Base class for G-code words."""
+    """Base class for G-code words (immutable, so G/M words can be shared)."""
+    KIND: ClassVar[int] = KIND_WORD
     letter: str
     value: float
     
@@ -65,73 +82,107 @@ class WordNode(ASTNode):
         return visitor.visit_word(self)
 
 
-@dataclass 
+@dataclass(frozen=True, slots=True)
 class GCodeNode(WordNode):
     """G-code word (motion, modal, etc.)."""
+    KIND: ClassVar[int] = KIND_G_CODE
+    
     def __init__(self, value: float):
-        super().__init__("G", value)
+        WordNode.__init__(self, "G", value)
     
     def accept(self, visitor: ASTVisitor) -> Any:
         return visitor.visit_g_code(self)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MCodeNode(WordNode):
     """M-code word (miscellaneous functions)."""
+    KIND: ClassVar[int] = KIND_M_CODE
+    
     def __init__(self, value: float):
-        super().__init__("M", value)
+        WordNode.__init__(self, "M", value)
     
     def accept(self, visitor: ASTVisitor) -> Any:
         return visitor.visit_m_code(self)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CoordinateNode(WordNode):
     """Coordinate words (X, Y, Z, etc.)."""
-    pass
+    KIND: ClassVar[int] = KIND_COORDINATE
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FeedNode(WordNode):
     """Feed rate (F)."""
+    KIND: ClassVar[int] = KIND_FEED
+    
     def __init__(self, value: float):
-        super().__init__("F", value)
+        WordNode.__init__(self, "F", value)
     
     def accept(self, visitor: ASTVisitor) -> Any:
         return visitor.visit_feed(self)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SpindleNode(WordNode):
     """Spindle speed (S)."""
+    KIND: ClassVar[int] = KIND_SPINDLE
+    
     def __init__(self, value: float):
-        super().__init__("S", value)
+        WordNode.__init__(self, "S", value)
     
     def accept(self, visitor: ASTVisitor) -> Any:
         return visitor.visit_spindle(self)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ToolNode(WordNode):
     """Tool selection (T)."""
+    KIND: ClassVar[int] = KIND_TOOL
+    
     def __init__(self, value: float):
-        super().__init__("T", value)
+        WordNode.__init__(self, "T", value)
     
     def accept(self, visitor: ASTVisitor) -> Any:
         return visitor.visit_tool(self)
 
 
+# Flyweight pools for the small closed set of G/M words, keyed by value * 10
+# so that subcodes like G28.1 get their own entry
+_GCODE_POOL: dict[int, GCodeNode] = {}
+_MCODE_POOL: dict[int, MCodeNode] = {}
+
+
+def g_code_node(value: float) -> GCodeNode:
+    """Shared GCodeNode for value."""
+    key = int(round(value * 10))
+    node = _GCODE_POOL.get(key)
+    if node is None:
+        node = _GCODE_POOL[key] = GCodeNode(value)
+    return node
+
+
+def m_code_node(value: float) -> MCodeNode:
+    """Shared MCodeNode for value."""
+    key = int(round(value * 10))
+    node = _MCODE_POOL.get(key)
+    if node is None:
+        node = _MCODE_POOL[key] = MCodeNode(value)
+    return node
+
+
 # ============================================================================
 # Motion Commands
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class MotionCommand(ASTNode):
     """Base class for motion commands."""
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class RapidMoveNode(MotionCommand):
     """G00 - Rapid positioning."""
     x: Optional[float] = None
@@ -142,7 +193,7 @@ class RapidMoveNode(MotionCommand):
         return visitor.visit_rapid_move(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class LinearMoveNode(MotionCommand):
     """G01 - Linear interpolation."""
     x: Optional[float] = None
@@ -154,7 +205,7 @@ class LinearMoveNode(MotionCommand):
         return visitor.visit_linear_move(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class ArcMoveNode(MotionCommand):
     """G02/G03 - Circular interpolation."""
     clockwise: bool  # True = G02, False = G03
@@ -175,9 +226,13 @@ class ArcMoveNode(MotionCommand):
 # Modal State Container
 # ============================================================================
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ModalStateNode:
-    """Complete modal state snapshot."""
+    """
+    Complete modal state snapshot.
+    Immutable: segments share one instance until a block changes the state,
+    a new snapshot is then built with dataclasses.replace().
+    """
     # Motion
     motion_mode: int = 1  # G00-G03
     
@@ -209,7 +264,9 @@ class ModalStateNode:
     canned_cycle: int = 80  # G73-G89, G80
     
     # Current position
-    position: np.ndarray = field(default_factory=lambda: np.zeros(3))
+    pos_x: float = 0.0
+    pos_y: float = 0.0
+    pos_z: float = 0.0
     
     # Current feed
     feed_rate: float = 0.0
@@ -221,36 +278,72 @@ class ModalStateNode:
     spindle_rpm: float = 0.0
     spindle_on: bool = False
     
+    @property
+    def position(self) -> tuple[float, float, float]:
+        """Current position as an (x, y, z) tuple."""
+        return (self.pos_x, self.pos_y, self.pos_z)
+    
     def clone(self) -> ModalStateNode:
-        """Create a copy of this state."""
-        return ModalStateNode(
-            motion_mode=self.motion_mode,
-            plane=self.plane,
-            absolute=self.absolute,
-            metric=self.metric,
-            wcs=self.wcs,
-            feed_per_minute=self.feed_per_minute,
-            cutter_comp=self.cutter_comp,
-            tool_length_comp=self.tool_length_comp,
-            canned_return=self.canned_return,
-            canned_cycle=self.canned_cycle,
-            position=self.position.copy(),
-            feed_rate=self.feed_rate,
-            tool_id=self.tool_id,
-            spindle_rpm=self.spindle_rpm,
-            spindle_on=self.spindle_on,
-        )
+        """Return this state; snapshots are immutable and safe to share."""
+        return self
 
 
 # ============================================================================
 # Toolpath Segments (Output of interpretation)
 # ============================================================================
 
-@dataclass
+# Plane (17/18/19) -> (u, v, w) axis indices: arc angles are measured in the
+# (u, v) plane, w is the linear (helical) axis.
+PLANE_AXES = {
+    17: (0, 1, 2),  # XY
+    18: (0, 2, 1),  # XZ
+    19: (1, 2, 0),  # YZ
+}
+
+
+def arc_geometry(
+    start: np.ndarray,
+    end: np.ndarray,
+    center: np.ndarray,
+    clockwise: bool,
+    axes: tuple[int, int, int],
+) -> tuple[float, float, float]:
+    """
+    Plane-projected arc invariants: (start_angle, sweep_angle, radius).
+    sweep_angle is negative for CW and positive for CCW arcs; start == end
+    is a full circle.
+    """
+    u, v, _ = axes
+    # Scalar math via the math module: no ufunc dispatch per call
+    cu, cv = float(center[u]), float(center[v])
+    su, sv = float(start[u]) - cu, float(start[v]) - cv
+    start_angle = atan2(sv, su)
+    end_angle = atan2(float(end[v]) - cv, float(end[u]) - cu)
+    radius = sqrt(su * su + sv * sv)
+    # Branchless wrap: CW sweeps must be negative, CCW sweeps positive
+    sign = -1.0 if clockwise else 1.0
+    sweep = end_angle - start_angle
+    sweep += sign * 2 * pi * (sign * sweep <= 0.0)
+    return start_angle, sweep, radius
+
+
+class MotionType(IntEnum):
+    """Segment motion type; name.lower() gives the parser dict spelling ('arc_cw', ...)."""
+    RAPID = 0
+    LINEAR = 1
+    ARC_CW = 2
+    ARC_CCW = 3
+
+
+# Segment dict "type" strings -> MotionType
+MOTION_TYPES = {m.name.lower(): m for m in MotionType}
+
+
+@dataclass(slots=True)
 class ToolpathSegment:
     """A single motion segment in the toolpath."""
     block_number: Optional[int]
-    motion_type: str  # 'rapid', 'linear', 'arc_cw', 'arc_ccw'
+    motion_type: MotionType
     start_pos: np.ndarray
     end_pos: np.ndarray
     feed_rate: float
@@ -262,70 +355,311 @@ class ToolpathSegment:
     arc_radius: Optional[float] = None
     plane: str = "G17"
     
-    # Modal snapshot
-    modal: ModalStateNode = field(default_factory=ModalStateNode)
+    # Arc angles in the plane, precomputed once the center is known
+    start_angle: Optional[float] = None
+    sweep_angle: Optional[float] = None
+    
+    # Modal state: entry in the owning table's ModalLog, resolved on access
+    modal_index: int = -1
+    table: Optional[ToolpathTable] = field(default=None, repr=False, compare=False)
+    
+    @property
+    def modal(self) -> ModalStateNode:
+        """Modal state active for this segment (built lazily from the modal log)."""
+        if self.table is None:
+            return ModalStateNode()
+        return self.table.get_modal(self.modal_index)
 
 
-def create_segment_from_move(
-    move: MotionCommand,
+def _apply_move(
     start_pos: np.ndarray,
-    modal: ModalStateNode,
-    block_num: Optional[int] = None,
-) -> ToolpathSegment:
-    """Create a ToolpathSegment from a motion command."""
-    if isinstance(move, RapidMoveNode):
-        end_pos = start_pos.copy()
-        if move.x is not None:
-            end_pos[0] = move.x if modal.absolute else start_pos[0] + move.x
-        if move.y is not None:
-            end_pos[1] = move.y if modal.absolute else start_pos[1] + move.y
-        if move.z is not None:
-            end_pos[2] = move.z if modal.absolute else start_pos[2] + move.z
-        
+    x: Optional[float],
+    y: Optional[float],
+    z: Optional[float],
+    absolute: bool,
+) -> np.ndarray:
+    """
+    End position of a move: axes that are not programmed keep start_pos,
+    programmed axes are taken as absolute (G90) or incremental (G91).
+    Single masked vector op instead of three conditional scalar stores.
+    """
+    vals = np.array((x, y, z), dtype=np.float64)  # None -> NaN
+    if not absolute:
+        vals += start_pos
+    return np.where(np.isnan(vals), start_pos, vals)
+
+
+class ModalLog:
+    """
+    Modal state stream stored as change events instead of one snapshot per segment.
+    
+    Entry k holds every ModalStateNode field except the position and applies
+    from segment indices[k] until the next entry; lookups binary-search
+    indices. Position is not logged, it is supplied by the caller (segment start).
+    """
+    
+    FIELDS = tuple(f.name for f in fields(ModalStateNode) if not f.name.startswith("pos_"))
+    _key = staticmethod(attrgetter(*FIELDS))
+    
+    def __init__(self, capacity: int = 16):
+        capacity = max(int(capacity), 1)
+        self._size = 0
+        self._last: Optional[tuple] = None
+        self._indices = np.empty(capacity, dtype=np.int32)
+        self._columns = {}
+        for f in fields(ModalStateNode):
+            if f.name in self.FIELDS:
+                kind = type(f.default)
+                dtype = np.bool_ if kind is bool else np.int32 if kind is int else np.float64
+                self._columns[f.name] = np.empty(capacity, dtype=dtype)
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    @property
+    def indices(self) -> np.ndarray:
+        return self._indices[:self._size]
+    
+    def record(self, index: int, modal: ModalStateNode) -> None:
+        """Log modal as active from segment index on, if it differs from the last entry."""
+        key = self._key(modal)
+        if key == self._last:
+            return
+        k = self._size
+        if k == len(self._indices):
+            capacity = 2 * k
+            self._indices = np.resize(self._indices, capacity)
+            for name in self._columns:
+                self._columns[name] = np.resize(self._columns[name], capacity)
+        self._indices[k] = index
+        for name, value in zip(self.FIELDS, key):
+            self._columns[name][k] = value
+        self._last = key
+        self._size = k + 1
+    
+    def get(self, index: int, position: tuple[float, float, float] = (0.0, 0.0, 0.0)) -> ModalStateNode:
+        """Reconstruct the modal state active at segment index."""
+        k = int(np.searchsorted(self._indices[:self._size], index, side="right")) - 1
+        if k < 0:
+            return ModalStateNode(pos_x=position[0], pos_y=position[1], pos_z=position[2])
+        values = {name: self._columns[name][k].item() for name in self.FIELDS}
+        return ModalStateNode(**values, pos_x=position[0], pos_y=position[1], pos_z=position[2])
+
+
+class ToolpathTable:
+    """
+    Struct-of-arrays toolpath: one contiguous numpy column per segment field.
+    
+    Rows are appended by the interpreter; indexing or iterating yields
+    ToolpathSegment views for code that still expects segment objects.
+    Arc center/radius/angles are NaN when unset, block_number is -1 when unset.
+    """
+    
+    _COLUMNS = ("start", "end", "center", "radius", "start_angle", "sweep_angle",
+                "motion_type", "plane", "feed_rate", "tool_id", "wcs", "block_number")
+    
+    def __init__(self, capacity: int = 1024):
+        capacity = max(int(capacity), 1)
+        self._size = 0
+        self._start = np.empty((capacity, 3), dtype=np.float64)
+        self._end = np.empty((capacity, 3), dtype=np.float64)
+        self._center = np.empty((capacity, 3), dtype=np.float64)
+        self._radius = np.empty(capacity, dtype=np.float64)
+        self._start_angle = np.empty(capacity, dtype=np.float64)
+        self._sweep_angle = np.empty(capacity, dtype=np.float64)
+        self._motion_type = np.empty(capacity, dtype=np.uint8)
+        self._plane = np.empty(capacity, dtype=np.uint8)
+        self._feed_rate = np.empty(capacity, dtype=np.float64)
+        self._tool_id = np.empty(capacity, dtype=np.int32)
+        self._wcs = np.empty(capacity, dtype=np.uint8)
+        self._block_number = np.empty(capacity, dtype=np.int32)
+        self.modal_log = ModalLog()
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __getitem__(self, index: int | slice) -> ToolpathSegment | list[ToolpathSegment]:
+        if isinstance(index, slice):
+            # As the list interpret_to_segments used to return
+            return [self[i] for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("toolpath index out of range")
+        motion = int(self._motion_type[index])
+        is_arc = motion >= MotionType.ARC_CW
+        center = self._center[index]
+        radius = float(self._radius[index])
+        start_angle = float(self._start_angle[index])
+        sweep_angle = float(self._sweep_angle[index])
+        block = int(self._block_number[index])
         return ToolpathSegment(
-            block_number=block_num,
-            motion_type="rapid",
-            start_pos=start_pos.copy(),
-            end_pos=end_pos,
-            feed_rate=0.0,
-            tool_id=modal.tool_id,
-            wcs=modal.wcs,
-            modal=modal.clone(),
+            block_number=None if block < 0 else block,
+            motion_type=MotionType(motion),
+            start_pos=self._start[index],
+            end_pos=self._end[index],
+            feed_rate=float(self._feed_rate[index]),
+            tool_id=int(self._tool_id[index]),
+            wcs=int(self._wcs[index]),
+            arc_center=center if is_arc and not np.isnan(center[0]) else None,
+            arc_radius=None if np.isnan(radius) else radius,
+            plane=f"G{self._plane[index]}",
+            start_angle=None if np.isnan(start_angle) else start_angle,
+            sweep_angle=None if np.isnan(sweep_angle) else sweep_angle,
+            modal_index=index,
+            table=self,
         )
     
-    elif isinstance(move, LinearMoveNode):
-        end_pos = start_pos.copy()
-        if move.x is not None:
-            end_pos[0] = move.x if modal.absolute else start_pos[0] + move.x
-        if move.y is not None:
-            end_pos[1] = move.y if modal.absolute else start_pos[1] + move.y
-        if move.z is not None:
-            end_pos[2] = move.z if modal.absolute else start_pos[2] + move.z
+    def __iter__(self):
+        for i in range(self._size):
+            yield self[i]
+    
+    def get_modal(self, index: int) -> ModalStateNode:
+        """Modal state of segment index; its position is the segment start."""
+        x, y, z = self._start[index].tolist()
+        return self.modal_log.get(index, (x, y, z))
+    
+    # Trimmed column views (valid until the next append)
+    @property
+    def start(self) -> np.ndarray:
+        return self._start[:self._size]
+    
+    @property
+    def end(self) -> np.ndarray:
+        return self._end[:self._size]
+    
+    @property
+    def center(self) -> np.ndarray:
+        return self._center[:self._size]
+    
+    @property
+    def radius(self) -> np.ndarray:
+        return self._radius[:self._size]
+    
+    @property
+    def start_angle(self) -> np.ndarray:
+        return self._start_angle[:self._size]
+    
+    @property
+    def sweep_angle(self) -> np.ndarray:
+        return self._sweep_angle[:self._size]
+    
+    @property
+    def motion_type(self) -> np.ndarray:
+        return self._motion_type[:self._size]
+    
+    @property
+    def plane(self) -> np.ndarray:
+        return self._plane[:self._size]
+    
+    @property
+    def feed_rate(self) -> np.ndarray:
+        return self._feed_rate[:self._size]
+    
+    @property
+    def tool_id(self) -> np.ndarray:
+        return self._tool_id[:self._size]
+    
+    @property
+    def wcs(self) -> np.ndarray:
+        return self._wcs[:self._size]
+    
+    @property
+    def block_number(self) -> np.ndarray:
+        return self._block_number[:self._size]
+    
+    def _grow(self) -> None:
+        """Double the capacity of every column."""
+        capacity = 2 * len(self._start)
+        for name in self._COLUMNS:
+            attr = "_" + name
+            old = getattr(self, attr)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, attr, new)
+    
+    def append(
+        self,
+        motion_type: int,
+        start_pos: np.ndarray,
+        end_pos: np.ndarray,
+        feed_rate: float,
+        modal: ModalStateNode,
+        block_number: Optional[int] = None,
+        center: Optional[np.ndarray] = None,
+        radius: Optional[float] = None,
+        plane: int = 17,
+        start_angle: Optional[float] = None,
+        sweep_angle: Optional[float] = None,
+    ) -> int:
+        """Append one row and return its index."""
+        i = self._size
+        if i == len(self._start):
+            self._grow()
+        self._start[i] = start_pos
+        self._end[i] = end_pos
+        self._center[i] = np.nan if center is None else center
+        self._radius[i] = np.nan if radius is None else radius
+        self._start_angle[i] = np.nan if start_angle is None else start_angle
+        self._sweep_angle[i] = np.nan if sweep_angle is None else sweep_angle
+        self._motion_type[i] = motion_type
+        self._plane[i] = plane
+        self._feed_rate[i] = feed_rate
+        self._tool_id[i] = modal.tool_id
+        self._wcs[i] = modal.wcs
+        self._block_number[i] = -1 if block_number is None else block_number
+        self.modal_log.record(i, modal)
+        self._size = i + 1
+        return i
+    
+    def append_rapid(self, start_pos: np.ndarray, end_pos: np.ndarray,
+                     modal: ModalStateNode, block_number: Optional[int] = None) -> int:
+        """Append a G00 row."""
+        return self.append(MotionType.RAPID, start_pos, end_pos, 0.0, modal, block_number)
+    
+    def append_linear(self, start_pos: np.ndarray, end_pos: np.ndarray, feed_rate: float,
+                      modal: ModalStateNode, block_number: Optional[int] = None) -> int:
+        """Append a G01 row."""
+        return self.append(MotionType.LINEAR, start_pos, end_pos, feed_rate, modal, block_number)
+    
+    def append_arc(self, clockwise: bool, start_pos: np.ndarray, end_pos: np.ndarray,
+                   center: Optional[np.ndarray], radius: Optional[float], feed_rate: float,
+                   modal: ModalStateNode, block_number: Optional[int] = None) -> int:
+        """Append a G02/G03 row; angles and radius are derived from the center when known."""
+        motion = MotionType.ARC_CW if clockwise else MotionType.ARC_CCW
+        start_angle = sweep_angle = None
+        if center is not None and modal.plane in PLANE_AXES:
+            start_angle, sweep_angle, radius = arc_geometry(
+                start_pos, end_pos, center, clockwise, PLANE_AXES[modal.plane]
+            )
+        return self.append(motion, start_pos, end_pos, feed_rate, modal, block_number,
+                           center=center, radius=radius, plane=modal.plane,
+                           start_angle=start_angle, sweep_angle=sweep_angle)
+    
+    def append_move(
+        self,
+        move: MotionCommand,
+        start_pos: Optional[np.ndarray],
+        modal: ModalStateNode,
+        block_num: Optional[int] = None,
+    ) -> int:
+        """
+        Resolve a motion command against start_pos/modal and append it.
+        start_pos=None starts the move at the modal position.
+        """
+        if not isinstance(move, (RapidMoveNode, LinearMoveNode, ArcMoveNode)):
+            raise ValueError(f"Unknown motion type: {type(move)}")
+        if start_pos is None:
+            start_pos = np.array((modal.pos_x, modal.pos_y, modal.pos_z))
         
-        feed = move.feed if move.feed is not None else modal.feed_rate
+        end_pos = _apply_move(start_pos, move.x, move.y, move.z, modal.absolute)
         
-        return ToolpathSegment(
-            block_number=block_num,
-            motion_type="linear",
-            start_pos=start_pos.copy(),
-            end_pos=end_pos,
-            feed_rate=feed,
-            tool_id=modal.tool_id,
-            wcs=modal.wcs,
-            modal=modal.clone(),
-        )
-    
-    elif isinstance(move, ArcMoveNode):
-        end_pos = start_pos.copy()
-        if move.x is not None:
-            end_pos[0] = move.x if modal.absolute else start_pos[0] + move.x
-        if move.y is not None:
-            end_pos[1] = move.y if modal.absolute else start_pos[1] + move.y
-        if move.z is not None:
-            end_pos[2] = move.z if modal.absolute else start_pos[2] + move.z
+        if isinstance(move, RapidMoveNode):
+            return self.append_rapid(start_pos, end_pos, modal, block_num)
         
         feed = move.feed if move.feed is not None else modal.feed_rate
-        motion_type = "arc_cw" if move.clockwise else "arc_ccw"
+        if isinstance(move, LinearMoveNode):
+            return self.append_linear(start_pos, end_pos, feed, modal, block_num)
         
         # Calculate center
         if move.r is not None:
@@ -340,19 +674,5 @@ def create_segment_from_move(
                 center[1] += move.j
             if move.k is not None:
                 center[2] += move.k
-        
-        return ToolpathSegment(
-            block_number=block_num,
-            motion_type=motion_type,
-            start_pos=start_pos.copy(),
-            end_pos=end_pos,
-            feed_rate=feed,
-            tool_id=modal.tool_id,
-            wcs=modal.wcs,
-            arc_center=center,
-            arc_radius=move.r,
-            plane=f"G{modal.plane}",
-            modal=modal.clone(),
-        )
-    
-    raise ValueError(f"Unknown motion type: {type(move)}")
+        return self.append_arc(move.clockwise, start_pos, end_pos, center, move.r,
+                               feed, modal, block_num)
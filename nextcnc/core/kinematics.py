@@ -13,13 +13,18 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass, field
+from functools import lru_cache
+from math import acos, ceil
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Union
 
 import numpy as np
 
+from .ast_nodes import MOTION_TYPES, PLANE_AXES, MotionType, arc_geometry
+from .parser import Segments
 
-@dataclass
+
+@dataclass(slots=True)
 class AxisLimits:
     """Axis limit configuration."""
     min: float = -9999.0
@@ -34,7 +39,7 @@ class AxisLimits:
         return True, None
 
 
-@dataclass
+@dataclass(slots=True)
 class MachineConfig:
     """3-axis machine configuration."""
     name: str = "Default 3-Axis Mill"
@@ -95,50 +100,36 @@ class MachineConfig:
         return len(errors) == 0, errors
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkCoordinateSystem:
     """WCS (G54-G59) offset storage."""
-    # G54 is index 0, G55 is index 1, etc.
-    offsets: list[np.ndarray] = field(default_factory=lambda: [
-        np.array([0.0, 0.0, 0.0]),  # G54
-        np.array([0.0, 0.0, 0.0]),  # G55
-        np.array([0.0, 0.0, 0.0]),  # G56
-        np.array([0.0, 0.0, 0.0]),  # G57
-        np.array([0.0, 0.0, 0.0]),  # G58
-        np.array([0.0, 0.0, 0.0]),  # G59
-    ])
+    # G54 is row 0, G55 is row 1, etc.
+    offsets: np.ndarray = field(default_factory=lambda: np.zeros((6, 3)))
     active_wcs: int = 0  # 0 = G54, 5 = G59
     
     def set_offset(self, wcs_index: int, x: float, y: float, z: float) -> None:
         """Set WCS offset (0-5 for G54-G59)."""
         if 0 <= wcs_index < 6:
-            self.offsets[wcs_index] = np.array([x, y, z])
+            self.offsets[wcs_index] = (x, y, z)
     
     def get_active_offset(self) -> np.ndarray:
-        """Get currently active WCS offset."""
-        return self.offsets[self.active_wcs].copy()
+        """Get currently active WCS offset (view into offsets, treat as read-only)."""
+        return self.offsets[self.active_wcs]
     
     def work_to_machine(self, work_pos: np.ndarray) -> np.ndarray:
         """Convert work coordinates to machine coordinates."""
-        return work_pos + self.get_active_offset()
+        return work_pos + self.offsets[self.active_wcs]
     
     def machine_to_work(self, machine_pos: np.ndarray) -> np.ndarray:
         """Convert machine coordinates to work coordinates."""
-        return machine_pos - self.get_active_offset()
+        return machine_pos - self.offsets[self.active_wcs]
 
 
-@dataclass
+@dataclass(slots=True)
 class MachineState:
     """Complete machine state at a given moment."""
-    # Axis positions (machine coordinates)
-    x: float = 0.0
-    y: float = 0.0
-    z: float = 0.0
-    
-    # Work coordinates
-    x_work: float = 0.0
-    y_work: float = 0.0
-    z_work: float = 0.0
+    # Axis positions: row 0 machine coordinates, row 1 work coordinates
+    _pos: np.ndarray = field(default_factory=lambda: np.zeros((2, 3)), repr=False)
     
     # Active WCS
     active_wcs: int = 0  # 0-5 for G54-G59
@@ -162,13 +153,61 @@ class MachineState:
     
     @property
     def position_machine(self) -> np.ndarray:
-        """Get machine position as array."""
-        return np.array([self.x, self.y, self.z])
+        """Machine position (view into the state buffer)."""
+        return self._pos[0]
     
     @property
     def position_work(self) -> np.ndarray:
-        """Get work position as array."""
-        return np.array([self.x_work, self.y_work, self.z_work])
+        """Work position (view into the state buffer)."""
+        return self._pos[1]
+    
+    @property
+    def x(self) -> float:
+        return float(self._pos[0, 0])
+    
+    @x.setter
+    def x(self, value: float) -> None:
+        self._pos[0, 0] = value
+    
+    @property
+    def y(self) -> float:
+        return float(self._pos[0, 1])
+    
+    @y.setter
+    def y(self, value: float) -> None:
+        self._pos[0, 1] = value
+    
+    @property
+    def z(self) -> float:
+        return float(self._pos[0, 2])
+    
+    @z.setter
+    def z(self, value: float) -> None:
+        self._pos[0, 2] = value
+    
+    @property
+    def x_work(self) -> float:
+        return float(self._pos[1, 0])
+    
+    @x_work.setter
+    def x_work(self, value: float) -> None:
+        self._pos[1, 0] = value
+    
+    @property
+    def y_work(self) -> float:
+        return float(self._pos[1, 1])
+    
+    @y_work.setter
+    def y_work(self, value: float) -> None:
+        self._pos[1, 1] = value
+    
+    @property
+    def z_work(self) -> float:
+        return float(self._pos[1, 2])
+    
+    @z_work.setter
+    def z_work(self, value: float) -> None:
+        self._pos[1, 2] = value
 
 
 class Kinematics3Axis:
@@ -185,8 +224,8 @@ class Kinematics3Axis:
             self.wcs.active_wcs = wcs_index
             self.current_state.active_wcs = wcs_index
             # Update work coordinates based on new offset
-            work = self.wcs.machine_to_work(self.current_state.position_machine)
-            self.current_state.x_work, self.current_state.y_work, self.current_state.z_work = work
+            pos = self.current_state._pos
+            np.subtract(pos[0], self.wcs.offsets[wcs_index], out=pos[1])
     
     def set_wcs_offset(self, wcs_index: int, x: float, y: float, z: float) -> None:
         """Set WCS offset."""
@@ -195,60 +234,46 @@ class Kinematics3Axis:
     def move_to_work(self, x: Optional[float] = None, y: Optional[float] = None, 
                      z: Optional[float] = None, feed_rate: Optional[float] = None) -> MachineState:
         """Move to work coordinates. Returns new state."""
+        state = self.current_state
+        pos = state._pos
         # Update work position
         if x is not None:
-            self.current_state.x_work = x
+            pos[1, 0] = x
         if y is not None:
-            self.current_state.y_work = y
+            pos[1, 1] = y
         if z is not None:
-            self.current_state.z_work = z
+            pos[1, 2] = z
         if feed_rate is not None:
-            self.current_state.feed_rate = feed_rate
+            state.feed_rate = feed_rate
         
         # Convert to machine coordinates
-        work_pos = self.current_state.position_work
-        machine_pos = self.wcs.work_to_machine(work_pos)
-        self.current_state.x, self.current_state.y, self.current_state.z = machine_pos
+        np.add(pos[1], self.wcs.offsets[self.wcs.active_wcs], out=pos[0])
         
         # Check limits
-        ok, errors = self.config.check_axis_limits(
-            self.current_state.x, 
-            self.current_state.y, 
-            self.current_state.z
-        )
-        self.current_state.limits_ok = ok
-        self.current_state.limit_errors = errors
-        
-        return self.current_state
+        state.limits_ok, state.limit_errors = self.config.check_axis_limits(*pos[0].tolist())
+        return state
     
     def move_to_machine(self, x: Optional[float] = None, y: Optional[float] = None,
                         z: Optional[float] = None, feed_rate: Optional[float] = None) -> MachineState:
         """Move to machine coordinates. Returns new state."""
+        state = self.current_state
+        pos = state._pos
         # Update machine position
         if x is not None:
-            self.current_state.x = x
+            pos[0, 0] = x
         if y is not None:
-            self.current_state.y = y
+            pos[0, 1] = y
         if z is not None:
-            self.current_state.z = z
+            pos[0, 2] = z
         if feed_rate is not None:
-            self.current_state.feed_rate = feed_rate
+            state.feed_rate = feed_rate
         
         # Convert to work coordinates
-        machine_pos = self.current_state.position_machine
-        work_pos = self.wcs.machine_to_work(machine_pos)
-        self.current_state.x_work, self.current_state.y_work, self.current_state.z_work = work_pos
+        np.subtract(pos[0], self.wcs.offsets[self.wcs.active_wcs], out=pos[1])
         
         # Check limits
-        ok, errors = self.config.check_axis_limits(
-            self.current_state.x, 
-            self.current_state.y, 
-            self.current_state.z
-        )
-        self.current_state.limits_ok = ok
-        self.current_state.limit_errors = errors
-        
-        return self.current_state
+        state.limits_ok, state.limit_errors = self.config.check_axis_limits(*pos[0].tolist())
+        return state
     
     def get_state(self) -> MachineState:
         """Get current machine state."""
@@ -259,183 +284,516 @@ class Kinematics3Axis:
 # Arc interpolation functions (original implementation)
 # ============================================================================
 
-def _arc_points_xy(
-    start: np.ndarray,
-    end: np.ndarray,
-    center: np.ndarray,
-    clockwise: bool,
-    num_samples: int,
-) -> np.ndarray:
-    """Sample an arc in XY plane (G17). start/end/center are (3,) arrays."""
-    sx, sy = start[0], start[1]
-    ex, ey = end[0], end[1]
-    cx, cy = center[0], center[1]
-    start_angle = np.arctan2(sy - cy, sx - cx)
-    end_angle = np.arctan2(ey - cy, ex - cx)
-    radius = np.sqrt((sx - cx) ** 2 + (sy - cy) ** 2)
-    if clockwise:
-        if end_angle >= start_angle:
-            end_angle -= 2 * np.pi
-    else:
-        if end_angle <= start_angle:
-            end_angle += 2 * np.pi
+# Plane -> (u, v, w) axis indices, keyed like the parser's segment dicts
+_PLANE_AXES = {f"G{plane}": axes for plane, axes in PLANE_AXES.items()}
+_PLANE_CODES = {f"G{plane}": plane for plane in PLANE_AXES}
+
+
+@lru_cache(maxsize=64)
+def _unit_samples(num_samples: int) -> np.ndarray:
+    """
+    Read-only t = linspace(0, 1, num_samples), built once per sample count.
+    A file usually samples every arc with the same count.
+    """
     t = np.linspace(0, 1, num_samples, endpoint=True)
-    angles = start_angle + t * (end_angle - start_angle)
-    z = np.linspace(start[2], end[2], num_samples, endpoint=True)
-    x = cx + radius * np.cos(angles)
-    y = cy + radius * np.sin(angles)
-    return np.column_stack((x, y, z))
+    t.flags.writeable = False
+    return t
 
 
-def _arc_points_xz(
+def _sincos(angles: np.ndarray, sin_out: np.ndarray) -> None:
+    """
+    Write sin(angles) to sin_out and cos(angles) back into angles.
+    Both come from the same angle buffer, so no separate cos/sin arrays.
+    """
+    np.sin(angles, out=sin_out)
+    np.cos(angles, out=angles)
+
+
+def _arc_geometry_batched(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    centers: np.ndarray,
+    clockwise: np.ndarray,
+    axes: tuple[int, int, int],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized arc_geometry for (N, 3) inputs: returns (start_angle, sweep_angle, radius)."""
+    u, v, _ = axes
+    cu, cv = centers[:, u], centers[:, v]
+    start_angle = np.arctan2(starts[:, v] - cv, starts[:, u] - cu)
+    end_angle = np.arctan2(ends[:, v] - cv, ends[:, u] - cu)
+    radius = np.hypot(starts[:, u] - cu, starts[:, v] - cv)
+    # Branchless wrap (see arc_geometry): CW sweeps negative, CCW sweeps positive
+    sign = np.where(clockwise, -1.0, 1.0)
+    sweep = end_angle - start_angle
+    sweep += sign * (2 * np.pi) * (sign * sweep <= 0.0)
+    return start_angle, sweep, radius
+
+
+def _arc_params(
+    segment: dict[str, Any],
+    motion: int,
+    axes: tuple[int, int, int],
+) -> tuple[float, float, float]:
+    """(start_angle, sweep_angle, radius) from the segment, computed if the parser did not store them."""
+    if "sweep_angle" in segment:
+        return segment["start_angle"], segment["sweep_angle"], segment["radius"]
+    return arc_geometry(
+        np.asarray(segment["start"], dtype=np.float64),
+        np.asarray(segment["end"], dtype=np.float64),
+        np.asarray(segment["center"], dtype=np.float64),
+        motion == MotionType.ARC_CW,
+        axes,
+    )
+
+
+def _arc_kernel(
     start: np.ndarray,
     end: np.ndarray,
     center: np.ndarray,
-    clockwise: bool,
-    num_samples: int,
+    start_angle: float,
+    sweep_angle: float,
+    radius: float,
+    axes: tuple[int, int, int],
+    out: np.ndarray,
 ) -> np.ndarray:
-    """Arc in XZ plane (G18): angle in XZ."""
-    sx, sz = start[0], start[2]
-    ex, ez = end[0], end[2]
-    cx, cz = center[0], center[2]
-    start_angle = np.arctan2(sz - cz, sx - cx)
-    end_angle = np.arctan2(ez - cz, ex - cx)
-    radius = np.sqrt((sx - cx) ** 2 + (sz - cz) ** 2)
-    if clockwise:
-        if end_angle >= start_angle:
-            end_angle -= 2 * np.pi
-    else:
-        if end_angle <= start_angle:
-            end_angle += 2 * np.pi
-    t = np.linspace(0, 1, num_samples, endpoint=True)
-    angles = start_angle + t * (end_angle - start_angle)
-    y = np.linspace(start[1], end[1], num_samples, endpoint=True)
-    x = cx + radius * np.cos(angles)
-    z = cz + radius * np.sin(angles)
-    return np.column_stack((x, y, z))
-
-
-def _arc_points_yz(
+    """
+    Sample one arc into a preallocated (S, 3) buffer and return it.
+    axes = (u, v, w): angle is measured in the (u, v) plane, w is interpolated linearly.
+    All per-sample math is written in place through ufunc out= arguments.
+    """
+    u, v, w = axes
+    t = _unit_samples(out.shape[0])
+
+    # Angles go into the u column first, then cos/sin are taken in place
+    col_u, col_v, col_w = out[:, u], out[:, v], out[:, w]
+    np.multiply(t, sweep_angle, out=col_u)
+    col_u += start_angle
+    _sincos(col_u, col_v)
+    col_u *= radius
+    col_u += center[u]
+    col_v *= radius
+    col_v += center[v]
+    np.multiply(t, end[w] - start[w], out=col_w)
+    col_w += start[w]
+    return out
+
+
+def _arc_points(
     start: np.ndarray,
     end: np.ndarray,
     center: np.ndarray,
-    clockwise: bool,
+    start_angle: float,
+    sweep_angle: float,
+    radius: float,
     num_samples: int,
+    axes: tuple[int, int, int],
 ) -> np.ndarray:
-    """Arc in YZ plane (G19)."""
-    sy, sz = start[1], start[2]
-    ey, ez = end[1], end[2]
-    cy, cz = center[1], center[2]
-    start_angle = np.arctan2(sz - cz, sy - cy)
-    end_angle = np.arctan2(ez - cz, ey - cy)
-    radius = np.sqrt((sy - cy) ** 2 + (sz - cz) ** 2)
-    if clockwise:
-        if end_angle >= start_angle:
-            end_angle -= 2 * np.pi
-    else:
-        if end_angle <= start_angle:
-            end_angle += 2 * np.pi
-    t = np.linspace(0, 1, num_samples, endpoint=True)
-    angles = start_angle + t * (end_angle - start_angle)
-    x = np.linspace(start[0], end[0], num_samples, endpoint=True)
-    y = cy + radius * np.cos(angles)
-    z = cz + radius * np.sin(angles)
-    return np.column_stack((x, y, z))
-
-
-def segment_to_points(segment: dict[str, Any], num_samples: int = 32) -> np.ndarray:
+    """Sample an arc in the plane given by axes (see PLANE_AXES). start/end/center are (3,) arrays."""
+    return _arc_kernel(start, end, center, start_angle, sweep_angle, radius,
+                       axes, np.empty((num_samples, 3)))
+
+
+def arc_samples(
+    radius: float,
+    sweep_angle: float,
+    chord_tol: float = 0.01,
+    min_samples: int = 4,
+    max_samples: int = 256,
+) -> int:
     """
-    Convert a single motion segment to an array of 3D points (N, 3).
-    Linear/rapid: start and end; arc: sampled along the arc.
+    Number of samples (chord endpoints) needed so that no chord deviates from
+    the arc by more than chord_tol. Clamped to [min_samples, max_samples], so
+    tiny fillets still read as curves and huge arcs stay bounded; degenerate
+    arcs (radius <= 0) get min_samples.
     """
+    if radius <= 0.0:
+        return min_samples
+    if chord_tol <= 0.0:
+        return max_samples
+    step = 2.0 * acos(max(0.0, 1.0 - chord_tol / radius))
+    chords = ceil(abs(sweep_angle) / step)
+    return min(max(chords + 1, min_samples), max_samples)
+
+
+def _arc_samples_batched(
+    radius: np.ndarray,
+    sweep_angle: np.ndarray,
+    chord_tol: float,
+    min_samples: int = 4,
+    max_samples: int = 256,
+) -> np.ndarray:
+    """Vectorized arc_samples for (N,) arc parameters."""
+    if chord_tol <= 0.0:
+        return np.where(radius > 0.0, max_samples, min_samples).astype(np.int64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        step = 2.0 * np.arccos(np.maximum(0.0, 1.0 - chord_tol / radius))
+        chords = np.ceil(np.abs(sweep_angle) / step)
+    samples = np.clip(np.nan_to_num(chords, nan=1.0) + 1, min_samples, max_samples)
+    return np.where(radius > 0.0, samples, min_samples).astype(np.int64)
+
+
+def _motion_code(seg_type: Any) -> int:
+    """MotionType for a segment "type" (name or MotionType); unknown types are drawn as lines."""
+    if isinstance(seg_type, int):
+        return seg_type
+    return MOTION_TYPES.get(seg_type, MotionType.LINEAR)
+
+
+def _line_points(segment: dict[str, Any], motion: int, num_samples: int,
+                 chord_tol: Optional[float], out: Optional[np.ndarray],
+                 dtype: np.dtype) -> np.ndarray:
+    """Rapid/linear: start and end, written straight into the destination rows."""
+    if out is None:
+        out = np.empty((2, 3), dtype=dtype)
+    out[0] = segment["start"]
+    out[1] = segment["end"]
+    return out[:2]
+
+
+def _arc_segment_points(segment: dict[str, Any], motion: int, num_samples: int,
+                        chord_tol: Optional[float], out: Optional[np.ndarray],
+                        dtype: np.dtype) -> np.ndarray:
+    """Arc: sampled in its plane; arcs with an unknown plane fall back to a line."""
+    plane = segment.get("plane", "G17")
+    if plane not in _PLANE_AXES:
+        return _line_points(segment, motion, num_samples, chord_tol, out, dtype)
     start = np.asarray(segment["start"], dtype=np.float64)
     end = np.asarray(segment["end"], dtype=np.float64)
-    seg_type = segment.get("type", "linear")
-    plane = segment.get("plane", "G17")
+    center = np.asarray(segment["center"], dtype=np.float64)
+    axes = _PLANE_AXES[plane]
+    start_angle, sweep_angle, radius = _arc_params(segment, motion, axes)
+    if chord_tol is not None:
+        num_samples = arc_samples(radius, sweep_angle, chord_tol)
+    # The kernel works in place in float64: use out directly when it is float64
+    if out is not None and out.dtype == np.float64:
+        return _arc_kernel(start, end, center, start_angle, sweep_angle, radius,
+                           axes, out[:num_samples])
+    pts = _arc_points(start, end, center, start_angle, sweep_angle, radius, num_samples, axes)
+    if out is None:
+        return pts.astype(dtype, copy=False)
+    out[:num_samples] = pts
+    return out[:num_samples]
+
+
+# Indexed by MotionType
+_SEGMENT_HANDLERS = (_line_points, _line_points, _arc_segment_points, _arc_segment_points)
+
+
+def segment_to_points(
+    segment: dict[str, Any],
+    num_samples: int = 32,
+    chord_tol: Optional[float] = None,
+    dtype: np.dtype = np.float32,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Convert a single motion segment to an array of 3D points (N, 3).
+    Linear/rapid: start and end; arc: sampled along the arc, either with a
+    fixed num_samples or adaptively so the chord error stays below chord_tol.
+    Math is done in float64; the result is cast to dtype (float32 for GL upload).
+    If out is given (an (M, 3) buffer with enough rows), the points are
+    written to its first N rows and out[:N] is returned; dtype is then
+    out's dtype.
+    """
+    motion = _motion_code(segment.get("type", "linear"))
+    return _SEGMENT_HANDLERS[motion](segment, motion, num_samples, chord_tol, out, dtype)
+
+
+def _arc_points_batched(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    centers: np.ndarray,
+    start_angle: np.ndarray,
+    sweep_angle: np.ndarray,
+    radius: np.ndarray,
+    counts: np.ndarray,
+    axes: tuple[int, int, int],
+) -> np.ndarray:
+    """
+    Sample N arcs of the same plane at once, arc i with counts[i] samples.
+    starts/ends/centers are (N, 3), the arc parameters are (N,).
+    Returns the samples of all arcs back to back as (counts.sum(), 3).
+    """
+    u, v, w = axes
+    total = int(counts.sum())
+    # Parameter t in [0, 1] for every sample of every arc
+    arc = np.repeat(np.arange(len(counts)), counts)
+    if len(counts) and (counts == counts[0]).all():
+        # Fixed sample count (the common case): tile the cached unit vector
+        t = np.tile(_unit_samples(int(counts[0])), len(counts))
+    else:
+        first = np.zeros(len(counts), dtype=np.int64)
+        np.cumsum(counts[:-1], out=first[1:])
+        t = np.arange(total, dtype=np.float64)
+        t -= first[arc]
+        t /= (counts - 1)[arc]
+
+    # Same in-place scheme as _arc_kernel: angles in the u plane, sin/cos in place
+    out = np.empty((total, 3), dtype=np.float64)
+    col_u, col_v, col_w = out[:, u], out[:, v], out[:, w]
+    np.multiply(t, sweep_angle[arc], out=col_u)
+    col_u += start_angle[arc]
+    _sincos(col_u, col_v)
+    col_u *= radius[arc]
+    col_u += centers[arc, u]
+    col_v *= radius[arc]
+    col_v += centers[arc, v]
+    np.multiply(t, (ends[:, w] - starts[:, w])[arc], out=col_w)
+    col_w += starts[arc, w]
+    return out
+
+
+def _segment_columns(segments: Union[Segments, list[dict[str, Any]]]) -> tuple[np.ndarray, ...]:
+    """
+    Gather segment dicts into sampler columns:
+    (starts, ends, centers, motions, planes, start_angle, sweep_angle, radius).
+    Centers and arc parameters are NaN where a segment does not provide them.
+    Segments from the parser already are these columns and are used as is.
+    """
+    if isinstance(segments, Segments):
+        return (segments.starts, segments.ends, segments.centers, segments.type_id,
+                segments.plane_id, segments.start_angle, segments.sweep_angle, segments.radius)
+    n = len(segments)
+    starts = np.array([seg["start"] for seg in segments], dtype=np.float64).reshape(n, 3)
+    ends = np.array([seg["end"] for seg in segments], dtype=np.float64).reshape(n, 3)
+    motions = np.fromiter(
+        (_motion_code(seg.get("type", "linear")) for seg in segments), dtype=np.uint8, count=n
+    )
+    planes = np.fromiter(
+        (_PLANE_CODES.get(seg.get("plane", "G17"), 0) for seg in segments), dtype=np.uint8, count=n
+    )
+    centers = np.full((n, 3), np.nan)
+    params = np.full((3, n), np.nan)
+    arc_idx = np.flatnonzero(motions >= MotionType.ARC_CW)
+    if len(arc_idx):
+        # One gather per column instead of one row assignment per arc
+        arcs = [segments[i] for i in arc_idx]
+        centers[arc_idx] = np.array([seg["center"] for seg in arcs], dtype=np.float64).reshape(-1, 3)
+        known = np.fromiter(("sweep_angle" in seg for seg in arcs), dtype=bool, count=len(arcs))
+        if known.any():
+            params[:, arc_idx[known]] = np.array(
+                [(seg["start_angle"], seg["sweep_angle"], seg["radius"])
+                 for seg, has in zip(arcs, known) if has],
+                dtype=np.float64,
+            ).T
+    return (starts, ends, centers, motions, planes, *params)
+
+
+def _sample_columns(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    centers: np.ndarray,
+    motions: np.ndarray,
+    planes: np.ndarray,
+    start_angle: np.ndarray,
+    sweep_angle: np.ndarray,
+    radius: np.ndarray,
+    num_samples: int,
+    connect: bool = False,
+    chord_tol: Optional[float] = None,
+    dtype: np.dtype = np.float64,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sample a struct-of-arrays toolpath (see _segment_columns / ToolpathTable)
+    into one (M, 3) buffer. Arcs without known parameters (NaN) get them
+    computed; arcs without a center or with an unknown plane are drawn as lines.
+    The total point count is derived first and the buffer allocated once.
+    """
+    n = len(starts)
+    if n == 0:
+        return np.zeros((0, 3), dtype=dtype), np.zeros(0, dtype=np.int64)
+
+    arc_idx = np.flatnonzero(
+        (motions >= MotionType.ARC_CW) & np.isin(planes, tuple(PLANE_AXES)) & ~np.isnan(centers[:, 0])
+    )
+
+    # Arc parameters, grouped by plane
+    groups = []
+    for plane, axes in PLANE_AXES.items():
+        idx = arc_idx[planes[arc_idx] == plane]
+        if not len(idx):
+            continue
+        params = np.stack((start_angle[idx], sweep_angle[idx], radius[idx]))
+        missing = np.isnan(params[1])
+        if missing.any():
+            m = idx[missing]
+            params[:, missing] = _arc_geometry_batched(
+                starts[m], ends[m], centers[m], motions[m] == MotionType.ARC_CW, axes
+            )
+        groups.append((idx, centers[idx], params, axes))
+
+    counts = np.full(n, 2, dtype=np.int64)
+    for idx, _, (_, group_sweep, group_radius), _ in groups:
+        if chord_tol is None:
+            counts[idx] = num_samples
+        else:
+            counts[idx] = _arc_samples_batched(group_radius, group_sweep, chord_tol)
+
+    # offsets[i] is where sample 0 of segment i lands; connected segments overlap by one
+    overlap = 1 if connect else 0
+    offsets = np.zeros(n, dtype=np.int64)
+    np.cumsum(counts[:-1] - overlap, out=offsets[1:])
+    out = np.empty((int(counts.sum()) - overlap * (n - 1), 3), dtype=dtype)
+    # Segments whose sample 0 is written
+    has_head = np.ones(n, dtype=bool)
+    has_head[1:] = not connect
+
+    # Straight segments (and arcs with an unknown plane): start + end
+    is_line = np.ones(n, dtype=bool)
+    is_line[arc_idx] = False
+    out[offsets[is_line & has_head]] = starts[is_line & has_head]
+    out[offsets[is_line] + 1] = ends[is_line]
+
+    # Arcs: one batched evaluation per plane, scattered to their slots
+    for idx, group_centers, (group_start, group_sweep, group_radius), axes in groups:
+        arc_counts = counts[idx]
+        pts = _arc_points_batched(
+            starts[idx], ends[idx], group_centers,
+            group_start, group_sweep, group_radius, arc_counts, axes,
+        )
+        local = np.arange(len(pts)) - np.repeat(np.cumsum(arc_counts) - arc_counts, arc_counts)
+        dest = np.repeat(offsets[idx], arc_counts) + local
+        write = (local > 0) | np.repeat(has_head[idx], arc_counts)
+        out[dest[write]] = pts[write]
+    return out, counts
 
-    if seg_type in ("rapid", "linear"):
-        return np.array([start, end], dtype=np.float64)
 
-    if seg_type == "arc_cw":
-        clockwise = True
-    elif seg_type == "arc_ccw":
-        clockwise = False
-    else:
-        return np.array([start, end], dtype=np.float64)
+def _sample_segments(
+    segments: Union[Segments, list[dict[str, Any]]],
+    num_samples: int,
+    connect: bool = False,
+    chord_tol: Optional[float] = None,
+    dtype: np.dtype = np.float64,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sample every segment into one preallocated (M, 3) buffer, segments back to back.
+    With connect=True the first point of every segment after the first is not
+    written (it equals the previous end), so the buffer is already the polyline.
+    Arcs get num_samples points, or an adaptive count when chord_tol is given.
+    Geometry is evaluated in float64 and cast to dtype when stored in the buffer.
+    Returns (points, counts) where counts[i] is the number of samples of segment i.
+    """
+    if not segments:
+        return np.zeros((0, 3), dtype=dtype), np.zeros(0, dtype=np.int64)
+    return _sample_columns(
+        *_segment_columns(segments), num_samples,
+        connect=connect, chord_tol=chord_tol, dtype=dtype,
+    )
 
-    center = np.asarray(segment["center"], dtype=np.float64)
-    if plane == "G17":
-        return _arc_points_xy(start, end, center, clockwise, num_samples)
-    if plane == "G18":
-        return _arc_points_xz(start, end, center, clockwise, num_samples)
-    if plane == "G19":
-        return _arc_points_yz(start, end, center, clockwise, num_samples)
-    return np.array([start, end], dtype=np.float64)
+
+def segments_to_points_batched(
+    segments: Union[Segments, list[dict[str, Any]]],
+    num_samples: int = 32,
+    connect: bool = True,
+    chord_tol: Optional[float] = None,
+    dtype: np.dtype = np.float32,
+) -> np.ndarray:
+    """
+    Vectorized variant of the per-segment polyline builder.
+    Gathers segments into (N, 3) arrays and samples all arcs of a plane in a
+    single NumPy pass instead of one small linspace/cos/sin call per arc.
+    """
+    return _sample_segments(
+        segments, num_samples, connect=connect, chord_tol=chord_tol, dtype=dtype
+    )[0]
 
 
 def segments_to_points(
-    segments: list[dict[str, Any]],
+    segments: Union[Segments, list[dict[str, Any]]],
     num_samples: int = 32,
     connect: bool = True,
+    chord_tol: Optional[float] = None,
+    dtype: np.dtype = np.float32,
 ) -> np.ndarray:
     """
     Convert a list of segments to a single polyline (N, 3).
     If connect=True, segments are concatenated (shared endpoints not duplicated
     to avoid gaps when drawing line_strip; duplicate is needed for strict polyline).
     For GL_LINE_STRIP we want no duplicate so the path is continuous.
+    If chord_tol is given, arcs are sampled adaptively (see arc_samples).
+    Points are float32 by default (render path); pass dtype=np.float64 for
+    full precision.
     """
-    if not segments:
-        return np.zeros((0, 3), dtype=np.float64)
-
-    chunks = []
-    for seg in segments:
-        pts = segment_to_points(seg, num_samples=num_samples)
-        chunks.append(pts)
+    return segments_to_points_batched(
+        segments, num_samples=num_samples, connect=connect, chord_tol=chord_tol, dtype=dtype
+    )
 
-    if connect:
-        # Concatenate: skip first point of each chunk after the first (it equals previous end)
-        out = [chunks[0]]
-        for i in range(1, len(chunks)):
-            out.append(chunks[i][1:])
-        return np.concatenate(out, axis=0) if out else np.zeros((0, 3), dtype=np.float64)
-    return np.concatenate(chunks, axis=0)
 
+# Per-point machine state record returned by process_segments_with_machine
+MACHINE_STATE_DTYPE = np.dtype([
+    ("x", np.float64), ("y", np.float64), ("z", np.float64),
+    ("x_work", np.float64), ("y_work", np.float64), ("z_work", np.float64),
+    ("active_wcs", np.uint8),
+    ("segment", np.int32),
+    ("limits_ok", np.bool_),
+])
 
-# ============================================================================
-# New: Machine-aware segment processing
-# ============================================================================
 
 def process_segments_with_machine(
-    segments: list[dict[str, Any]],
+    segments: Union[Segments, list[dict[str, Any]]],
     kinematics: Kinematics3Axis,
     num_samples: int = 32,
-) -> tuple[np.ndarray, list[MachineState]]:
+    chord_tol: Optional[float] = None,
+    dtype: np.dtype = np.float64,
+) -> tuple[np.ndarray, np.recarray]:
     """
     Process segments with full machine kinematics.
     
+    All points are sampled in one batch, shifted to machine coordinates with
+    the WCS offset active for their segment and limit-checked as a whole.
+    The kinematics engine is left at the last point, as if it had been moved
+    there point by point. Limits are checked in float64, only the returned
+    points are cast to dtype.
+    
     Returns:
-        points: (N, 3) array of toolpath points
-        states: List of MachineState for each point
+        points: (N, 3) array of toolpath points (machine coordinates, dtype)
+        states: (N,) record array of MACHINE_STATE_DTYPE, one row per point
     """
-    points = []
-    states = []
+    work, counts = _sample_segments(segments, num_samples, chord_tol=chord_tol)
     
-    for seg in segments:
-        seg_type = seg.get("type", "linear")
-        
-        # Handle WCS changes if present in segment
-        if "wcs" in seg:
-            kinematics.set_wcs(seg["wcs"])
-        
-        # Get segment points
-        seg_points = segment_to_points(seg, num_samples=num_samples)
-        
-        for pt in seg_points:
-            # Move to this point in work coordinates
-            state = kinematics.move_to_work(x=pt[0], y=pt[1], z=pt[2])
-            
-            # Store machine position for visualization
-            points.append(state.position_machine)
-            states.append(state)
-    
-    return np.array(points), states
+    # Active WCS per segment: segments without a (valid) "wcs" key keep the previous one
+    if isinstance(segments, Segments):
+        wcs_ids = segments.wcs.astype(np.intp)
+    else:
+        wcs_ids = np.empty(len(segments), dtype=np.intp)
+        active = kinematics.wcs.active_wcs
+        for i, seg in enumerate(segments):
+            wcs = seg.get("wcs", active)
+            if 0 <= wcs < 6:
+                active = wcs
+            wcs_ids[i] = active
+    point_wcs = np.repeat(wcs_ids, counts)
+    
+    machine = work + kinematics.wcs.offsets[point_wcs]
+    
+    config = kinematics.config
+    mins = np.array([config.x_limits.min, config.y_limits.min, config.z_limits.min])
+    maxs = np.array([config.x_limits.max, config.y_limits.max, config.z_limits.max])
+    
+    states = np.empty(len(machine), dtype=MACHINE_STATE_DTYPE).view(np.recarray)
+    states.x, states.y, states.z = machine.T
+    states.x_work, states.y_work, states.z_work = work.T
+    states.active_wcs = point_wcs
+    states.segment = np.repeat(np.arange(len(segments), dtype=np.int32), counts)
+    states.limits_ok = ~np.any((machine < mins) | (machine > maxs), axis=1)
+    
+    if len(work):
+        kinematics.set_wcs(int(wcs_ids[-1]))
+        kinematics.move_to_work(x=work[-1, 0], y=work[-1, 1], z=work[-1, 2])
+    
+    return machine.astype(dtype, copy=False), states
+
+
+def limit_error_messages(
+    states: np.ndarray,
+    config: MachineConfig,
+    max_count: Optional[int] = None,
+) -> list[tuple[int, list[str]]]:
+    """
+    Build (point_index, errors) pairs for the points that violate axis
+    limits, for the first max_count of them (all if None).
+    """
+    return [
+        (int(i), config.check_axis_limits(states.x[i], states.y[i], states.z[i])[1])
+        for i in np.flatnonzero(~states.limits_ok)[:max_count]
+    ]
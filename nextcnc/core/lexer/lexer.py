@@ -11,21 +11,9 @@ from typing import Iterator
 from .tokens import Token, TokenType
 
 
-# Regex patterns for G-code tokens
+# Lookup tables for G-code tokens
 class LexerPatterns:
-    """Regular expression patterns for token recognition."""
-    
-    # Whitespace (not including newline)
-    WHITESPACE = re.compile(r"[ \t]+")
-    
-    # Newline (CR, LF, or CRLF)
-    NEWLINE = re.compile(r"\r\n|\r|\n")
-    
-    # Numbers: integer or decimal
-    NUMBER = re.compile(r"-?\d+\.?\d*|\.\d+")
-    
-    # Word (letter + number): G01, X100.5, etc.
-    WORD = re.compile(r"([A-Za-z])(-?\d+\.?\d*)")
+    """Lookup tables for token recognition (the regex lives in _MASTER)."""
     
     # Address letter to token type mapping
     ADDRESS_TOKENS = {
@@ -68,185 +56,122 @@ class LexerError(Exception):
         return f"Lexer Error at L{self.line}, C{self.column}: {self.message}"
 
 
+# Single alternation over every token shape, tried in order at each position.
+# WS is matched and dropped; BAD_WORD / BAD are the two error cases.
+_MASTER = re.compile(
+    r"(?P<WS>[ \t]+)"
+    r"|(?P<NEWLINE>\r\n|\r|\n)"
+    r"|(?P<WORD>(?P<letter>[A-Za-z])(?P<number>-?\d+\.?\d*))"
+    r"|(?P<COMMENT_SEMI>;[^\n]*)"
+    r"|(?P<COMMENT>\([^)]*\)?)"
+    r"|(?P<BLOCK_SKIP>/)"
+    r"|(?P<PARAMETER>#(?P<digits>\d*))"
+    r"|(?P<OPERATOR>[-+*=\[\]])"
+    r"|(?P<BAD_WORD>[A-Za-z])"
+    r"|(?P<BAD>.)",
+    re.DOTALL,
+)
+
+# ord(letter) -> address token type, both cases; non-address letters are labels
+_ADDRESS_LUT = [
+    LexerPatterns.ADDRESS_TOKENS.get(chr(code).upper(), TokenType.LABEL) for code in range(128)
+]
+
+_OPERATORS = {
+    "+": TokenType.PLUS,
+    "-": TokenType.MINUS,
+    "*": TokenType.MUL,
+    "=": TokenType.ASSIGN,
+    "[": TokenType.LBRACKET,
+    "]": TokenType.RBRACKET,
+}
+
+
 class GCodeLexer:
     """
     Fanuc-compatible G-code lexer.
     Tokenizes G-code text into a stream of tokens.
+    
+    The whole text is scanned with one compiled alternation (_MASTER);
+    line/column are tracked from the newlines the scan passes over.
     """
     
     def __init__(self, text: str):
         self.text = text
-        self.pos = 0
-        self.line = 1
-        self.column = 1
-        
-    @property
-    def current_char(self) -> str | None:
-        """Get current character or None if EOF."""
-        if self.pos >= len(self.text):
-            return None
-        return self.text[self.pos]
-    
-    @property
-    def remaining(self) -> str:
-        """Get remaining text from current position."""
-        return self.text[self.pos:]
-    
-    def advance(self, count: int = 1) -> None:
-        """Advance position by count characters."""
-        for _ in range(count):
-            if self.pos < len(self.text):
-                if self.text[self.pos] == "\n":
-                    self.line += 1
-                    self.column = 1
+        self._stream: Iterator[Token] | None = None
+    
+    def _scan(self) -> Iterator[Token]:
+        """Yield tokens for the whole text, ending with EOF."""
+        text = self.text
+        address_lut = _ADDRESS_LUT
+        line = 1
+        line_start = 0  # offset of the first character of the current line
+        
+        for match in _MASTER.finditer(text):
+            kind = match.lastgroup
+            if kind == "WS":
+                continue
+            pos = match.start()
+            column = pos - line_start + 1
+            raw = match.group()
+            
+            if kind == "WORD":
+                token_type = address_lut[ord(match.group("letter"))]
+                yield Token(token_type, float(match.group("number")), line, column, raw)
+            elif kind == "NEWLINE":
+                yield Token(TokenType.NEWLINE, None, line, column, raw)
+                if raw[-1] == "\n":
+                    line += 1
+                    line_start = match.end()
+            elif kind == "COMMENT_SEMI":
+                yield Token(TokenType.COMMENT_SEMI, raw[1:], line, column, raw)
+            elif kind == "COMMENT":
+                content = raw[1:-1] if len(raw) > 2 else ""
+                yield Token(TokenType.COMMENT, content, line, column, raw)
+                # Parenthesized comments may span lines
+                newlines = raw.count("\n")
+                if newlines:
+                    line += newlines
+                    line_start = pos + raw.rfind("\n") + 1
+            elif kind == "BLOCK_SKIP":
+                yield Token(TokenType.BLOCK_SKIP, None, line, column, raw)
+            elif kind == "PARAMETER":
+                digits = match.group("digits")
+                if digits:
+                    num = int(digits)
+                    yield Token(TokenType.PARAMETER, num, line, column, f"#{num}")
                 else:
-                    self.column += 1
-                self.pos += 1
-    
-    def skip_whitespace(self) -> None:
-        """Skip whitespace (but not newlines)."""
-        while self.current_char is not None and self.current_char in " \t":
-            self.advance()
-    
-    def read_number(self) -> tuple[float, str]:
-        """Read a number (integer or float)."""
-        match = LexerPatterns.NUMBER.match(self.remaining)
-        if not match:
-            raise LexerError(
-                f"Expected number, got '{self.current_char}'",
-                self.line, self.column
-            )
-        raw = match.group(0)
-        value = float(raw) if "." in raw else int(raw)
-        self.advance(len(raw))
-        return value, raw
-    
-    def read_word(self) -> tuple[TokenType, float, str]:
-        """Read a word (letter + number)."""
-        match = LexerPatterns.WORD.match(self.remaining)
-        if not match:
-            raise LexerError(
-                f"Expected word, got '{self.current_char}'",
-                self.line, self.column
-            )
-        
-        letter = match.group(1).upper()
-        number_str = match.group(2)
-        value = float(number_str) if "." in number_str else int(number_str)
-        
-        token_type = LexerPatterns.ADDRESS_TOKENS.get(
-            letter, TokenType.LABEL
-        )
-        
-        raw = match.group(0)
-        self.advance(len(raw))
-        return token_type, float(value), raw
-    
-    def read_comment_paren(self) -> tuple[TokenType, str, str]:
-        """Read parenthesized comment."""
-        chars = ["("]
-        self.advance()
-        
-        while self.current_char is not None:
-            char = self.current_char
-            chars.append(char)
-            self.advance()
-            if char == ")":
-                break
+                    yield Token(TokenType.PARAMETER, 0, line, column, "#")
+            elif kind == "OPERATOR":
+                yield Token(_OPERATORS[raw], raw, line, column, raw)
+            elif kind == "BAD_WORD":
+                raise LexerError(f"Expected word, got '{raw}'", line, column)
+            else:
+                raise LexerError(f"Unexpected character: '{raw}'", line, column)
         
-        raw = "".join(chars)
-        content = raw[1:-1] if len(raw) > 2 else ""
-        return TokenType.COMMENT, content, raw
+        yield Token(TokenType.EOF, None, line, len(text) - line_start + 1, "")
     
     def next_token(self) -> Token:
-        """Get next token from input."""
-        self.skip_whitespace()
-        
-        if self.current_char is None:
-            return Token(TokenType.EOF, None, self.line, self.column, "")
-        
-        start_line = self.line
-        start_col = self.column
-        char = self.current_char
-        
-        # Newline
-        newline_match = LexerPatterns.NEWLINE.match(self.remaining)
-        if newline_match:
-            raw = newline_match.group(0)
-            self.advance(len(raw))
-            return Token(TokenType.NEWLINE, None, start_line, start_col, raw)
-        
-        # Semicolon comment
-        if char == ";":
-            comment = self.remaining.split("\n", 1)[0]
-            self.advance(len(comment))
-            return Token(TokenType.COMMENT_SEMI, comment[1:], start_line, start_col, comment)
-        
-        # Parenthesized comment
-        if char == "(":
-            return Token(*self.read_comment_paren(), start_line, start_col)
-        
-        # Block skip
-        if char == "/":
-            self.advance()
-            return Token(TokenType.BLOCK_SKIP, None, start_line, start_col, "/")
-        
-        # Parameter
-        if char == "#":
-            self.advance()
-            param_match = re.match(r"\d+", self.remaining)
-            if param_match:
-                num = int(param_match.group(0))
-                self.advance(len(param_match.group(0)))
-                raw = f"#{num}"
-                return Token(TokenType.PARAMETER, num, start_line, start_col, raw)
-            else:
-                return Token(TokenType.PARAMETER, 0, start_line, start_col, "#")
-        
-        # Operators
-        if char == "+":
-            self.advance()
-            return Token(TokenType.PLUS, char, start_line, start_col, char)
-        if char == "-":
-            self.advance()
-            return Token(TokenType.MINUS, char, start_line, start_col, char)
-        if char == "*":
-            self.advance()
-            return Token(TokenType.MUL, char, start_line, start_col, char)
-        if char == "=":
-            self.advance()
-            return Token(TokenType.ASSIGN, char, start_line, start_col, char)
-        if char == "[":
-            self.advance()
-            return Token(TokenType.LBRACKET, char, start_line, start_col, char)
-        if char == "]":
-            self.advance()
-            return Token(TokenType.RBRACKET, char, start_line, start_col, char)
-        
-        # Word (letter + number)
-        if char.isalpha():
-            token_type, value, raw = self.read_word()
-            return Token(token_type, value, start_line, start_col, raw)
-        
-        raise LexerError(f"Unexpected character: '{char}'", start_line, start_col)
+        """Get next token from input (EOF is repeated once the input is exhausted)."""
+        if self._stream is None:
+            self._stream = self._scan()
+        token = next(self._stream, None)
+        if token is None:
+            return Token(TokenType.EOF, None, *self._eof_position(), "")
+        return token
+    
+    def _eof_position(self) -> tuple[int, int]:
+        """(line, column) just past the end of the text."""
+        text = self.text
+        return text.count("\n") + 1, len(text) - (text.rfind("\n") + 1) + 1
     
     def tokenize(self) -> list[Token]:
         """Tokenize entire input and return list of tokens."""
-        tokens = []
-        while True:
-            token = self.next_token()
-            tokens.append(token)
-            if token.type == TokenType.EOF:
-                break
-        return tokens
+        return list(self._scan())
     
     def __iter__(self) -> Iterator[Token]:
         """Iterate over tokens."""
-        while True:
-            token = self.next_token()
-            yield token
-            if token.type == TokenType.EOF:
-                break
+        return self._scan()
 
 
 def tokenize(text: str) -> list[Token]:
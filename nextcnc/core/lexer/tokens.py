@@ -5,12 +5,15 @@ G-Code Token definitions for Fanuc-compatible CNC controllers.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
 from typing import Any, Optional
 
 
-class TokenType(Enum):
-    """Token types for G-code lexical analysis."""
+class TokenType(IntEnum):
+    """
+    Token types for G-code lexical analysis.
+    IntEnum so that token types compare and index as plain ints.
+    """
     
     # End of file
     EOF = auto()
@@ -90,7 +93,7 @@ class TokenType(Enum):
     STRING = auto()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Token:
     """Represents a single token in the G-code stream."""
     type: TokenType
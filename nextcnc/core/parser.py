@@ -10,29 +10,70 @@ Features:
 
 from __future__ import annotations
 
+import mmap
 import re
+from array import array
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Union
+from typing import Any, Iterator, Optional, Union
 
 import numpy as np
 
+from .ast_nodes import MOTION_TYPES, PLANE_AXES, MotionType, arc_geometry
+
 # Token pattern: optional letter + optional minus + number (integer or decimal)
 TOKEN_PATTERN = re.compile(r"([GMTXYZIJKFRNSHLQP])\s*(-?\d*\.?\d+)", re.IGNORECASE)
 
+# Whole-file scanner, tried in this order at every position:
+# - a whole comment line (first non-blank character '('), consumed in one
+#   match so its contents are never tokenized,
+# - a TOKEN_PATTERN word (groups 1, 2),
+# - a line break (the breaks str.splitlines() uses),
+# - a ';' comment up to the line break.
+_BREAKS = "\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029"
+_LINE_PATTERN = re.compile(
+    rf"(?<![^{_BREAKS}])[^\S{_BREAKS}]*\([^{_BREAKS}]*"
+    rf"|([GMTXYZIJKFRNSHLQP])[^\S{_BREAKS}]*(-?\d*\.?\d+)"
+    rf"|(?P<nl>\r\n|[{_BREAKS}])"
+    rf"|;[^{_BREAKS}]*",
+    re.IGNORECASE,
+)
+# Same scanner for ASCII bytes: the ASCII subset of the line breaks, and
+# [\t\x1f ] is the ASCII whitespace that is not a break.
+_ASCII_BREAKS = rb"\n\r\v\f\x1c\x1d\x1e"
+_BYTES_LINE_PATTERN = re.compile(
+    rb"(?<![^" + _ASCII_BREAKS + rb"])[\t\x1f ]*\([^" + _ASCII_BREAKS + rb"]*"
+    rb"|([GMTXYZIJKFRNSHLQP])[\t\x1f ]*(-?\d*\.?\d+)"
+    rb"|(?P<nl>\r\n|[" + _ASCII_BREAKS + rb"])"
+    rb"|;[^" + _ASCII_BREAKS + rb"]*",
+    re.IGNORECASE,
+)
+_NON_ASCII = re.compile(rb"[\x80-\xff]")
+# Address letter (either case) as matched in bytes -> dict key
+_BYTE_LETTERS = {
+    bytes([code]): chr(code).upper()
+    for code in range(128)
+    if chr(code).upper() in "GMTXYZIJKFRNSHLQP" and chr(code).isalpha()
+}
+
+
+# ModalState.to_dict() keys besides "position", in ModalState.snapshot() key order
+_SNAPSHOT_FIELDS = ("motion", "plane", "units", "wcs", "absolute", "feed_rate", "tool_id")
+
 
 class ModalState:
     """Tracks modal G-code state."""
     
-    # Modal Group 1: Motion
-    MOTION_G00 = "G00"  # Rapid
-    MOTION_G01 = "G01"  # Linear
-    MOTION_G02 = "G02"  # Arc CW
-    MOTION_G03 = "G03"  # Arc CCW
+    # Modal Group 1: Motion (G number, equal to the MotionType value)
+    MOTION_G00 = 0  # Rapid
+    MOTION_G01 = 1  # Linear
+    MOTION_G02 = 2  # Arc CW
+    MOTION_G03 = 3  # Arc CCW
     
-    # Modal Group 2: Plane selection
-    PLANE_G17 = "G17"  # XY
-    PLANE_G18 = "G18"  # XZ
-    PLANE_G19 = "G19"  # YZ
+    # Modal Group 2: Plane selection (G number)
+    PLANE_G17 = 17  # XY
+    PLANE_G18 = 18  # XZ
+    PLANE_G19 = 19  # YZ
     
     # Modal Group 6: Units
     UNITS_G20 = "G20"  # Inch
@@ -75,6 +116,10 @@ class ModalState:
         self.spindle_rpm: float = 0.0
         self.spindle_on: bool = False
         
+        # Last modal-field snapshot (see snapshot())
+        self._snapshot_key: tuple = ()
+        self._snapshot_fields: dict[str, Any] = {}
+        
         # WCS offsets (G54-G59)
         self.wcs_offsets: list[np.ndarray] = [
             np.array([0.0, 0.0, 0.0]),  # G54
@@ -92,8 +137,8 @@ class ModalState:
     def to_dict(self) -> dict[str, Any]:
         """Export state to dictionary."""
         return {
-            "motion": self.motion,
-            "plane": self.plane,
+            "motion": f"G{self.motion:02d}",
+            "plane": f"G{self.plane}",
             "units": self.units,
             "wcs": self.wcs,
             "absolute": self.absolute,
@@ -101,19 +146,131 @@ class ModalState:
             "feed_rate": self.feed_rate,
             "tool_id": self.tool_id,
         }
+    
+    def snapshot(self) -> dict[str, Any]:
+        """
+        to_dict() for per-segment snapshots. The modal fields are only
+        gathered into a new dict when one of them changed since the last
+        call; position is referenced, not copied, since the parser replaces
+        it rather than mutating it. Treat the result as read-only.
+        """
+        key = (self.motion, self.plane, self.units, self.wcs, self.absolute,
+               self.feed_rate, self.tool_id)
+        if key != self._snapshot_key:
+            self._snapshot_key = key
+            fields = dict(zip(_SNAPSHOT_FIELDS, key))
+            fields["motion"] = f"G{self.motion:02d}"
+            fields["plane"] = f"G{self.plane}"
+            self._snapshot_fields = fields
+        return {**self._snapshot_fields, "position": self.position}
+
 
+# MotionType -> segment "type" string
+_TYPE_NAMES = {int(motion): name for name, motion in MOTION_TYPES.items()}
+# Column fill for straight segments
+_NO_CENTER = (np.nan, np.nan, np.nan)
+_NO_ARC = (np.nan, np.nan, np.nan)
 
-def _tokenize_line(line: str) -> dict[str, float]:
-    """Parse a single line into a dict of address -> value."""
-    line = line.split(";")[0].strip()  # Remove comments
-    if not line or line.startswith("("):
-        return {}
-    result: dict[str, float] = {}
-    for match in TOKEN_PATTERN.finditer(line):
-        letter = match.group(1).upper()
-        value = float(match.group(2))
-        result[letter] = value
-    return result
+
+@dataclass(slots=True)
+class Segments:
+    """
+    Motion segments as parallel NumPy arrays (struct of arrays), row i = segment i.
+    type_id holds MotionType values, plane_id 17/18/19 (G17/G18/G19).
+    centers and the arc parameters are NaN for straight segments,
+    feedrates is NaN until the first F word.
+    Indexing, iterating and as_dicts() give the legacy per-segment dicts.
+    """
+    starts: np.ndarray        # (N, 3) float64
+    ends: np.ndarray          # (N, 3) float64
+    centers: np.ndarray       # (N, 3) float64
+    type_id: np.ndarray       # (N,) uint8
+    plane_id: np.ndarray      # (N,) uint8
+    feedrates: np.ndarray     # (N,) float64
+    wcs: np.ndarray           # (N,) uint8, 0 = G54
+    start_angle: np.ndarray   # (N,) float64
+    sweep_angle: np.ndarray   # (N,) float64
+    radius: np.ndarray        # (N,) float64
+    modal: Optional[list[dict[str, Any]]] = None  # per-segment ModalState.snapshot(), if requested
+
+    def __len__(self) -> int:
+        return len(self.type_id)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return iter(self.as_dicts())
+
+    def __getitem__(self, index: int) -> dict[str, Any]:
+        """Legacy dict form of one segment (negative indices count from the end)."""
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("segment index out of range")
+        arc = (float(self.start_angle[index]), float(self.sweep_angle[index]), float(self.radius[index]))
+        return self._segment_dict(index, int(self.type_id[index]), int(self.plane_id[index]),
+                                  int(self.wcs[index]), float(self.feedrates[index]), arc)
+
+    def as_dicts(self) -> list[dict[str, Any]]:
+        """
+        Legacy list-of-dicts form (see parse_string). Position entries are
+        row views into this object's arrays.
+        """
+        arc_params = zip(self.start_angle.tolist(), self.sweep_angle.tolist(), self.radius.tolist())
+        rows = zip(self.type_id.tolist(), self.plane_id.tolist(), self.wcs.tolist(),
+                   self.feedrates.tolist(), arc_params)
+        return [self._segment_dict(i, *row) for i, row in enumerate(rows)]
+
+    def _segment_dict(
+        self,
+        i: int,
+        type_id: int,
+        plane_id: int,
+        wcs: int,
+        feedrate: float,
+        arc: tuple[float, float, float],
+    ) -> dict[str, Any]:
+        """Segment dict for row i from its already-extracted scalar columns."""
+        seg = {
+            "type": _TYPE_NAMES[type_id],
+            "start": self.starts[i],
+            "end": self.ends[i],
+            "plane": f"G{plane_id}",
+            "wcs": wcs,
+        }
+        if type_id >= MotionType.ARC_CW:
+            seg["center"] = self.centers[i]
+            seg["start_angle"], seg["sweep_angle"], seg["radius"] = arc
+        if self.modal is not None:
+            seg["modal"] = self.modal[i]
+        if feedrate == feedrate:  # not NaN
+            seg["feedrate"] = feedrate
+        return seg
+
+
+def _iter_blocks(content: Union[str, bytes]) -> Iterator[dict[str, float]]:
+    """
+    Yield the address -> value dict of every non-empty line of content.
+    The whole text is scanned once with _LINE_PATTERN; a line ends at the
+    same breaks as str.splitlines(). ';' comments out the rest of the line,
+    and a line whose first non-blank character is '(' is skipped.
+    Blank and comment lines cost a single match each.
+    ASCII bytes-like content (e.g. an mmap) is scanned as is with
+    _BYTES_LINE_PATTERN, which gives the same blocks as the decoded text.
+    """
+    if isinstance(content, str):
+        pattern, key = _LINE_PATTERN, str.upper
+    else:
+        pattern, key = _BYTES_LINE_PATTERN, _BYTE_LETTERS.__getitem__
+    tokens: dict[str, float] = {}
+    for match in pattern.finditer(content):
+        letter = match[1]
+        if letter is not None:
+            tokens[key(letter)] = float(match[2])
+        elif match.lastgroup == "nl" and tokens:
+            yield tokens
+            tokens = {}
+    if tokens:
+        yield tokens
 
 
 def _parse_g_code(g: int, tokens: dict[str, float], modal: ModalState) -> bool:
@@ -123,16 +280,12 @@ def _parse_g_code(g: int, tokens: dict[str, float], modal: ModalState) -> bool:
     """
     # Motion commands (Group 1)
     if g in (0, 1, 2, 3):
-        modal.motion = f"G{g:02d}"
+        modal.motion = g
         return True
     
     # Plane selection (Group 2)
-    elif g == 17:
-        modal.plane = ModalState.PLANE_G17
-    elif g == 18:
-        modal.plane = ModalState.PLANE_G18
-    elif g == 19:
-        modal.plane = ModalState.PLANE_G19
+    elif g in (17, 18, 19):
+        modal.plane = g
     
     # Units (Group 6)
     elif g == 20:
@@ -164,25 +317,37 @@ def _parse_g_code(g: int, tokens: dict[str, float], modal: ModalState) -> bool:
 
 
 def parse_string(
-    content: str,
+    content: Union[str, bytes],
     initial_position: tuple[float, float, float] = (0.0, 0.0, 0.0),
     metric: bool = True,
-) -> tuple[list[dict[str, Any]], ModalState]:
+    include_modal_snapshot: bool = False,
+) -> tuple[Segments, ModalState]:
     """
-    Parse G-Code string and return a list of motion segments and final modal state.
-    Each segment has: type ('rapid'|'linear'|'arc_cw'|'arc_ccw'), start, end,
-    and for arcs: center, plane. Optional: feedrate, wcs.
+    Parse G-Code string and return the motion segments and final modal state.
+    Segments are returned as struct-of-arrays (see Segments); iterating it or
+    calling as_dicts() gives the per-segment dicts with: type ('rapid'|'linear'|
+    'arc_cw'|'arc_ccw'), start, end, plane, wcs, and for arcs: center,
+    start_angle, sweep_angle, radius. Optional: feedrate; "modal"
+    (ModalState.snapshot()) only when include_modal_snapshot=True.
+    content may also be ASCII bytes or another bytes-like buffer.
     """
-    segments: list[dict[str, Any]] = []
+    # Segment columns as typed, geometrically grown buffers (raw doubles and
+    # bytes, no per-segment objects), viewed as NumPy arrays at the end.
+    # The loop works on plain floats; segment i starts where segment i - 1
+    # ended, so starts are derived from ends instead of being collected.
+    ends = array("d")
+    centers = array("d")
+    type_ids = array("B")
+    plane_ids = array("B")
+    feedrates = array("d")
+    wcs_ids = array("B")
+    arc_params = array("d")
+    snapshots: Optional[list[dict[str, Any]]] = [] if include_modal_snapshot else None
     modal = ModalState()
-    modal.position = np.array(initial_position, dtype=np.float64)
+    px, py, pz = (float(v) for v in initial_position)
     units_scale = 1.0 if metric else 25.4  # inch -> mm for internal storage
 
-    for raw_line in content.splitlines():
-        tokens = _tokenize_line(raw_line)
-        if not tokens:
-            continue
-
+    for tokens in _iter_blocks(content):
         # Process G-codes
         if "G" in tokens:
             g = int(tokens["G"])
@@ -193,19 +358,16 @@ def parse_string(
             elif g == 21:
                 units_scale = 1.0
 
-        # Program end
         if "M" in tokens:
             m = int(tokens["M"])
+            # Program end
             if m in (2, 30):
                 break
             # Tool change
             elif m == 6 and "T" in tokens:
                 modal.tool_id = int(tokens["T"])
-
-        # Spindle control
-        if "M" in tokens:
-            m = int(tokens["M"])
-            if m == 3:
+            # Spindle control
+            elif m == 3:
                 modal.spindle_on = True
             elif m == 5:
                 modal.spindle_on = False
@@ -214,94 +376,82 @@ def parse_string(
         if "S" in tokens:
             modal.spindle_rpm = tokens["S"]
 
-        # Build end position (modal: missing axis keeps current value)
-        end = modal.position.copy()
-        if "X" in tokens:
-            x_val = tokens["X"] * units_scale
-            if modal.absolute:
-                end[0] = x_val
-            else:
-                end[0] += x_val
-        if "Y" in tokens:
-            y_val = tokens["Y"] * units_scale
-            if modal.absolute:
-                end[1] = y_val
-            else:
-                end[1] += y_val
-        if "Z" in tokens:
-            z_val = tokens["Z"] * units_scale
-            if modal.absolute:
-                end[2] = z_val
-            else:
-                end[2] += z_val
-
         if "F" in tokens:
             modal.feed_rate = tokens["F"]
 
-        # Arc center offsets (I, J, K) in current plane
-        center_offset = np.zeros(3)
-        if "I" in tokens:
-            center_offset[0] = tokens["I"] * units_scale
-        if "J" in tokens:
-            center_offset[1] = tokens["J"] * units_scale
-        if "K" in tokens:
-            center_offset[2] = tokens["K"] * units_scale
-
         # Emit segment only if there is a move (position or motion command with coordinates)
-        has_position = "X" in tokens or "Y" in tokens or "Z" in tokens
-        if not has_position:
+        x_val = tokens.get("X")
+        y_val = tokens.get("Y")
+        z_val = tokens.get("Z")
+        if x_val is None and y_val is None and z_val is None:
             continue
 
-        start = modal.position.copy()
-
-        # Determine motion type and create segment
-        if modal.motion == "G00":
-            seg = {
-                "type": "rapid",
-                "start": start.copy(),
-                "end": end.copy(),
-                "plane": modal.plane,
-                "wcs": modal.wcs,
-                "modal": modal.to_dict(),
-            }
-            if modal.feed_rate is not None:
-                seg["feedrate"] = modal.feed_rate
-            segments.append(seg)
-        elif modal.motion == "G01":
-            seg = {
-                "type": "linear",
-                "start": start.copy(),
-                "end": end.copy(),
-                "plane": modal.plane,
-                "wcs": modal.wcs,
-                "modal": modal.to_dict(),
-            }
-            if modal.feed_rate is not None:
-                seg["feedrate"] = modal.feed_rate
-            segments.append(seg)
-        elif modal.motion in ("G02", "G03"):
+        # Build end position (modal: missing axis keeps current value)
+        ex, ey, ez = px, py, pz
+        if x_val is not None:
+            x_val *= units_scale
+            ex = x_val if modal.absolute else px + x_val
+        if y_val is not None:
+            y_val *= units_scale
+            ey = y_val if modal.absolute else py + y_val
+        if z_val is not None:
+            z_val *= units_scale
+            ez = z_val if modal.absolute else pz + z_val
+
+        start = (px, py, pz)
+        end = (ex, ey, ez)
+        motion = modal.motion
+        plane = modal.plane
+        center = _NO_CENTER
+        params = _NO_ARC
+        if motion >= MotionType.ARC_CW:
+            # Arc center offsets (I, J, K) in current plane
+            ci = tokens.get("I", 0.0) * units_scale
+            cj = tokens.get("J", 0.0) * units_scale
+            ck = tokens.get("K", 0.0) * units_scale
             # Arc: center = start + (I,J,K) in plane
-            if modal.plane == "G17":  # XY
-                center = start + np.array([center_offset[0], center_offset[1], 0.0])
-            elif modal.plane == "G18":  # XZ
-                center = start + np.array([center_offset[0], 0.0, center_offset[2]])
+            if plane == 17:  # XY
+                center = (px + ci, py + cj, pz + 0.0)
+            elif plane == 18:  # XZ
+                center = (px + ci, py + 0.0, pz + ck)
             else:  # G19 YZ
-                center = start + np.array([0.0, center_offset[1], center_offset[2]])
-            seg = {
-                "type": "arc_cw" if modal.motion == "G02" else "arc_ccw",
-                "start": start.copy(),
-                "end": end.copy(),
-                "center": center.copy(),
-                "plane": modal.plane,
-                "wcs": modal.wcs,
-                "modal": modal.to_dict(),
-            }
-            if modal.feed_rate is not None:
-                seg["feedrate"] = modal.feed_rate
-            segments.append(seg)
-
-        modal.position = end.copy()
+                center = (px + 0.0, py + cj, pz + ck)
+            params = arc_geometry(start, end, center, motion == MotionType.ARC_CW, PLANE_AXES[plane])
+
+        ends.extend(end)
+        centers.extend(center)
+        type_ids.append(motion)
+        plane_ids.append(plane)
+        feedrates.append(np.nan if modal.feed_rate is None else modal.feed_rate)
+        wcs_ids.append(modal.wcs)
+        arc_params.extend(params)
+        if snapshots is not None:
+            modal.position = np.array(start)
+            snapshots.append(modal.snapshot())
 
+        px, py, pz = end
+
+    modal.position = np.array((px, py, pz))
+    n = len(type_ids)
+    ends_array = np.frombuffer(ends, dtype=np.float64).reshape(n, 3)
+    starts_array = np.empty_like(ends_array)
+    if n:
+        starts_array[0] = initial_position
+        starts_array[1:] = ends_array[:-1]
+    start_angle, sweep_angle, radius = np.frombuffer(arc_params, dtype=np.float64).reshape(n, 3).T.copy()
+    segments = Segments(
+        starts=starts_array,
+        ends=ends_array,
+        centers=np.frombuffer(centers, dtype=np.float64).reshape(n, 3),
+        type_id=np.frombuffer(type_ids, dtype=np.uint8),
+        plane_id=np.frombuffer(plane_ids, dtype=np.uint8),
+        feedrates=np.frombuffer(feedrates, dtype=np.float64),
+        wcs=np.frombuffer(wcs_ids, dtype=np.uint8),
+        start_angle=start_angle,
+        sweep_angle=sweep_angle,
+        radius=radius,
+        modal=snapshots,
+    )
     return segments, modal
 
 
@@ -310,14 +460,36 @@ def parse_file(
     initial_position: tuple[float, float, float] = (0.0, 0.0, 0.0),
     metric: bool = True,
     return_modal: bool = False,
-) -> Union[list[dict[str, Any]], tuple[list[dict[str, Any]], ModalState]]:
+    include_modal_snapshot: bool = False,
+) -> Union[Segments, tuple[Segments, ModalState]]:
     """
-    Parse a G-Code file and return list of motion segments.
+    Parse a G-Code file and return its motion segments (see Segments).
     If return_modal=True, also returns the final modal state.
+    include_modal_snapshot is passed to parse_string.
+    
+    The file is memory-mapped and an ASCII file (the normal case for
+    G-code) is parsed straight from the mapped bytes; anything else is
+    decoded as UTF-8 first.
     """
     path = Path(path)
-    content = path.read_text(encoding="utf-8", errors="replace")
-    segments, modal = parse_string(content, initial_position=initial_position, metric=metric)
+    with open(path, "rb") as f:
+        if path.stat().st_size == 0:
+            content: Union[str, bytes, mmap.mmap] = ""
+            mapped = None
+        else:
+            mapped = content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if _NON_ASCII.search(mapped):
+                content = mapped[:].decode("utf-8", errors="replace")
+        try:
+            segments, modal = parse_string(
+                content,
+                initial_position=initial_position,
+                metric=metric,
+                include_modal_snapshot=include_modal_snapshot,
+            )
+        finally:
+            if mapped is not None:
+                mapped.close()
     if return_modal:
         return segments, modal
     return segments
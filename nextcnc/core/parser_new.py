@@ -5,23 +5,59 @@ Uses lexer for tokenization.
 
 from __future__ import annotations
 
+from dataclasses import replace
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 import numpy as np
 
 from .lexer import (
     GCodeLexer, Token, TokenType, 
-    LexerError, tokenize, get_modal_group
+    LexerError, tokenize, ModalGroup, G_CODE_MODAL_GROUPS
 )
 from .ast_nodes import (
     ProgramNode, BlockNode, WordNode,
-    GCodeNode, MCodeNode, CoordinateNode, FeedNode, SpindleNode, ToolNode,
+    CoordinateNode, FeedNode, SpindleNode, ToolNode,
+    g_code_node, m_code_node,
+    KIND_G_CODE, KIND_M_CODE, KIND_COORDINATE, KIND_FEED,
     RapidMoveNode, LinearMoveNode, ArcMoveNode,
-    ModalStateNode, ToolpathSegment, create_segment_from_move,
+    ModalStateNode, ToolpathTable,
 )
 
 
+# Coordinate/arc address tokens -> CoordinateNode letter (all scaled by units)
+_COORD_LETTER = {
+    TokenType.ADDRESS_X: "X",
+    TokenType.ADDRESS_Y: "Y",
+    TokenType.ADDRESS_Z: "Z",
+    TokenType.ADDRESS_I: "I",
+    TokenType.ADDRESS_J: "J",
+    TokenType.ADDRESS_K: "K",
+    TokenType.ADDRESS_R: "R",
+}
+
+
+# Modal group -> (ModalStateNode field, field value for a G-code of the group)
+_GROUP_FIELDS = {
+    ModalGroup.GROUP_01_MOTION: ("motion_mode", lambda g: g),
+    ModalGroup.GROUP_02_PLANE: ("plane", lambda g: g),
+    ModalGroup.GROUP_03_DISTANCE: ("absolute", lambda g: g == 90),
+    ModalGroup.GROUP_06_UNITS: ("metric", lambda g: g == 21),
+    ModalGroup.GROUP_12_WCS: ("wcs", lambda g: g),
+    ModalGroup.GROUP_07_CUTTER_COMP: ("cutter_comp", lambda g: g),
+    ModalGroup.GROUP_08_TOOL_LENGTH: ("tool_length_comp", lambda g: g),
+    ModalGroup.GROUP_09_CANNED_RETURN: ("canned_return", lambda g: g),
+    ModalGroup.GROUP_10_CANNED: ("canned_cycle", lambda g: g),
+}
+
+# G-code -> (field, value) it sets, for every G-code of a tracked group
+_G_DISPATCH: dict[int, tuple[str, Any]] = {
+    g_code: (_GROUP_FIELDS[group][0], _GROUP_FIELDS[group][1](g_code))
+    for g_code, group in G_CODE_MODAL_GROUPS.items()
+    if group in _GROUP_FIELDS
+}
+
+
 class ParserError(Exception):
     """Parser error with context."""
     def __init__(self, message: str, token: Optional[Token] = None):
@@ -45,46 +81,37 @@ class ModalStateMachine:
     
     def save_state(self) -> None:
         """Save current state to history."""
-        self.history.append(self.state.clone())
+        self.history.append(self.state)
+    
+    def update(self, **changes: Any) -> None:
+        """Apply field changes, building a new snapshot only if something differs."""
+        state = self.state
+        for name, value in changes.items():
+            if getattr(state, name) != value:
+                self.state = replace(state, **changes)
+                return
     
     def update_from_g_code(self, g_code: int) -> None:
-        """Update modal state from G-code."""
-        group = get_modal_group(g_code)
-        if group is None:
-            return  # Unknown G-code
-        
-        # Update based on group
-        if group.name == "GROUP_01_MOTION":
-            self.state.motion_mode = g_code
-        elif group.name == "GROUP_02_PLANE":
-            self.state.plane = g_code
-        elif group.name == "GROUP_03_DISTANCE":
-            self.state.absolute = (g_code == 90)
-        elif group.name == "GROUP_06_UNITS":
-            self.state.metric = (g_code == 21)
-        elif group.name == "GROUP_12_WCS":
-            self.state.wcs = g_code
-        elif group.name == "GROUP_07_CUTTER_COMP":
-            self.state.cutter_comp = g_code
-        elif group.name == "GROUP_08_TOOL_LENGTH":
-            self.state.tool_length_comp = g_code
-        elif group.name == "GROUP_09_CANNED_RETURN":
-            self.state.canned_return = g_code
-        elif group.name == "GROUP_10_CANNED":
-            self.state.canned_cycle = g_code
+        """Update modal state from G-code (see _G_DISPATCH)."""
+        change = _G_DISPATCH.get(g_code)
+        if change is None:
+            return  # Unknown or non-modal G-code
+        name, value = change
+        if getattr(self.state, name) != value:
+            self.state = replace(self.state, **{name: value})
     
     def update_position(self, x: Optional[float], y: Optional[float], z: Optional[float]) -> None:
         """Update current position."""
-        if x is not None:
-            self.state.position[0] = x
-        if y is not None:
-            self.state.position[1] = y
-        if z is not None:
-            self.state.position[2] = z
+        state = self.state
+        self.update(
+            pos_x=state.pos_x if x is None else x,
+            pos_y=state.pos_y if y is None else y,
+            pos_z=state.pos_z if z is None else z,
+        )
     
     def get_state(self) -> ModalStateNode:
-        """Get current state copy."""
-        return self.state.clone()
+        """Get current state (immutable, shared until the next change)."""
+        return self.state
 
 
 class GCodeParser:
@@ -168,117 +195,107 @@ class GCodeParser:
         return program
     
     def parse_block(self) -> Optional[BlockNode]:
-        """Parse a single block (line)."""
+        """
+        Parse a single block (line).
+        
+        Walks self.tokens with a local index instead of current_token /
+        advance(); relies on the list ending with EOF, as tokenize() does.
+        """
         block = BlockNode()
+        comment_parts: list[str] = []
+        tokens = self.tokens
+        pos = self.pos
+        token = tokens[pos]
         
         # Check for block skip
-        if self.current_token.type == TokenType.BLOCK_SKIP:
+        if token.type == TokenType.BLOCK_SKIP:
             block.block_skip = True
-            self.advance()
+            pos += 1
+            token = tokens[pos]
         
         # Check for block number (N-code)
-        if self.current_token.type == TokenType.ADDRESS_N:
-            block.block_number = int(self.current_token.value)
-            self.advance()
+        if token.type == TokenType.ADDRESS_N:
+            block.block_number = int(token.value)
+            pos += 1
+            token = tokens[pos]
         
         # Parse words until newline or EOF
-        while self.current_token.type not in (
-            TokenType.NEWLINE, TokenType.EOF
-        ):
-            token = self.current_token
+        kind = token.type
+        while kind != TokenType.NEWLINE and kind != TokenType.EOF:
+            letter = _COORD_LETTER.get(kind)
+            
+            if letter is not None:
+                block.words.append(CoordinateNode(letter, token.value * self.units_scale))
             
-            if token.type in (TokenType.COMMENT, TokenType.COMMENT_SEMI):
-                if block.comment:
-                    block.comment += " " + str(token.value)
+            elif kind == TokenType.COMMENT or kind == TokenType.COMMENT_SEMI:
+                # Joined with spaces below; empty comments before the first
+                # non-empty one are dropped
+                text = str(token.value)
+                if text or comment_parts:
+                    comment_parts.append(text)
                 else:
-                    block.comment = str(token.value)
-                self.advance()
+                    block.comment = ""
             
-            elif token.type == TokenType.ADDRESS_G:
-                block.words.append(GCodeNode(token.value))
+            elif kind == TokenType.ADDRESS_G:
+                block.words.append(g_code_node(token.value))
                 self.modal.update_from_g_code(int(token.value))
-                self.advance()
             
-            elif token.type == TokenType.ADDRESS_M:
-                block.words.append(MCodeNode(token.value))
+            elif kind == TokenType.ADDRESS_M:
+                block.words.append(m_code_node(token.value))
                 # Handle M-codes
                 m_code = int(token.value)
                 if m_code in (3, 4):
-                    self.modal.state.spindle_on = True
+                    self.modal.update(spindle_on=True)
                 elif m_code == 5:
-                    self.modal.state.spindle_on = False
+                    self.modal.update(spindle_on=False)
                 elif m_code == 6:
                     # Tool change - tool should be set before
                     pass
                 elif m_code in (2, 30):
                     # Program end
                     pass
-                self.advance()
-            
-            elif token.type == TokenType.ADDRESS_X:
-                block.words.append(CoordinateNode("X", token.value * self.units_scale))
-                self.advance()
-            
-            elif token.type == TokenType.ADDRESS_Y:
-                block.words.append(CoordinateNode("Y", token.value * self.units_scale))
-                self.advance()
-            
-            elif token.type == TokenType.ADDRESS_Z:
-                block.words.append(CoordinateNode("Z", token.value * self.units_scale))
-                self.advance()
-            
-            elif token.type == TokenType.ADDRESS_I:
-                block.words.append(CoordinateNode("I", token.value * self.units_scale))
-                self.advance()
             
-            elif token.type == TokenType.ADDRESS_J:
-                block.words.append(CoordinateNode("J", token.value * self.units_scale))
-                self.advance()
-            
-            elif token.type == TokenType.ADDRESS_K:
-                block.words.append(CoordinateNode("K", token.value * self.units_scale))
-                self.advance()
-            
-            elif token.type == TokenType.ADDRESS_R:
-                block.words.append(CoordinateNode("R", token.value * self.units_scale))
-                self.advance()
-            
-            elif token.type == TokenType.ADDRESS_F:
+            elif kind == TokenType.ADDRESS_F:
                 block.words.append(FeedNode(token.value))
-                self.modal.state.feed_rate = token.value
-                self.advance()
+                self.modal.update(feed_rate=token.value)
             
-            elif token.type == TokenType.ADDRESS_S:
+            elif kind == TokenType.ADDRESS_S:
                 block.words.append(SpindleNode(token.value))
-                self.modal.state.spindle_rpm = token.value
-                self.advance()
+                self.modal.update(spindle_rpm=token.value)
             
-            elif token.type == TokenType.ADDRESS_T:
+            elif kind == TokenType.ADDRESS_T:
                 block.words.append(ToolNode(token.value))
-                self.modal.state.tool_id = int(token.value)
-                self.advance()
+                self.modal.update(tool_id=int(token.value))
             
-            else:
-                # Skip unknown tokens
-                self.advance()
+            # Unknown tokens are skipped
+            pos += 1
+            token = tokens[pos]
+            kind = token.type
         
         # Skip newline
-        if self.current_token.type == TokenType.NEWLINE:
-            self.advance()
+        if kind == TokenType.NEWLINE:
+            pos += 1
+        self.pos = pos
         
+        if comment_parts:
+            block.comment = " ".join(comment_parts)
         return block if block.words or block.comment else None
     
-    def interpret_to_segments(self) -> list[ToolpathSegment]:
+    def interpret_to_segments(self, program: Optional[ProgramNode] = None) -> ToolpathTable:
         """
         Parse and interpret to toolpath segments.
-        This combines parsing with motion interpretation.
+        This combines parsing with motion interpretation; pass an already
+        parsed ``program`` to skip the parse step.
         """
-        segments = []
-        program = self.parse()
+        segments = ToolpathTable()
+        if program is None:
+            program = self.parse()
         
         # Reset state for interpretation
         self.modal = ModalStateMachine()
-        position = np.zeros(3)
+        # Current position is kept out of the frozen modal snapshot so moves
+        # don't build one ModalStateNode each; None means the modal position.
+        position = None
         
         for block in program.blocks:
             # Skip block delete
@@ -293,22 +310,24 @@ class GCodeParser:
             has_motion = False
             
             for word in block.words:
-                if isinstance(word, GCodeNode):
+                kind = word.KIND
+                if kind == KIND_G_CODE:
                     self.modal.update_from_g_code(int(word.value))
                     has_motion = True
-                elif isinstance(word, MCodeNode):
+                elif kind == KIND_M_CODE:
                     m_code = int(word.value)
                     if m_code in (2, 30):
                         # Program end
+                        self._sync_position(position)
                         return segments
-                elif isinstance(word, CoordinateNode):
+                elif kind == KIND_COORDINATE:
                     if word.letter in coords:
                         coords[word.letter] = word.value
                     elif word.letter in ijk:
                         ijk[word.letter] = word.value
                     elif word.letter == "R":
                         r = word.value
-                elif isinstance(word, FeedNode):
+                elif kind == KIND_FEED:
                     feed = word.value
             
             # Create motion command based on modal state
@@ -347,37 +366,38 @@ class GCodeParser:
                 continue
             
             # Create segment
-            segment = create_segment_from_move(
+            row = segments.append_move(
                 move, position, self.modal.get_state(), block.block_number
             )
-            segments.append(segment)
             
-            # Update position
-            position = segment.end_pos.copy()
-            self.modal.state.position = position.copy()
+            # Update position (rows before the last one are never rewritten)
+            position = segments.end[row]
         
+        self._sync_position(position)
         return segments
+    
+    def _sync_position(self, position: Optional[np.ndarray]) -> None:
+        """Write the final interpreted position back into the modal state."""
+        if position is not None:
+            self.modal.update_position(*position.tolist())
+    
+    def parse_and_interpret(self) -> tuple[ProgramNode, ToolpathTable]:
+        """Parse once and interpret the same AST into segments."""
+        program = self.parse()
+        return program, self.interpret_to_segments(program)
 
 
 # ============================================================================
 # Convenience functions
 # ============================================================================
 
-def parse_string(text: str) -> tuple[ProgramNode, list[ToolpathSegment]]:
+def parse_string(text: str) -> tuple[ProgramNode, ToolpathTable]:
     """Parse G-code string to AST and segments."""
-    tokens = tokenize(text)
-    parser = GCodeParser(tokens)
-    ast = parser.parse()
-    
-    # Re-parse for segments (resets state)
-    tokens = tokenize(text)
-    parser2 = GCodeParser(tokens)
-    segments = parser2.interpret_to_segments()
-    
-    return ast, segments
+    parser = GCodeParser(tokenize(text))
+    return parser.parse_and_interpret()
 
 
-def parse_file(path: str | Path) -> tuple[ProgramNode, list[ToolpathSegment]]:
+def parse_file(path: str | Path) -> tuple[ProgramNode, ToolpathTable]:
     """Parse G-code file to AST and segments."""
     path = Path(path)
     text = path.read_text(encoding="utf-8", errors="replace")
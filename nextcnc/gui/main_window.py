@@ -4,19 +4,25 @@ NextCNC main window: dashboard with 3D simulation and stock removal.
 
 from __future__ import annotations
 
+import time
+from collections import OrderedDict
+from dataclasses import astuple
 from pathlib import Path
+from typing import Optional
 
 import numpy as np
 
 from nextcnc.qt_compat import QFileDialog, QMainWindow, QMessageBox, Qt
 from nextcnc.qt_compat import QMenu, QMenuBar, QToolBar, QStatusBar
 from nextcnc.qt_compat import QDockWidget, QWidget, QVBoxLayout, QLabel, QPushButton
+from nextcnc.qt_compat import QObject, QProgressBar, QThread, Signal, Slot
 
-from nextcnc.core.parser import parse_file
+from nextcnc.core.parser import Segments, parse_file
 from nextcnc.core.kinematics import (
     segments_to_points,
     Kinematics3Axis,
     MachineConfig,
+    limit_error_messages,
     process_segments_with_machine,
 )
 from nextcnc.simulation.renderer import SimulationWidget
@@ -25,12 +31,54 @@ from nextcnc.simulation.stock_model import (
 )
 
 
+class SimulationWorker(QObject):
+    """Runs StockSimulator.simulate_toolpath on a worker QThread."""
+    
+    progress = Signal(float)
+    finished = Signal(dict)
+    failed = Signal(str)
+    
+    def __init__(self, simulator: StockSimulator, segments: Segments, tool: Tool):
+        super().__init__()
+        self._simulator = simulator
+        self._segments = segments
+        self._tool = tool
+        # Set from the GUI thread by cancel(), read between progress chunks
+        self._cancelled = False
+    
+    def cancel(self) -> None:
+        """Ask run() to stop at its next progress chunk (thread-safe)."""
+        self._cancelled = True
+    
+    def _is_cancelled(self) -> bool:
+        return self._cancelled
+    
+    @Slot()
+    def run(self) -> None:
+        """
+        Simulate the toolpath and emit finished(stats) or failed(message);
+        a cancelled run emits neither.
+        """
+        try:
+            stats = self._simulator.simulate_toolpath(
+                self._segments, self._tool, on_progress=self.progress.emit,
+                should_stop=self._is_cancelled,
+            )
+        except Exception as e:
+            if not self._cancelled:
+                self.failed.emit(str(e))
+        else:
+            if not self._cancelled:
+                self.finished.emit(stats)
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("NextCNC - G-Code Simulation")
         self.setMinimumSize(1000, 700)
         self.resize(1200, 800)
+        self._statusbar = self.statusBar()
 
         # Initialize components
         self.kinematics = Kinematics3Axis()
@@ -43,13 +91,23 @@ class MainWindow(QMainWindow):
             length=50.0
         )
         
-        self.segments: list[dict] = []
+        self.segments: Optional[Segments] = None
         self.modal_state = None
+        
+        # Identity of the loaded file (path, mtime, size), and the last few
+        # process_segments_with_machine results keyed by it + the machine setup
+        self._segments_key: Optional[tuple] = None
+        self._proc_cache: OrderedDict[tuple, tuple] = OrderedDict()
+        
+        # Stock simulation running in the background, if any
+        self._sim_thread: Optional[QThread] = None
+        self._sim_worker: Optional[SimulationWorker] = None
+        self._last_progress_ts = 0.0  # time.monotonic() of the last progress update
 
         self._setup_ui()
         self._build_menu()
         
-        self.statusBar().showMessage("Hazır - G-Code dosyası açın (Ctrl+O)")
+        self._statusbar.showMessage("Hazır - G-Code dosyası açın (Ctrl+O)")
 
     def _setup_ui(self) -> None:
         """Setup main UI components."""
@@ -80,6 +138,12 @@ class MainWindow(QMainWindow):
         layout.addWidget(self._stock_percent_label)
         layout.addWidget(self._stock_aircut_label)
         
+        # Simulation progress
+        self._progress_bar = QProgressBar()
+        self._progress_bar.setRange(0, 100)
+        self._progress_bar.setValue(0)
+        layout.addWidget(self._progress_bar)
+        
         layout.addStretch()
         
         # Simulate button
@@ -156,7 +220,7 @@ class MainWindow(QMainWindow):
         try:
             config = MachineConfig.from_json(path)
             self.kinematics = Kinematics3Axis(config)
-            self.statusBar().showMessage(f"Makine yüklendi: {config.name}")
+            self._statusbar.showMessage(f"Makine yüklendi: {config.name}")
             if self.segments:
                 self._process_and_display()
         except Exception as e:
@@ -164,11 +228,13 @@ class MainWindow(QMainWindow):
 
     def _on_stock_config(self) -> None:
         """Configure stock settings."""
+        if self._simulation_running():
+            return
         # For now, just reset with default config
         # In future, open a dialog
         self.stock_simulator = StockSimulator(StockConfig())
         self._update_stock_display()
-        self.statusBar().showMessage("Stock ayarları sıfırlandı")
+        self._statusbar.showMessage("Stock ayarları sıfırlandı")
 
     def _load_gcode(self, path: str) -> None:
         """Load and parse G-code file."""
@@ -177,6 +243,8 @@ class MainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Parse Hatası", f"G-Code okunamadı:\n{e}")
             return
+        stat = Path(path).stat()
+        self._segments_key = (str(Path(path).resolve()), stat.st_mtime_ns, stat.st_size)
         
         self._process_and_display()
         self.setWindowTitle(f"NextCNC - {Path(path).name}")
@@ -189,15 +257,17 @@ class MainWindow(QMainWindow):
         if not self.segments:
             return
         
-        # Process with kinematics
-        points, states = process_segments_with_machine(
-            self.segments, self.kinematics, num_samples=32
-        )
+        points, states = self._processed_toolpath()
         
-        # Check for limit errors
-        limit_errors = [s for s in states if not s.limits_ok]
+        # Check for limit errors; the first offending point is spelled out
+        limit_errors = int(np.count_nonzero(~states.limits_ok))
+        limit_info = ""
         if limit_errors:
-            self.statusBar().showMessage(f"UYARI: {len(limit_errors)} noktada eksen limit aşımı")
+            index, errors = limit_error_messages(states, self.kinematics.config, max_count=1)[0]
+            limit_info = (
+                f" | UYARI: {limit_errors} noktada eksen limit aşımı"
+                f" (ilk: nokta {index}, {'; '.join(errors)})"
+            )
         
         # Display toolpath
         self._sim_widget.set_points(points)
@@ -205,19 +275,60 @@ class MainWindow(QMainWindow):
         # Show stats
         wcs_info = f"WCS: G{54 + self.kinematics.wcs.active_wcs}"
         pos = self.kinematics.current_state.position_work
-        self.statusBar().showMessage(
+        self._statusbar.showMessage(
             f"{len(points)} nokta | {wcs_info} | "
             f"Son pozisyon: ({pos[0]:.2f}, {pos[1]:.2f}, {pos[2]:.2f})"
+            f"{limit_info}"
         )
 
+    def _simulation_running(self) -> bool:
+        """True (and says so in the status bar) while a stock simulation runs."""
+        if self._sim_thread is None:
+            return False
+        self._statusbar.showMessage("Simülasyon zaten çalışıyor...")
+        return True
+
+    def _processed_toolpath(self) -> tuple[np.ndarray, np.recarray]:
+        """
+        process_segments_with_machine() for the loaded segments and current
+        machine, reusing the result when the same file and machine setup
+        were processed recently.
+        """
+        kinematics = self.kinematics
+        key = (
+            self._segments_key,
+            astuple(kinematics.config),
+            kinematics.wcs.offsets.tobytes(),
+        )
+        cached = self._proc_cache.get(key)
+        if cached is None:
+            # Process with kinematics; arcs are sampled to a 0.01 mm chord error
+            cached = process_segments_with_machine(
+                self.segments, kinematics, chord_tol=0.01, dtype=np.float32
+            )
+            self._proc_cache[key] = cached
+            if len(self._proc_cache) > 4:
+                self._proc_cache.popitem(last=False)
+        else:
+            self._proc_cache.move_to_end(key)
+            # Leave the engine at the last point, as processing would
+            states = cached[1]
+            if len(states):
+                last = states[-1]
+                kinematics.set_wcs(int(last.active_wcs))
+                kinematics.move_to_work(x=last.x_work, y=last.y_work, z=last.z_work)
+        return cached
+
     def _run_stock_simulation(self) -> None:
-        """Run material removal simulation."""
+        """Start material removal simulation on a worker thread."""
         if not self.segments:
             QMessageBox.information(self, "Bilgi", "Önce G-Code dosyası açın")
             return
+        if self._simulation_running():
+            return
         
         try:
-            self.statusBar().showMessage("Stok yapılandırılıyor...")
+            self._statusbar.showMessage("Stok yapılandırılıyor...")
             
             # Configure stock to cover toolpath
             self._auto_configure_stock()
@@ -234,38 +345,60 @@ class MainWindow(QMainWindow):
                 if reply == QMessageBox.StandardButton.No:
                     return
             
-            # Run simulation with fewer samples for speed
             self.stock_simulator.set_tool(self.current_tool)
-            self.statusBar().showMessage("Simülasyon çalışıyor...")
-            
-            # Process events to keep UI responsive
-            from PyQt6.QtWidgets import QApplication
-            QApplication.processEvents()
-            
-            stats = self.stock_simulator.simulate_toolpath(
-                self.segments,
-                self.current_tool,
-                on_progress=lambda p: self._update_progress(p)
-            )
-            
-            # Update display
-            self._update_stock_display()
-            self._update_stock_stats(stats)
-            
-            self.statusBar().showMessage(
-                f"Simülasyon tamamlandı - Kaldırılan: {stats['removed_volume_mm3']:.1f} mm³"
-            )
-            
         except Exception as e:
             QMessageBox.critical(self, "Simülasyon Hatası", str(e))
+            return
+        
+        self._statusbar.showMessage("Simülasyon çalışıyor...")
+        self._progress_bar.setValue(0)
+        
+        # The simulator is only touched by the worker until finished/failed
+        thread = QThread(self)
+        worker = SimulationWorker(self.stock_simulator, self.segments, self.current_tool)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.progress.connect(self._update_progress)
+        worker.finished.connect(self._on_simulation_finished)
+        worker.failed.connect(self._on_simulation_failed)
+        worker.finished.connect(thread.quit)
+        worker.failed.connect(thread.quit)
+        thread.finished.connect(self._on_simulation_thread_done)
+        self._sim_thread = thread
+        self._sim_worker = worker
+        thread.start()
     
+    @Slot(float)
     def _update_progress(self, pct: float) -> None:
-        """Update progress bar/status."""
-        self.statusBar().showMessage(f"Simülasyon: %{pct:.0f}")
-        # Process events every 10% to keep UI responsive
-        if int(pct) % 10 == 0:
-            from PyQt6.QtWidgets import QApplication
-            QApplication.processEvents()
+        """Update the progress bar (at most ~30 times per second)."""
+        now = time.monotonic()
+        if now - self._last_progress_ts < 0.033:
+            return
+        self._last_progress_ts = now
+        self._progress_bar.setValue(int(pct))
+    
+    @Slot(dict)
+    def _on_simulation_finished(self, stats: dict) -> None:
+        """Show the result of a finished simulation."""
+        self._progress_bar.setValue(100)
+        self._update_stock_display()
+        self._update_stock_stats(stats)
+        self._statusbar.showMessage(
+            f"Simülasyon tamamlandı - Kaldırılan: {stats['removed_volume_mm3']:.1f} mm³"
+        )
+    
+    @Slot(str)
+    def _on_simulation_failed(self, message: str) -> None:
+        """Report a simulation error."""
+        QMessageBox.critical(self, "Simülasyon Hatası", message)
+    
+    @Slot()
+    def _on_simulation_thread_done(self) -> None:
+        """Release the worker thread once its event loop has stopped."""
+        self._sim_worker.deleteLater()
+        self._sim_thread.deleteLater()
+        self._sim_worker = None
+        self._sim_thread = None
 
     def _auto_configure_stock(self) -> None:
         """Auto-configure stock to fit toolpath with smart resolution."""
@@ -273,14 +406,8 @@ class MainWindow(QMainWindow):
             return
         
         # Find bounds
-        all_points = []
-        for seg in self.segments:
-            all_points.append(seg["start"])
-            all_points.append(seg["end"])
-        
-        points = np.array(all_points)
-        min_coords = points.min(axis=0)
-        max_coords = points.max(axis=0)
+        min_coords = np.minimum(self.segments.starts.min(axis=0), self.segments.ends.min(axis=0))
+        max_coords = np.maximum(self.segments.starts.max(axis=0), self.segments.ends.max(axis=0))
         
         # Calculate dimensions
         width = max_coords[0] - min_coords[0]
@@ -312,14 +439,17 @@ class MainWindow(QMainWindow):
             resolution=resolution,
         )
         
-        self.stock_simulator = StockSimulator(config)
+        # Same stock as last time: keep the simulator, whose board (and the
+        # uploaded stock mesh) is then only refreshed where it was cut
+        if config != self.stock_simulator.config:
+            self.stock_simulator = StockSimulator(config)
 
     def _update_stock_display(self) -> None:
         """Update OpenGL display with stock mesh."""
-        mesh_data = self.stock_simulator.get_mesh_for_render()
+        mesh_data = self.stock_simulator.get_mesh_for_render(with_dirty_ranges=True)
         if mesh_data:
-            vertices, indices = mesh_data
-            self._sim_widget.set_stock_mesh(vertices, indices)
+            vertices, indices, dirty_ranges = mesh_data
+            self._sim_widget.set_stock_mesh(vertices, indices, dirty_ranges)
 
     def _update_stock_stats(self, stats: dict) -> None:
         """Update stock statistics in UI."""
@@ -328,9 +458,19 @@ class MainWindow(QMainWindow):
         self._stock_percent_label.setText(f"İlerleme: %{stats['removal_percent']:.2f}")
         self._stock_aircut_label.setText(f"Air-cut segment: {stats['air_cut_segments']}")
 
+    def closeEvent(self, event) -> None:
+        """Stop a running simulation and wait for its thread before closing."""
+        if self._sim_thread is not None:
+            self._sim_worker.cancel()
+            self._sim_thread.quit()
+            self._sim_thread.wait()
+        super().closeEvent(event)
+
     def _reset_stock(self) -> None:
         """Reset stock simulation."""
+        if self._simulation_running():
+            return
         self.stock_simulator.reset()
         self._update_stock_display()
         self._update_stock_stats(self.stock_simulator.get_stats())
-        self.statusBar().showMessage("Stock sıfırlandı")
+        self._statusbar.showMessage("Stock sıfırlandı")
@@ -4,7 +4,7 @@ Install either: pip install PySide6  OR  pip install PyQt6
 """
 
 try:
-    from PySide6.QtCore import Qt
+    from PySide6.QtCore import QObject, QThread, QTimer, Qt, Signal, Slot
     from PySide6.QtGui import QSurfaceFormat
     from PySide6.QtWidgets import (
         QApplication,
@@ -19,12 +19,15 @@ try:
         QWidget,
         QVBoxLayout,
         QLabel,
+        QProgressBar,
         QPushButton,
     )
     from PySide6.QtOpenGLWidgets import QOpenGLWidget
     __binding__ = "PySide6"
 except ImportError:
-    from PyQt6.QtCore import Qt
+    from PyQt6.QtCore import QObject, QThread, QTimer, Qt
+    from PyQt6.QtCore import pyqtSignal as Signal
+    from PyQt6.QtCore import pyqtSlot as Slot
     from PyQt6.QtGui import QSurfaceFormat
     from PyQt6.QtWidgets import (
         QApplication,
@@ -39,6 +42,7 @@ except ImportError:
         QWidget,
         QVBoxLayout,
         QLabel,
+        QProgressBar,
         QPushButton,
     )
     from PyQt6.QtOpenGLWidgets import QOpenGLWidget
@@ -46,6 +50,11 @@ except ImportError:
 
 __all__ = [
     "Qt",
+    "QObject",
+    "QThread",
+    "QTimer",
+    "Signal",
+    "Slot",
     "QSurfaceFormat",
     "QApplication",
     "QFileDialog",
@@ -60,5 +69,6 @@ __all__ = [
     "QWidget",
     "QVBoxLayout",
     "QLabel",
+    "QProgressBar",
     "QPushButton",
 ]
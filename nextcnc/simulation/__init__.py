@@ -1,3 +1,10 @@
-from nextcnc.simulation.renderer import SimulationWidget
-
 __all__ = ["SimulationWidget"]
+
+
+def __getattr__(name: str):
+    # The renderer needs Qt and PyOpenGL; import it on first use so the
+    # stock model can be used (and tested) without a GL stack
+    if name == "SimulationWidget":
+        from nextcnc.simulation.renderer import SimulationWidget
+        return SimulationWidget
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,13 +6,17 @@ AABB (Axis-Aligned Bounding Box) broad-phase and basic narrow-phase.
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Optional, List, Tuple, Dict
+from typing import Optional, List, Sequence, Tuple
 from enum import Enum, auto
 
 import numpy as np
 from numpy.typing import NDArray
 
 
+# (min_x, min_y, min_z, max_x, max_y, max_z)
+Bounds6 = Tuple[float, float, float, float, float, float]
+
+
 class CollisionType(Enum):
     """Types of collisions in CNC."""
     TOOL_STOCK = auto()      # Tool cutting stock (normal)
@@ -22,7 +26,7 @@ class CollisionType(Enum):
     AXIS_LIMIT = auto()      # Machine axis limit exceeded
 
 
-@dataclass
+@dataclass(slots=True)
 class BoundingBox:
     """Axis-Aligned Bounding Box."""
     min_x: float = 0.0
@@ -53,8 +57,24 @@ class BoundingBox:
     @property
     def volume(self) -> float:
         """Box volume."""
-        sx, sy, sz = self.size
-        return sx * sy * sz
+        return ((self.max_x - self.min_x) * (self.max_y - self.min_y)
+                * (self.max_z - self.min_z))
+    
+    def as_tuple(self) -> Bounds6:
+        """``(min_x, min_y, min_z, max_x, max_y, max_z)`` as plain floats."""
+        return (self.min_x, self.min_y, self.min_z, self.max_x, self.max_y, self.max_z)
+    
+    def as_array(self) -> NDArray:
+        """Packed ``[min_x, min_y, min_z, max_x, max_y, max_z]`` float array."""
+        return np.array([
+            self.min_x, self.min_y, self.min_z,
+            self.max_x, self.max_y, self.max_z,
+        ])
+    
+    @classmethod
+    def from_array(cls, bounds: NDArray) -> "BoundingBox":
+        """Create AABB from a packed ``[mins, maxs]`` 6-float array."""
+        return cls(*(float(v) for v in bounds[:6]))
     
     @classmethod
     def from_points(cls, points: NDArray) -> "BoundingBox":
@@ -73,25 +93,22 @@ class BoundingBox:
     @classmethod
     def from_sphere(cls, center: np.ndarray, radius: float) -> "BoundingBox":
         """Create AABB from sphere."""
-        return cls(
-            min_x=center[0] - radius,
-            max_x=center[0] + radius,
-            min_y=center[1] - radius,
-            max_y=center[1] + radius,
-            min_z=center[2] - radius,
-            max_z=center[2] + radius,
-        )
+        cx, cy, cz = float(center[0]), float(center[1]), float(center[2])
+        return cls(cx - radius, cy - radius, cz - radius,
+                   cx + radius, cy + radius, cz + radius)
     
     @classmethod
     def from_cylinder(cls, p1: np.ndarray, p2: np.ndarray, radius: float) -> "BoundingBox":
         """Create AABB from cylinder."""
+        x1, y1, z1 = float(p1[0]), float(p1[1]), float(p1[2])
+        x2, y2, z2 = float(p2[0]), float(p2[1]), float(p2[2])
         return cls(
-            min_x=min(p1[0], p2[0]) - radius,
-            max_x=max(p1[0], p2[0]) + radius,
-            min_y=min(p1[1], p2[1]) - radius,
-            max_y=max(p1[1], p2[1]) + radius,
-            min_z=min(p1[2], p2[2]) - radius,
-            max_z=max(p1[2], p2[2]) + radius,
+            min_x=(x1 if x1 < x2 else x2) - radius,
+            max_x=(x2 if x1 < x2 else x1) + radius,
+            min_y=(y1 if y1 < y2 else y2) - radius,
+            max_y=(y2 if y1 < y2 else y1) + radius,
+            min_z=(z1 if z1 < z2 else z2) - radius,
+            max_z=(z2 if z1 < z2 else z1) + radius,
         )
     
     def intersects(self, other: "BoundingBox") -> bool:
@@ -104,10 +121,12 @@ class BoundingBox:
     
     def contains_point(self, point: np.ndarray) -> bool:
         """Check if point is inside this AABB."""
+        # Plain floats: chained compares on NumPy scalars are several times slower
+        px, py, pz = float(point[0]), float(point[1]), float(point[2])
         return (
-            self.min_x <= point[0] <= self.max_x and
-            self.min_y <= point[1] <= self.max_y and
-            self.min_z <= point[2] <= self.max_z
+            self.min_x <= px <= self.max_x and
+            self.min_y <= py <= self.max_y and
+            self.min_z <= pz <= self.max_z
         )
     
     def expand_to_include(self, other: "BoundingBox") -> None:
@@ -142,7 +161,7 @@ class BoundingBox:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Collider:
     """Base class for collidable objects."""
     name: str
@@ -151,19 +170,20 @@ class Collider:
     
     def get_bbox_at_position(self, position: np.ndarray) -> BoundingBox:
         """Get AABB at specific position."""
+        return BoundingBox(*self.get_bounds_at_position(position))
+    
+    def get_bounds_at_position(self, position: np.ndarray) -> Bounds6:
+        """Get AABB at specific position as a 6-tuple (no BoundingBox allocation)."""
         # Default: just translate bbox
-        offset = position - self.bbox.center
-        return BoundingBox(
-            min_x=self.bbox.min_x + offset[0],
-            max_x=self.bbox.max_x + offset[0],
-            min_y=self.bbox.min_y + offset[1],
-            max_y=self.bbox.max_y + offset[1],
-            min_z=self.bbox.min_z + offset[2],
-            max_z=self.bbox.max_z + offset[2],
-        )
+        b = self.bbox
+        ox = position[0] - (b.min_x + b.max_x) / 2
+        oy = position[1] - (b.min_y + b.max_y) / 2
+        oz = position[2] - (b.min_z + b.max_z) / 2
+        return (b.min_x + ox, b.min_y + oy, b.min_z + oz,
+                b.max_x + ox, b.max_y + oy, b.max_z + oz)
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCollider(Collider):
     """Tool collider with cylindrical shape approximation."""
     diameter: float = 10.0
@@ -183,7 +203,7 @@ class ToolCollider(Collider):
         return holder_position - np.array([0, 0, self.length])
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolHolderCollider(Collider):
     """Tool holder collider."""
     diameter: float = 40.0
@@ -198,6 +218,8 @@ class ToolHolderCollider(Collider):
         )
 
 
+# Hand-written __init__ calls zero-argument super(), which breaks on the
+# class copy slots=True creates; these stay regular dataclasses
 @dataclass
 class StockCollider(Collider):
     """Stock material collider."""
@@ -220,7 +242,7 @@ class FixtureCollider(Collider):
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class CollisionEvent:
     """A detected collision event."""
     collider_a: str
@@ -237,100 +259,206 @@ class CollisionEvent:
                 f"depth={self.penetration_depth:.3f}mm)")
 
 
+def _packed_query(bounds: Bounds6) -> Bounds6:
+    """
+    Query row for ``[mins, -maxs]`` packed boxes: ``box_min <= q_max`` and
+    ``-box_max <= -q_min`` test all six overlap conditions in one compare.
+    """
+    return (bounds[3], bounds[4], bounds[5], -bounds[0], -bounds[1], -bounds[2])
+
+
+# Gather index repeating a point's xyz to offset [mins, maxs] bounds
+_XYZ_XYZ = np.array([0, 1, 2, 0, 1, 2])
+
+
+def _round_down_f32(values: NDArray) -> NDArray:
+    """Largest float32 values not above values (conservative lower bounds)."""
+    rounded = values.astype(np.float32)
+    return np.where(rounded > values, np.nextafter(rounded, np.float32(-np.inf)), rounded)
+
+
+def _round_up_f32(values: NDArray) -> NDArray:
+    """Smallest float32 values not below values (conservative upper bounds)."""
+    rounded = values.astype(np.float32)
+    return np.where(rounded < values, np.nextafter(rounded, np.float32(np.inf)), rounded)
+
+
+def _half_area(extents: NDArray) -> NDArray:
+    """Half surface area of boxes with (..., 3) extents (SAH only needs ratios)."""
+    dx, dy, dz = extents[..., 0], extents[..., 1], extents[..., 2]
+    return dx * dy + dy * dz + dz * dx
+
+
+# One row per detected hit; kind 0 is tool vs stock, 1 is holder vs stock/fixture
+COLLISION_RECORD_DTYPE = np.dtype([
+    ("step", np.int32),        # Index of the sampled position
+    ("collider", np.int32),    # Index into CollisionDetector.static_colliders
+    ("kind", np.int8),
+    ("position", np.float64, (3,)),
+    ("depth", np.float64),
+])
+
+
+# Lanes of a padded 8-float tree node row holding the 6 packed bounds
+_PACKED_LANES = np.array([0, 1, 2, 4, 5, 6])
+
+# Tip positions x static boxes evaluated per check_path pass
+_PATH_CHUNK_BOXES = 1 << 16
+
+
 class AABBTree:
     """
     Simple AABB tree for broad-phase collision detection.
     Groups colliders spatially for efficient queries.
+    
+    Nodes live in flat arrays indexed by node id (root is 0): ``node_mins`` /
+    ``node_maxs`` hold the (K, 3) float32 bounds, rounded outward so the tree
+    never drops a candidate, ``left_child`` / ``right_child`` the
+    child ids (-1 for leaves), and leaves own ``prim_count`` entries of
+    ``prim_indices`` starting at ``first_prim``.
     """
     
     def __init__(self, max_depth: int = 4):
         self.max_depth = max_depth
-        self.root: Optional[Dict] = None
         self.colliders: List[Collider] = []
+        self.node_mins: NDArray = np.empty((0, 3), dtype=np.float32)
+        self.node_maxs: NDArray = np.empty((0, 3), dtype=np.float32)
+        self.left_child: NDArray = np.empty(0, dtype=np.int32)
+        self.right_child: NDArray = np.empty(0, dtype=np.int32)
+        self.first_prim: NDArray = np.empty(0, dtype=np.int32)
+        self.prim_count: NDArray = np.empty(0, dtype=np.int32)
+        self.prim_indices: NDArray = np.empty(0, dtype=np.int32)
+        # 32-byte [mins, 0, -maxs, 0] rows: overlap with a query is one ``<=``
+        # against [q_max, inf, -q_min, inf] (the pad lanes always pass)
+        self._node_packed: NDArray = np.empty((0, 8), dtype=np.float32)
+        # left_child, right_child, first_prim, prim_count as lists for traversal
+        self._links: Tuple[List[int], ...] = ([], [], [], [])
     
     def build(self, colliders: List[Collider]) -> None:
         """Build AABB tree from colliders."""
         self.colliders = colliders
-        if not colliders:
-            self.root = None
-            return
+        bounds = np.array([c.bbox.as_array() for c in colliders]).reshape(-1, 6)
+        centers = (bounds[:, :3] + bounds[:, 3:]) / 2
+        prims = np.arange(len(colliders), dtype=np.int32)
         
-        # Compute global bounds
-        global_bbox = colliders[0].bbox
-        for c in colliders[1:]:
-            global_bbox.expand_to_include(c.bbox)
+        mins: List[NDArray] = []
+        maxs: List[NDArray] = []
+        left: List[int] = []
+        right: List[int] = []
+        first: List[int] = []
+        count: List[int] = []
         
-        # Build tree
-        self.root = self._build_node(colliders, global_bbox, 0)
-    
-    def _build_node(self, colliders: List[Collider], bbox: BoundingBox, depth: int) -> Dict:
-        """Recursively build tree node."""
-        # Base case: store colliders at this node
-        if depth >= self.max_depth or len(colliders) <= 2:
-            return {
-                "bbox": bbox,
-                "colliders": colliders,
-                "children": [],
-            }
-        
-        # Split along longest axis
-        size = bbox.size
-        axis = int(np.argmax(size))
-        
-        # Sort colliders by center on split axis
-        sorted_colliders = sorted(
-            colliders,
-            key=lambda c: c.bbox.center[axis]
-        )
+        def build_node(lo: int, hi: int, depth: int) -> int:
+            """Emit node for prims[lo:hi] and its subtree; return its id."""
+            idx = prims[lo:hi]
+            node = len(mins)
+            mins.append(bounds[idx, :3].min(axis=0))
+            maxs.append(bounds[idx, 3:].max(axis=0))
+            left.append(-1)
+            right.append(-1)
+            first.append(lo)
+            count.append(hi - lo)
+            if depth >= self.max_depth or hi - lo <= 2:
+                return node
+            
+            split = self._sah_split(bounds[idx], centers[idx])
+            if split is None:
+                # Degenerate centers: split along longest axis at the median
+                sx, sy, sz = (maxs[node] - mins[node]).tolist()
+                axis = 0 if sx >= sy and sx >= sz else (1 if sy >= sz else 2)
+                prims[lo:hi] = idx[np.argsort(centers[idx, axis], kind="stable")]
+                mid = lo + (hi - lo) // 2
+            else:
+                prims[lo:hi] = np.concatenate((idx[split], idx[~split]))
+                mid = lo + int(np.count_nonzero(split))
+            left[node] = build_node(lo, mid, depth + 1)
+            right[node] = build_node(mid, hi, depth + 1)
+            count[node] = 0  # Internal node has no colliders
+            return node
         
-        # Split in half
-        mid = len(sorted_colliders) // 2
-        left_colliders = sorted_colliders[:mid]
-        right_colliders = sorted_colliders[mid:]
-        
-        # Build child bounding boxes
-        left_bbox = left_colliders[0].bbox.clone() if left_colliders else bbox
-        for c in left_colliders[1:]:
-            left_bbox.expand_to_include(c.bbox)
-        
-        right_bbox = right_colliders[0].bbox.clone() if right_colliders else bbox
-        for c in right_colliders[1:]:
-            right_bbox.expand_to_include(c.bbox)
-        
-        # Recursively build children
-        children = []
-        if left_colliders:
-            children.append(self._build_node(left_colliders, left_bbox, depth + 1))
-        if right_colliders:
-            children.append(self._build_node(right_colliders, right_bbox, depth + 1))
-        
-        return {
-            "bbox": bbox,
-            "colliders": [],  # Internal node has no colliders
-            "children": children,
-        }
+        if colliders:
+            build_node(0, len(colliders), 0)
+        self.node_mins = _round_down_f32(np.array(mins).reshape(-1, 3))
+        self.node_maxs = _round_up_f32(np.array(maxs).reshape(-1, 3))
+        self.left_child = np.array(left, dtype=np.int32)
+        self.right_child = np.array(right, dtype=np.int32)
+        self.first_prim = np.array(first, dtype=np.int32)
+        self.prim_count = np.array(count, dtype=np.int32)
+        self.prim_indices = prims
+        self._node_packed = np.zeros((len(self.node_mins), 8), dtype=np.float32)
+        self._node_packed[:, 0:3] = self.node_mins
+        self._node_packed[:, 4:7] = -self.node_maxs
+        self._links = (left, right, first, count)
+    
+    @staticmethod
+    def _sah_split(bounds: NDArray, centers: NDArray, bins: int = 8) -> Optional[NDArray]:
+        """
+        Binned surface area heuristic: left-side mask of the split minimizing
+        ``A_L * N_L + A_R * N_R`` over ``bins`` center bins per axis, or None
+        if no axis separates the centers.
+        """
+        best_cost = np.inf
+        best = None
+        for axis in range(3):
+            c = centers[:, axis]
+            c_min = c.min()
+            extent = c.max() - c_min
+            if extent <= 0.0:
+                continue
+            slot = np.minimum((c - c_min) * (bins / extent), bins - 1).astype(np.intp)
+            
+            # Per-bin counts and bounds (empty bins stay inverted)
+            counts = np.bincount(slot, minlength=bins)
+            bin_mins = np.full((bins, 3), np.inf)
+            bin_maxs = np.full((bins, 3), -np.inf)
+            np.minimum.at(bin_mins, slot, bounds[:, :3])
+            np.maximum.at(bin_maxs, slot, bounds[:, 3:])
+            
+            # Bounds/counts left of each of the bins - 1 split planes, and right of them
+            left_n = np.cumsum(counts)[:-1]
+            right_n = len(c) - left_n
+            left_ext = (np.maximum.accumulate(bin_maxs)[:-1]
+                        - np.minimum.accumulate(bin_mins)[:-1])
+            right_ext = (np.maximum.accumulate(bin_maxs[::-1])[::-1][1:]
+                         - np.minimum.accumulate(bin_mins[::-1])[::-1][1:])
+            with np.errstate(invalid="ignore"):
+                cost = (_half_area(left_ext) * left_n + _half_area(right_ext) * right_n)
+            cost[(left_n == 0) | (right_n == 0)] = np.inf
+            k = int(np.argmin(cost))
+            if cost[k] < best_cost:
+                best_cost = cost[k]
+                best = slot <= k
+        return best
     
     def query_collisions(self, moving_bbox: BoundingBox) -> List[Collider]:
         """Query colliders that might collide with moving_bbox."""
-        results = []
-        self._query_node(self.root, moving_bbox, results)
-        return results
-    
-    def _query_node(self, node: Optional[Dict], bbox: BoundingBox, results: List[Collider]) -> None:
-        """Recursively query tree."""
-        if node is None:
-            return
-        
-        # Check if bbox intersects node bbox
-        if not bbox.intersects(node["bbox"]):
-            return
+        colliders = self.colliders
+        return [colliders[i] for i in np.flatnonzero(self.query_mask(moving_bbox))]
+    
+    def query_mask(self, moving_bbox: BoundingBox) -> NDArray:
+        """Boolean mask over ``colliders`` of those that might collide with moving_bbox."""
+        mask = np.zeros(len(self.colliders), dtype=bool)
+        if not len(self.node_mins):
+            return mask
         
-        # Add colliders at this node
-        results.extend(node["colliders"])
+        # Test every node at once, then walk the tree over the hit flags
+        query = np.full(8, np.inf, dtype=np.float32)
+        query[_PACKED_LANES] = _round_up_f32(np.array(_packed_query(moving_bbox.as_tuple())))
+        hit = (self._node_packed <= query).all(axis=1).tolist()
+        left, right, first, count = self._links
+        prims = self.prim_indices
         
-        # Query children
-        for child in node["children"]:
-            self._query_node(child, bbox, results)
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if not hit[node]:
+                continue
+            if left[node] < 0:
+                mask[prims[first[node]:first[node] + count[node]]] = True
+            else:
+                stack.append(right[node])
+                stack.append(left[node])
+        return mask
 
 
 class CollisionDetector:
@@ -345,6 +473,12 @@ class CollisionDetector:
         self.aabb_tree = AABBTree()
         self.collision_history: List[CollisionEvent] = []
         
+        # Static collider bounds as contiguous (N, 3) arrays for the broad-phase
+        self._static_mins: NDArray = np.empty((0, 3))
+        self._static_maxs: NDArray = np.empty((0, 3))
+        # Row 0: what the tool registers against, row 1: what the holder does
+        self._kind_masks: NDArray = np.empty((2, 0), dtype=bool)
+        
         # Safety margins
         self.tool_holder_margin = 1.0  # mm
         self.spindle_margin = 5.0  # mm
@@ -360,6 +494,17 @@ class CollisionDetector:
     def build(self) -> None:
         """Build acceleration structure."""
         self.aabb_tree.build(self.static_colliders)
+        if self.static_colliders:
+            bounds = np.array([c.bbox.as_array() for c in self.static_colliders])
+        else:
+            bounds = np.empty((0, 6))
+        self._static_mins = np.ascontiguousarray(bounds[:, :3])
+        self._static_maxs = np.ascontiguousarray(bounds[:, 3:])
+        # Tools only register against stock; holders against stock and fixtures
+        self._kind_masks = np.array([
+            [isinstance(c, StockCollider) for c in self.static_colliders],
+            [isinstance(c, (StockCollider, FixtureCollider)) for c in self.static_colliders],
+        ], dtype=bool).reshape(2, -1)
     
     def check_tool_at_position(
         self,
@@ -380,62 +525,23 @@ class CollisionDetector:
         Returns:
             List of collision events
         """
-        events = []
-        
-        # Tool AABB at this position (tool tip is reference point)
-        tool_bbox = tool.get_bbox_at_position(position)
-        
-        # Holder is above tool
-        holder_pos = position + np.array([0, 0, tool.length])
-        holder_bbox = holder.get_bbox_at_position(holder_pos)
-        holder_bbox_expanded = holder_bbox.expanded(self.tool_holder_margin)
-        
-        # Broad-phase: query static colliders
-        potential_collisions_tool = self.aabb_tree.query_collisions(tool_bbox)
-        potential_collisions_holder = self.aabb_tree.query_collisions(holder_bbox_expanded)
-        
-        # Check tool collisions (with stock = normal cutting)
-        for collider in potential_collisions_tool:
-            if isinstance(collider, StockCollider):
-                if tool_bbox.intersects(collider.bbox):
-                    overlap = self._calculate_penetration(tool_bbox, collider.bbox)
-                    # Only report if significantly inside (not just touching)
-                    if overlap > 0.01:
-                        events.append(CollisionEvent(
-                            collider_a=tool.name,
-                            collider_b=collider.name,
-                            collision_type=CollisionType.TOOL_STOCK,
-                            position=position,
-                            penetration_depth=overlap,
-                            block_number=block_number,
-                        ))
-        
-        # Check holder collisions (BAD - holder should never hit stock!)
-        for collider in potential_collisions_holder:
-            if isinstance(collider, (StockCollider, FixtureCollider)):
-                if holder_bbox_expanded.intersects(collider.bbox):
-                    overlap = self._calculate_penetration(holder_bbox_expanded, collider.bbox)
-                    if overlap > 0.01:
-                        events.append(CollisionEvent(
-                            collider_a=holder.name,
-                            collider_b=collider.name,
-                            collision_type=CollisionType.TOOL_HOLDER_STOCK,
-                            position=holder_pos,
-                            penetration_depth=overlap,
-                            block_number=block_number,
-                        ))
-        
-        return events
+        positions = np.asarray(position, dtype=float).reshape(1, 3)
+        return self._check_positions(tool, holder, positions, block_number)
     
     def _calculate_penetration(self, bbox_a: BoundingBox, bbox_b: BoundingBox) -> float:
         """Calculate penetration depth between two intersecting AABBs."""
-        # Find overlap on each axis
-        overlap_x = min(bbox_a.max_x, bbox_b.max_x) - max(bbox_a.min_x, bbox_b.min_x)
-        overlap_y = min(bbox_a.max_y, bbox_b.max_y) - max(bbox_a.min_y, bbox_b.min_y)
-        overlap_z = min(bbox_a.max_z, bbox_b.max_z) - max(bbox_a.min_z, bbox_b.min_z)
+        # Find overlap on each axis (inline min/max: no builtin calls)
+        a, b = bbox_a, bbox_b
+        overlap_x = ((a.max_x if a.max_x < b.max_x else b.max_x)
+                     - (a.min_x if a.min_x > b.min_x else b.min_x))
+        overlap_y = ((a.max_y if a.max_y < b.max_y else b.max_y)
+                     - (a.min_y if a.min_y > b.min_y else b.min_y))
+        overlap_z = ((a.max_z if a.max_z < b.max_z else b.max_z)
+                     - (a.min_z if a.min_z > b.min_z else b.min_z))
         
         # Return minimum overlap (penetration depth)
-        return min(overlap_x, overlap_y, overlap_z)
+        depth = overlap_x if overlap_x < overlap_y else overlap_y
+        return depth if depth < overlap_z else overlap_z
     
     def check_continuous_motion(
         self,
@@ -450,15 +556,168 @@ class CollisionDetector:
         Check for collisions along a continuous motion.
         Uses multiple samples to catch collisions during rapid moves.
         """
-        all_events = []
+        t = np.array([i / steps for i in range(steps + 1)])
+        if not len(self._static_mins):
+            return []
+        
+        # Swept pre-filter: every sample's boxes lie inside the union of the
+        # boxes at both ends, so static boxes that don't overlap that union
+        # (depth <= 0, well below the 0.01 threshold) can never be hit
+        ends = np.array((start_pos, end_pos), dtype=float)[:, _XYZ_XYZ][:, None, :]
+        ends = ends + self._query_template(tool, holder)
+        depth = self._penetration_depths(ends[..., :3].min(axis=0), ends[..., 3:].max(axis=0))
+        columns = np.flatnonzero(((depth > 0.0) & self._kind_masks).any(axis=0))
+        if not len(columns):
+            return []
+        
+        positions = start_pos + t[:, None] * (end_pos - start_pos)
+        return self._events_from_records(
+            self._hit_records(tool, holder, positions, columns), tool, holder, block_number)
+    
+    def check_path(
+        self,
+        tool: ToolCollider,
+        holder: ToolHolderCollider,
+        positions: NDArray,
+        block_numbers: Optional[Sequence[int]] = None,
+    ) -> List[CollisionEvent]:
+        """
+        Check a whole sampled toolpath in a few vectorized passes.
         
-        for i in range(steps + 1):
-            t = i / steps
-            pos = start_pos + t * (end_pos - start_pos)
-            events = self.check_tool_at_position(tool, holder, pos, block_number)
-            all_events.extend(events)
+        Args:
+            tool: Tool collider
+            holder: Tool holder collider
+            positions: (S, 3) tool tip positions
+            block_numbers: Optional G-code block number per position
         
-        return all_events
+        Returns:
+            List of collision events, per position in path order
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        # Bound the (S, 2, N, 3) temporaries for long paths
+        chunk = max(1, _PATH_CHUNK_BOXES // max(len(self._static_mins), 1))
+        parts = []
+        for start in range(0, len(positions), chunk):
+            records = self._hit_records(tool, holder, positions[start:start + chunk])
+            records["step"] += start
+            parts.append(records)
+        records = np.concatenate(parts) if parts else np.empty(0, dtype=COLLISION_RECORD_DTYPE)
+        
+        events = self._events_from_records(records, tool, holder)
+        if block_numbers is not None:
+            for event, step in zip(events, records["step"].tolist()):
+                event.block_number = block_numbers[step]
+        return events
+    
+    def _penetration_depths(
+        self,
+        q_min: NDArray,
+        q_max: NDArray,
+        columns: Optional[NDArray] = None,
+    ) -> NDArray:
+        """
+        (..., N) penetration depth of (..., 3) query boxes against the N static
+        boxes, or against only the static boxes listed in columns.
+        """
+        mins, maxs = self._static_mins, self._static_maxs
+        if columns is not None:
+            mins, maxs = mins[columns], maxs[columns]
+        overlap = (np.minimum(q_max[..., None, :], maxs)
+                   - np.maximum(q_min[..., None, :], mins))
+        return overlap.min(axis=-1)
+    
+    def _query_template(self, tool: ToolCollider, holder: ToolHolderCollider) -> NDArray:
+        """
+        (2, 6) bounds of the tool box (row 0) and the margin-expanded holder
+        box (row 1) relative to the tool tip; adding ``[x, y, z, x, y, z]``
+        of a tip position places both boxes there.
+        """
+        t, h = tool.bbox, holder.bbox
+        tcx, tcy, tcz = (t.min_x + t.max_x) / 2, (t.min_y + t.max_y) / 2, (t.min_z + t.max_z) / 2
+        m = self.tool_holder_margin
+        # Holder is above tool: its reference point sits tool.length over the tip
+        hcx = (h.min_x + h.max_x) / 2
+        hcy = (h.min_y + h.max_y) / 2
+        hcz = (h.min_z + h.max_z) / 2 - tool.length
+        return np.array([
+            (t.min_x - tcx, t.min_y - tcy, t.min_z - tcz,
+             t.max_x - tcx, t.max_y - tcy, t.max_z - tcz),
+            (h.min_x - hcx - m, h.min_y - hcy - m, h.min_z - hcz - m,
+             h.max_x - hcx + m, h.max_y - hcy + m, h.max_z - hcz + m),
+        ])
+    
+    def _check_positions(
+        self,
+        tool: ToolCollider,
+        holder: ToolHolderCollider,
+        positions: NDArray,
+        block_number: Optional[int] = None,
+    ) -> List[CollisionEvent]:
+        """Tool/holder checks for (S, 3) tip positions at once."""
+        return self._events_from_records(
+            self._hit_records(tool, holder, positions), tool, holder, block_number)
+    
+    def _hit_records(
+        self,
+        tool: ToolCollider,
+        holder: ToolHolderCollider,
+        positions: NDArray,
+        columns: Optional[NDArray] = None,
+    ) -> NDArray:
+        """
+        COLLISION_RECORD_DTYPE rows for every hit at (S, 3) tip positions,
+        per position in order: tool hits, then holder hits. With columns,
+        only those (sorted) static collider indices are tested.
+        """
+        if not len(self._static_mins):
+            return np.empty(0, dtype=COLLISION_RECORD_DTYPE)
+        
+        # (S, 2, 6) tool and holder boxes at every position, then their
+        # (S, 2, N) penetration into every static box in one broadcast.
+        # Penetration > 0.01 implies the boxes intersect, so this is the
+        # whole test; only report if significantly inside (not just touching)
+        query = positions[:, _XYZ_XYZ][:, None, :] + self._query_template(tool, holder)
+        depth = self._penetration_depths(query[..., :3], query[..., 3:], columns)
+        kind_masks = self._kind_masks if columns is None else self._kind_masks[:, columns]
+        steps, kinds, ids = np.nonzero((depth > 0.01) & kind_masks)
+        if not len(steps):
+            return np.empty(0, dtype=COLLISION_RECORD_DTYPE)
+        
+        records = np.empty(len(steps), dtype=COLLISION_RECORD_DTYPE)
+        records["step"] = steps
+        records["collider"] = ids if columns is None else columns[ids]
+        records["kind"] = kinds
+        records["position"] = positions[steps]
+        # Holder hits are reported at the holder position, tool.length above the tip
+        records["position"][:, 2] += kinds * tool.length
+        records["depth"] = depth[steps, kinds, ids]
+        return records
+    
+    def _events_from_records(
+        self,
+        records: NDArray,
+        tool: ToolCollider,
+        holder: ToolHolderCollider,
+        block_number: Optional[int] = None,
+    ) -> List[CollisionEvent]:
+        """Materialize CollisionEvent objects from hit records."""
+        # Kind 0: tool vs stock (normal cutting), 1: holder (BAD - should never hit stock!)
+        names = (tool.name, holder.name)
+        types = (CollisionType.TOOL_STOCK, CollisionType.TOOL_HOLDER_STOCK)
+        colliders = self.static_colliders
+        return [
+            CollisionEvent(
+                collider_a=names[kind],
+                collider_b=colliders[i].name,
+                collision_type=types[kind],
+                position=position,
+                penetration_depth=depth,
+                block_number=block_number,
+            )
+            for i, kind, position, depth in zip(
+                records["collider"].tolist(), records["kind"].tolist(),
+                records["position"], records["depth"])
+        ]
     
     def get_collision_stats(self) -> dict:
         """Get collision statistics."""
@@ -3,13 +3,20 @@
 Draws polyline toolpath and tri-dexel stock mesh.
 """
 
+import ctypes
 import math
 import numpy as np
-from nextcnc.qt_compat import Qt, QSurfaceFormat, QOpenGLWidget
+from nextcnc.qt_compat import Qt, QSurfaceFormat, QOpenGLWidget, QTimer
 
 from OpenGL.GL import (
+    GL_ARRAY_BUFFER,
     GL_COLOR_BUFFER_BIT,
     GL_DEPTH_BUFFER_BIT,
+    GL_DEPTH_TEST,
+    GL_DYNAMIC_DRAW,
+    GL_ELEMENT_ARRAY_BUFFER,
+    GL_EXTENSIONS,
+    GL_LEQUAL,
     GL_LINES,
     GL_LINE_STRIP,
     GL_FLOAT,
@@ -19,11 +26,24 @@ from OpenGL.GL import (
     GL_CULL_FACE,
     GL_FRONT,
     GL_BACK,
+    GL_STATIC_DRAW,
+    GL_STREAM_DRAW,
+    GL_UNSIGNED_INT,
+    GL_VERSION,
 )
 from OpenGL.GL import (
+    glBindBuffer,
+    glBindVertexArray,
+    glBufferData,
+    glBufferSubData,
     glClear,
     glClearColor,
+    glDepthFunc,
     glDrawArrays,
+    glDrawElements,
+    glGenBuffers,
+    glGenVertexArrays,
+    glGetString,
     glEnableVertexAttribArray,
     glDisableVertexAttribArray,
     glVertexAttribPointer,
@@ -32,6 +52,7 @@ from OpenGL.GL import (
     glGetUniformLocation,
     glUniformMatrix4fv,
     glUniform4f,
+    glVertexAttrib3f,
     glGetAttribLocation,
     glLineWidth,
     glEnable,
@@ -45,6 +66,48 @@ AXES_VERTICES = np.array([
     0, 0, 0,  0, 0, 40,   # Z
 ], dtype=np.float32)
 
+# Axis colors (X red, Y green, Z blue), one RGB per axis vertex
+AXES_COLORS = np.array([
+    0.9, 0.25, 0.2,   0.9, 0.25, 0.2,
+    0.2, 0.85, 0.3,   0.2, 0.85, 0.3,
+    0.25, 0.5, 0.95,  0.25, 0.5, 0.95,
+], dtype=np.float32)
+
+# Interleaved [x, y, z, r, g, b] axis vertices for a single VBO draw
+_AXES_INTERLEAVED = np.ascontiguousarray(
+    np.hstack((AXES_VERTICES.reshape(-1, 3), AXES_COLORS.reshape(-1, 3))))
+_AXES_STRIDE = _AXES_INTERLEAVED.strides[0]
+
+# Vertex index pairs outlining a triangle (a, b, c): ab, bc, ca
+_TRIANGLE_EDGES = np.array([0, 1, 1, 2, 2, 0])
+
+# Toolpaths at least this long are culled to the visible rectangle while
+# zoomed in below _CULL_ZOOM (the view then spans less than half the scene)
+# and decimated to about a pixel when zoomed out
+_CULL_MIN_POINTS = 10_000
+_CULL_ZOOM = 0.5
+# Finest LOD grid cell as a fraction of the scene half extent; level l
+# uses cells 2**l times larger
+_LOD_BASE_CELL = 1.0 / 2048.0
+
+
+def _extent(vertices: np.ndarray) -> "tuple[np.ndarray, np.ndarray] | None":
+    """(min, max) corners of an (N, 3) array, None if it is empty."""
+    if len(vertices) == 0:
+        return None
+    return vertices.min(axis=0), vertices.max(axis=0)
+
+
+def _has_vertex_array_objects() -> bool:
+    """True if the current context has VAOs (GL 3.0+ or ARB_vertex_array_object)."""
+    try:
+        version = (glGetString(GL_VERSION) or b"").decode(errors="ignore")
+        if int(version.split(".", 1)[0]) >= 3:
+            return True
+        return b"GL_ARB_vertex_array_object" in (glGetString(GL_EXTENSIONS) or b"")
+    except Exception:
+        return False
+
 
 def _compile_shader(src: str, shader_type: int) -> int:
     from OpenGL.GL import (
@@ -65,10 +128,12 @@ def _compile_shader(src: str, shader_type: int) -> int:
     return sid
 
 
-def _link_program(vertex_id: int, fragment_id: int) -> int:
+def _link_program(vertex_id: int, fragment_id: int, attributes: tuple = ()) -> int:
+    """Link a program; attributes are bound to locations 0, 1, ... in order."""
     from OpenGL.GL import (
         GL_LINK_STATUS,
         glAttachShader,
+        glBindAttribLocation,
         glCreateProgram,
         glGetProgramInfoLog,
         glGetProgramiv,
@@ -79,6 +144,8 @@ def _link_program(vertex_id: int, fragment_id: int) -> int:
         raise RuntimeError("glCreateProgram failed")
     glAttachShader(pid, vertex_id)
     glAttachShader(pid, fragment_id)
+    for location, name in enumerate(attributes):
+        glBindAttribLocation(pid, location, name)
     glLinkProgram(pid)
     status = glGetProgramiv(pid, GL_LINK_STATUS)
     if not status:
@@ -87,58 +154,67 @@ def _link_program(vertex_id: int, fragment_id: int) -> int:
     return int(pid)
 
 
+# Fragment color is the uniform color times a per-vertex color; geometry
+# without a color array gets the constant vertex_color (1, 1, 1)
 VERTEX_SHADER_SRC = """
 #version 120
 attribute vec3 position;
-uniform mat4 mvp;
+attribute vec3 vertex_color;
+uniform mat4 proj;
+uniform mat4 view;
+varying vec3 vcolor;
 void main() {
-    gl_Position = mvp * vec4(position, 1.0);
+    vcolor = vertex_color;
+    gl_Position = proj * view * vec4(position, 1.0);
 }
 """
 
 FRAGMENT_SHADER_SRC = """
 #version 120
 uniform vec4 color;
+varying vec3 vcolor;
 void main() {
-    gl_FragColor = color;
+    gl_FragColor = color * vec4(vcolor, 1.0);
 }
 """
 
 
-def _ortho(left: float, right: float, bottom: float, top: float, near: float, far: float) -> np.ndarray:
-    """Column-major 4x4 orthographic projection."""
-    m = np.eye(4, dtype=np.float32)
-    m[0, 0] = 2.0 / (right - left)
-    m[1, 1] = 2.0 / (top - bottom)
-    m[2, 2] = -2.0 / (far - near)
-    m[0, 3] = -(right + left) / (right - left)
-    m[1, 3] = -(top + bottom) / (top - bottom)
-    m[2, 3] = -(far + near) / (far - near)
-    return m
-
-
-def _rotate_x(deg: float) -> np.ndarray:
-    c = math.cos(math.radians(deg))
-    s = math.sin(math.radians(deg))
-    m = np.eye(4, dtype=np.float32)
-    m[1, 1], m[1, 2] = c, -s
-    m[2, 1], m[2, 2] = s, c
-    return m
-
-
-def _rotate_y(deg: float) -> np.ndarray:
-    c = math.cos(math.radians(deg))
-    s = math.sin(math.radians(deg))
-    m = np.eye(4, dtype=np.float32)
-    m[0, 0], m[0, 2] = c, s
-    m[2, 0], m[2, 2] = -s, c
-    return m
-
-
-def _translate(x: float, y: float, z: float) -> np.ndarray:
-    m = np.eye(4, dtype=np.float32)
-    m[0, 3], m[1, 3], m[2, 3] = x, y, z
-    return m
+def _write_projection(
+    out: np.ndarray,
+    left: float, right: float, bottom: float, top: float, near: float, far: float,
+) -> None:
+    """Write the orthographic projection into out (row-major 4x4)."""
+    inv_w = 1.0 / (right - left)
+    inv_h = 1.0 / (top - bottom)
+    inv_d = 1.0 / (far - near)
+    out[0] = (2.0 * inv_w, 0.0, 0.0, -(right + left) * inv_w)
+    out[1] = (0.0, 2.0 * inv_h, 0.0, -(top + bottom) * inv_h)
+    out[2] = (0.0, 0.0, -2.0 * inv_d, -(far + near) * inv_d)
+    out[3] = (0.0, 0.0, 0.0, 1.0)
+
+
+def _write_view(
+    out: np.ndarray,
+    rot_x: float, rot_y: float,
+    pan_x: float, pan_y: float,
+    cen: tuple,
+) -> None:
+    """
+    Write translate(pan) @ rotate_x @ rotate_y @ translate(-cen) into out
+    (row-major 4x4) in closed form.
+    """
+    cx, sx = math.cos(math.radians(rot_x)), math.sin(math.radians(rot_x))
+    cy, sy = math.cos(math.radians(rot_y)), math.sin(math.radians(rot_y))
+    # Rotation rows of Rx @ Ry
+    r0 = (cy, 0.0, sy)
+    r1 = (sx * sy, cx, -sx * cy)
+    r2 = (-cx * sy, sx, cx * cy)
+    # Translation column: R @ -cen + pan
+    px, py, pz = -cen[0], -cen[1], -cen[2]
+    out[0] = (*r0, r0[0] * px + r0[2] * pz + pan_x)
+    out[1] = (*r1, r1[0] * px + r1[1] * py + r1[2] * pz + pan_y)
+    out[2] = (*r2, r2[0] * px + r2[1] * py + r2[2] * pz)
+    out[3] = (0.0, 0.0, 0.0, 1.0)
 
 
 class SimulationWidget(QOpenGLWidget):
@@ -150,15 +226,49 @@ class SimulationWidget(QOpenGLWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._points: np.ndarray = np.zeros((0, 3), dtype=np.float32)
+        # _points is a view of the first rows of _points_storage, which grows
+        # by doubling so append_points() stays amortized O(new points).
+        # The VBO likewise holds _points_capacity rows of which the first
+        # _points_synced are current; paintGL sends only the rest
+        self._points_storage: np.ndarray = np.zeros((0, 3), dtype=np.float32)
+        self._points: np.ndarray = self._points_storage
+        self._points_extent = None
+        self._points_vbo: int = 0
+        self._points_capacity: int = 0
+        self._points_synced: int = 0
+        # Decimated copies of _points by LOD level (None: no reduction),
+        # rebuilt lazily after the points or the scene bounds change
+        self._points_lods: dict = {}
+        # What _draw_toolpath draws instead of the full strip for the current
+        # view: (GL mode, float32 vertices), or None
+        self._view_path: "tuple | None" = None
+        self._view_vbo: int = 0
+        self._view_upload: bool = False
         self._stock_vertices: np.ndarray = np.zeros((0, 3), dtype=np.float32)
         self._stock_indices: np.ndarray = np.zeros((0, 3), dtype=np.int32)
         self._show_stock: bool = False
+        # Wireframe: vertices in a VBO, unique (E, 2) edges in an index buffer.
+        # Uploads happen in paintGL: all of it after a new mesh, else only
+        # the pending dirty (offset, count) vertex ranges
+        self._stock_edges: np.ndarray = np.zeros((0, 2), dtype=np.uint32)
+        self._stock_extent = None
+        self._stock_vbo: int = 0
+        self._stock_ibo: int = 0
+        self._stock_upload: bool = False
+        self._stock_pending: list = []
         
         self._program: int = 0
         self._attr_position: int = -1
-        self._uniform_mvp: int = -1
+        self._attr_color: int = -1
+        self._axes_vbo: int = 0
+        # Geometry name -> VAO holding its attribute setup; stays empty
+        # (attributes set per draw) if the context has no VAOs
+        self._vaos: dict = {}
+        self._uniform_proj: int = -1
+        self._uniform_view: int = -1
         self._uniform_color: int = -1
+        # Last value sent to the color uniform, which persists in the program
+        self._color: "tuple | None" = None
         self._gl_initialized: bool = False
 
         self._default_rot_x = -20.0
@@ -173,6 +283,25 @@ class SimulationWidget(QOpenGLWidget):
         self._pan_x = self._default_pan_x
         self._pan_y = self._default_pan_y
         self._last_pos = None
+        # Mouse drags repaint through this timer, at most once per ~frame
+        self._repaint_timer = QTimer(self)
+        self._repaint_timer.setSingleShot(True)
+        self._repaint_timer.setInterval(16)
+        self._repaint_timer.timeout.connect(self.update)
+        
+        # (center, half extent) of the visible geometry, None until needed.
+        # Projection/view are rebuilt and uploaded only while _camera_dirty
+        # (set when the data or the camera changes); uniforms persist in
+        # the program between frames
+        self._bounds = None
+        self._camera_dirty = True
+        self._proj_buffer = np.eye(4, dtype=np.float32)
+        self._view_buffer = np.eye(4, dtype=np.float32)
+        # Raw pointers into the buffers (written in place, never replaced) so
+        # uniform uploads skip PyOpenGL's per-call ndarray conversion
+        self._proj_pointer = self._proj_buffer.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+        self._view_pointer = self._view_buffer.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+        self._view_rect = (-1.0, 1.0, -1.0, 1.0)
 
         fmt = QSurfaceFormat()
         fmt.setVersion(2, 1)
@@ -184,41 +313,131 @@ class SimulationWidget(QOpenGLWidget):
     def set_points(self, points: np.ndarray) -> None:
         """Set toolpath points."""
         if points is None or len(points) == 0:
-            self._points = np.zeros((0, 3), dtype=np.float32)
+            storage = np.zeros((0, 3), dtype=np.float32)
         else:
-            self._points = np.asarray(points, dtype=np.float32)
-            if self._points.ndim != 2 or self._points.shape[1] != 3:
-                self._points = np.zeros((0, 3), dtype=np.float32)
+            storage = np.array(points, dtype=np.float32)
+            if storage.ndim != 2 or storage.shape[1] != 3:
+                storage = np.zeros((0, 3), dtype=np.float32)
+        self._points_storage = storage
+        self._points = storage
+        self._points_synced = 0
+        self._points_extent = _extent(storage)
+        self._invalidate_bounds()
+        self.update()
+
+    def append_points(self, points: np.ndarray) -> None:
+        """Append points to the toolpath, e.g. while a simulation streams moves."""
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+        if len(points) == 0:
+            return
+        count = len(self._points)
+        needed = count + len(points)
+        if needed > len(self._points_storage):
+            storage = np.empty((max(needed, 2 * len(self._points_storage)), 3), dtype=np.float32)
+            storage[:count] = self._points
+            self._points_storage = storage
+        self._points_storage[count:needed] = points
+        self._points = self._points_storage[:needed]
+        extent = _extent(points)
+        if self._points_extent is not None:
+            extent = (np.minimum(self._points_extent[0], extent[0]),
+                      np.maximum(self._points_extent[1], extent[1]))
+        self._points_extent = extent
+        self._invalidate_bounds()
         self.update()
 
-    def set_stock_mesh(self, vertices: np.ndarray, indices: np.ndarray) -> None:
-        """Set stock mesh for rendering."""
-        if vertices is not None and len(vertices) > 0:
-            self._stock_vertices = np.asarray(vertices, dtype=np.float32)
+    def set_stock_mesh(
+        self,
+        vertices: np.ndarray,
+        indices: np.ndarray,
+        dirty_ranges: "list[tuple[int, int]] | None" = None,
+    ) -> None:
+        """
+        Set stock mesh for rendering.
+        dirty_ranges, as from StockSimulator.get_mesh_for_render(True), lists
+        the (offset, count) vertex ranges that changed since the mesh last
+        passed in; when given and the mesh layout is unchanged, only those
+        ranges are copied and the indices are kept.
+        """
+        if (
+            dirty_ranges is not None
+            and vertices is not None
+            and len(vertices) > 0
+            and len(vertices) == len(self._stock_vertices)
+            and len(indices) == len(self._stock_indices)
+        ):
+            for offset, count in dirty_ranges:
+                self._stock_vertices[offset:offset + count] = vertices[offset:offset + count]
+            if not self._stock_upload:
+                self._stock_pending.extend(dirty_ranges)
+            self._show_stock = True
+        elif vertices is not None and len(vertices) > 0:
+            # Own copy: dirty-range updates write into it
+            self._stock_vertices = np.array(vertices, dtype=np.float32)
             self._stock_indices = np.asarray(indices, dtype=np.int32)
+            self._stock_edges = self._unique_edges()
             self._show_stock = True
+            self._stock_upload = True
         else:
             self._stock_vertices = np.zeros((0, 3), dtype=np.float32)
             self._stock_indices = np.zeros((0, 3), dtype=np.int32)
+            self._stock_edges = np.zeros((0, 2), dtype=np.uint32)
             self._show_stock = False
+            self._stock_upload = True
+        if self._stock_upload:
+            self._stock_pending = []
+        # Full rescan: cut vertices can move inwards, e.g. a lowered top
+        self._stock_extent = _extent(self._stock_vertices)
+        self._invalidate_bounds()
         self.update()
 
+    def _unique_edges(self) -> np.ndarray:
+        """
+        (E, 2) vertex index pairs of the distinct triangle edges: an edge
+        shared by two triangles is drawn once.
+        """
+        pairs = self._stock_indices[:, _TRIANGLE_EDGES].reshape(-1, 2)
+        n = len(self._stock_vertices)
+        pairs = pairs[(pairs < n).all(axis=1)].astype(np.int64)
+        # One integer key per undirected edge: lo * n + hi
+        lo, hi = pairs.min(axis=1), pairs.max(axis=1)
+        keys = np.unique(lo * n + hi)
+        return np.stack((keys // n, keys % n), axis=1).astype(np.uint32)
+
     def show_stock(self, show: bool) -> None:
         """Toggle stock visibility."""
-        self._show_stock = show and len(self._stock_vertices) > 0
+        show = show and len(self._stock_vertices) > 0
+        if show == self._show_stock:
+            return
+        self._show_stock = show
+        self._invalidate_bounds()
         self.update()
 
     def reset_view(self) -> None:
         """Reset camera to default view."""
+        before = self._camera()
         self._rot_x = self._default_rot_x
         self._rot_y = self._default_rot_y
         self._zoom = self._default_zoom
         self._pan_x = self._default_pan_x
         self._pan_y = self._default_pan_y
-        self.update()
+        self._camera_moved(before)
+
+    def _camera(self) -> tuple:
+        return (self._rot_x, self._rot_y, self._zoom, self._pan_x, self._pan_y)
+
+    def _camera_moved(self, before: tuple) -> None:
+        """Repaint only if the camera differs from the `before` snapshot."""
+        if self._camera() != before:
+            self._camera_dirty = True
+            self.update()
 
     def initializeGL(self) -> None:
         glClearColor(0.12, 0.12, 0.14, 1.0)
+        # Lines only, so no face culling; LEQUAL keeps coincident toolpath
+        # and stock edges visible
+        glEnable(GL_DEPTH_TEST)
+        glDepthFunc(GL_LEQUAL)
 
     def _ensure_gl_resources(self) -> None:
         """Create shaders when context is current."""
@@ -228,12 +447,33 @@ class SimulationWidget(QOpenGLWidget):
         try:
             vs = _compile_shader(VERTEX_SHADER_SRC, GL_VERTEX_SHADER)
             fs = _compile_shader(FRAGMENT_SHADER_SRC, GL_FRAGMENT_SHADER)
-            self._program = _link_program(vs, fs)
+            # position at location 0: a generic attribute 0 cannot be a constant
+            self._program = _link_program(vs, fs, ("position", "vertex_color"))
             if not self._program:
                 return
-            self._uniform_mvp = glGetUniformLocation(self._program, "mvp")
+            self._uniform_proj = glGetUniformLocation(self._program, "proj")
+            self._uniform_view = glGetUniformLocation(self._program, "view")
             self._uniform_color = glGetUniformLocation(self._program, "color")
             self._attr_position = glGetAttribLocation(self._program, "position")
+            self._attr_color = glGetAttribLocation(self._program, "vertex_color")
+            self._axes_vbo = int(glGenBuffers(1))
+            glBindBuffer(GL_ARRAY_BUFFER, self._axes_vbo)
+            glBufferData(GL_ARRAY_BUFFER, _AXES_INTERLEAVED.nbytes, _AXES_INTERLEAVED, GL_STATIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            self._stock_vbo = int(glGenBuffers(1))
+            self._stock_ibo = int(glGenBuffers(1))
+            self._points_vbo = int(glGenBuffers(1))
+            self._view_vbo = int(glGenBuffers(1))
+            if self._attr_position >= 0 and _has_vertex_array_objects():
+                names = ("stock", "points", "view", "axes")
+                ids = np.atleast_1d(glGenVertexArrays(len(names)))
+                self._vaos = {name: int(vao) for name, vao in zip(names, ids)}
+                for name, vao in self._vaos.items():
+                    glBindVertexArray(vao)
+                    self._set_attributes(name)
+                glBindVertexArray(0)
+                glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+                glBindBuffer(GL_ARRAY_BUFFER, 0)
         except Exception as e:
             import traceback
             traceback.print_exc()
@@ -241,23 +481,31 @@ class SimulationWidget(QOpenGLWidget):
 
     def resizeGL(self, w: int, h: int) -> None:
         glViewport(0, 0, w, h)
-
-    def _build_mvp(self) -> np.ndarray:
-        """Build model-view-projection matrix."""
-        w, h = max(1, self.width()), max(1, self.height())
-        aspect = w / h
+        self._camera_dirty = True
+
+    def _invalidate_bounds(self) -> None:
+        """Drop the scene bounds and the toolpath LODs sized from them."""
+        self._bounds = None
+        self._points_lods = {}
+        self._camera_dirty = True
+
+    def _scene_bounds(self):
+        """(center, half extent) of all visible geometry, cached until it changes."""
+        if self._bounds is not None:
+            return self._bounds
         
-        # Calculate bounds from all visible geometry
-        all_points = []
-        if len(self._points) > 0:
-            all_points.append(self._points)
-        if self._show_stock and len(self._stock_vertices) > 0:
-            all_points.append(self._stock_vertices)
+        # Combine the extents the setters keep for each visible source
+        extents = []
+        if self._points_extent is not None:
+            extents.append(self._points_extent)
+        if self._show_stock and self._stock_extent is not None:
+            extents.append(self._stock_extent)
         
-        if all_points:
-            combined = np.concatenate(all_points, axis=0)
-            mn = combined.min(axis=0)
-            mx = combined.max(axis=0)
+        if extents:
+            mn, mx = extents[0]
+            for lo, hi in extents[1:]:
+                mn = np.minimum(mn, lo)
+                mx = np.maximum(mx, hi)
             size = float(np.max(mx - mn))
             if size < 1e-6:
                 size = 10.0
@@ -266,19 +514,87 @@ class SimulationWidget(QOpenGLWidget):
         else:
             half = 50.0
             cen = np.zeros(3, dtype=np.float32)
+        self._bounds = (cen, half)
+        return self._bounds
+
+    def _build_matrices(self) -> None:
+        """Build projection and view matrices into their reused buffers."""
+        w, h = max(1, self.width()), max(1, self.height())
+        aspect = w / h
+        cen, half = self._scene_bounds()
         
         left = -aspect * half * self._zoom + self._pan_x
         right = aspect * half * self._zoom + self._pan_x
         bottom = -half * self._zoom + self._pan_y
         top = half * self._zoom + self._pan_y
+        self._view_rect = (left, right, bottom, top)
         
-        P = _ortho(left, right, bottom, top, -1000.0, 1000.0)
-        T_pan = _translate(self._pan_x, self._pan_y, 0.0)
-        Rx = _rotate_x(self._rot_x)
-        Ry = _rotate_y(self._rot_y)
-        T_cent = _translate(-float(cen[0]), -float(cen[1]), -float(cen[2]))
-        V = T_pan @ Rx @ Ry @ T_cent
-        return (P @ V).astype(np.float32)
+        _write_projection(self._proj_buffer, left, right, bottom, top, -1000.0, 1000.0)
+        _write_view(
+            self._view_buffer,
+            self._rot_x, self._rot_y, self._pan_x, self._pan_y,
+            (float(cen[0]), float(cen[1]), float(cen[2])),
+        )
+
+    def _lod_points(self, level: int) -> "np.ndarray | None":
+        """
+        _points with runs of consecutive points in one grid cell of the
+        given LOD level collapsed to their first point; None if that would
+        not drop enough points to matter. Endpoints are always kept.
+        """
+        if level in self._points_lods:
+            return self._points_lods[level]
+        points = self._points
+        _, half = self._scene_bounds()
+        cell = half * _LOD_BASE_CELL * 2.0 ** level
+        cells = np.floor(points / cell)
+        keep = np.empty(len(points), dtype=bool)
+        keep[0] = True
+        np.any(cells[1:] != cells[:-1], axis=1, out=keep[1:])
+        keep[-1] = True
+        lod = None
+        if np.count_nonzero(keep) < 0.75 * len(points):
+            lod = points[keep]
+        self._points_lods[level] = lod
+        return lod
+
+    def _update_view_path(self) -> None:
+        """
+        Pick what to draw of a long toolpath for the current view: when
+        zoomed out, the coarsest LOD whose cell is within half a pixel,
+        and when zoomed in only the segments whose view-space box overlaps
+        the visible rectangle (GL_LINE_STRIP cannot skip segments, so they
+        become GL_LINES pairs).
+        """
+        points = self._points
+        previous = self._view_path
+        self._view_path = None
+        if len(points) < _CULL_MIN_POINTS:
+            return
+        left, right, bottom, top = self._view_rect
+        if self._zoom >= _CULL_ZOOM:
+            _, half = self._scene_bounds()
+            pixel = (right - left) / max(1, self.width())
+            ratio = 0.5 * pixel / (half * _LOD_BASE_CELL)
+            if ratio >= 1.0:
+                lod = self._lod_points(int(math.log2(ratio)))
+                if lod is not None:
+                    self._view_path = (GL_LINE_STRIP, lod)
+                    self._view_upload |= previous is None or previous[1] is not lod
+            return
+        view = self._view_buffer
+        eye = points @ view[:2, :3].T + view[:2, 3]
+        lo = np.minimum(eye[:-1], eye[1:])
+        hi = np.maximum(eye[:-1], eye[1:])
+        # Small margin for the line width at the edges
+        margin = 0.01 * (right - left)
+        visible = np.flatnonzero(
+            (hi[:, 0] >= left - margin) & (lo[:, 0] <= right + margin)
+            & (hi[:, 1] >= bottom - margin) & (lo[:, 1] <= top + margin)
+        )
+        lines = np.stack((points[visible], points[visible + 1]), axis=1).reshape(-1, 3)
+        self._view_path = (GL_LINES, lines)
+        self._view_upload = True
 
     def paintGL(self) -> None:
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
@@ -288,8 +604,14 @@ class SimulationWidget(QOpenGLWidget):
             return
         
         glUseProgram(self._program)
-        mvp = self._build_mvp()
-        glUniformMatrix4fv(self._uniform_mvp, 1, True, mvp)
+        if self._attr_color >= 0:
+            glVertexAttrib3f(self._attr_color, 1.0, 1.0, 1.0)
+        if self._camera_dirty:
+            self._build_matrices()
+            glUniformMatrix4fv(self._uniform_proj, 1, True, self._proj_pointer)
+            glUniformMatrix4fv(self._uniform_view, 1, True, self._view_pointer)
+            self._update_view_path()
+            self._camera_dirty = False
         
         # Draw stock mesh first (if enabled)
         if self._show_stock and len(self._stock_vertices) > 0 and len(self._stock_indices) > 0:
@@ -303,9 +625,52 @@ class SimulationWidget(QOpenGLWidget):
         
         glUseProgram(0)
 
+    def _set_color(self, r: float, g: float, b: float, a: float) -> None:
+        """Set the color uniform, skipping the call if it already holds this value."""
+        color = (r, g, b, a)
+        if color != self._color:
+            glUniform4f(self._uniform_color, r, g, b, a)
+            self._color = color
+
+    def _set_attributes(self, name: str) -> None:
+        """Bind the buffers of a geometry and point its vertex attributes at them."""
+        if name == "stock":
+            glBindBuffer(GL_ARRAY_BUFFER, self._stock_vbo)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self._stock_ibo)
+        elif name == "points":
+            glBindBuffer(GL_ARRAY_BUFFER, self._points_vbo)
+        elif name == "view":
+            glBindBuffer(GL_ARRAY_BUFFER, self._view_vbo)
+        else:
+            glBindBuffer(GL_ARRAY_BUFFER, self._axes_vbo)
+        stride = _AXES_STRIDE if name == "axes" else 0
+        glEnableVertexAttribArray(self._attr_position)
+        glVertexAttribPointer(self._attr_position, 3, GL_FLOAT, False, stride, None)
+        if name == "axes" and self._attr_color >= 0:
+            glEnableVertexAttribArray(self._attr_color)
+            glVertexAttribPointer(self._attr_color, 3, GL_FLOAT, False, _AXES_STRIDE,
+                                  ctypes.c_void_p(3 * _AXES_INTERLEAVED.itemsize))
+
+    def _bind_geometry(self, name: str) -> None:
+        vao = self._vaos.get(name)
+        if vao:
+            glBindVertexArray(vao)
+        else:
+            self._set_attributes(name)
+
+    def _unbind_geometry(self, name: str) -> None:
+        if self._vaos:
+            glBindVertexArray(0)
+        else:
+            glDisableVertexAttribArray(self._attr_position)
+            if name == "axes" and self._attr_color >= 0:
+                glDisableVertexAttribArray(self._attr_color)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
     def _draw_stock(self) -> None:
         """Draw stock mesh as wireframe."""
-        glUniform4f(self._uniform_color, 0.6, 0.4, 0.2, 1.0)  # Brown-ish
+        self._set_color(0.6, 0.4, 0.2, 1.0)  # Brown-ish
         
         # Draw as wireframe lines between vertices
         try:
@@ -313,95 +678,103 @@ class SimulationWidget(QOpenGLWidget):
         except Exception:
             pass
         
-        # Flatten indices to draw triangles as line loops
-        lines = []
-        for tri in self._stock_indices:
-            lines.extend([tri[0], tri[1], tri[1], tri[2], tri[2], tri[0]])
-        
-        if lines:
-            line_indices = np.array(lines, dtype=np.int32)
-            vertices = self._stock_vertices.flatten()
-            
-            for i in range(0, len(line_indices), 2):
-                idx0, idx1 = line_indices[i], line_indices[i+1]
-                if idx0 < len(self._stock_vertices) and idx1 < len(self._stock_vertices):
-                    pts = np.array([
-                        self._stock_vertices[idx0],
-                        self._stock_vertices[idx1]
-                    ], dtype=np.float32).flatten()
-                    
-                    glEnableVertexAttribArray(self._attr_position)
-                    glVertexAttribPointer(self._attr_position, 3, GL_FLOAT, False, 0, pts)
-                    glDrawArrays(GL_LINES, 0, 2)
-                    glDisableVertexAttribArray(self._attr_position)
+        vertices = self._stock_vertices
+        # Binding the geometry also binds its index buffer (VAO state)
+        self._bind_geometry("stock")
+        glBindBuffer(GL_ARRAY_BUFFER, self._stock_vbo)
+        if self._stock_upload:
+            # Vertices get rewritten range by range as material is removed
+            glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_DYNAMIC_DRAW)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, self._stock_edges.nbytes, self._stock_edges, GL_STATIC_DRAW)
+            self._stock_upload = False
+        else:
+            row = vertices.strides[0]
+            for offset, count in self._stock_pending:
+                chunk = vertices[offset:offset + count]
+                glBufferSubData(GL_ARRAY_BUFFER, offset * row, chunk.nbytes, chunk)
+        self._stock_pending = []
+        glDrawElements(GL_LINES, self._stock_edges.size, GL_UNSIGNED_INT, None)
+        self._unbind_geometry("stock")
 
     def _draw_toolpath(self) -> None:
         """Draw toolpath polyline."""
-        glUniform4f(self._uniform_color, 0.2, 0.7, 0.9, 1.0)  # Cyan
+        self._set_color(0.2, 0.7, 0.9, 1.0)  # Cyan
         try:
             glLineWidth(2.0)
         except Exception:
             pass
         
-        pts = np.ascontiguousarray(self._points, dtype=np.float32)
-        glEnableVertexAttribArray(self._attr_position)
-        glVertexAttribPointer(self._attr_position, 3, GL_FLOAT, False, 0, pts)
-        glDrawArrays(GL_LINE_STRIP, 0, len(self._points))
-        glDisableVertexAttribArray(self._attr_position)
+        if self._view_path is not None:
+            mode, vertices = self._view_path
+            count = len(vertices)
+            if count == 0:
+                return
+            name = "view"
+            self._bind_geometry(name)
+            if self._view_upload:
+                glBindBuffer(GL_ARRAY_BUFFER, self._view_vbo)
+                glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STREAM_DRAW)
+                self._view_upload = False
+        else:
+            points = self._points
+            count = len(points)
+            row = points.itemsize * 3
+            name, mode = "points", GL_LINE_STRIP
+            self._bind_geometry(name)
+            if self._points_synced < count:
+                glBindBuffer(GL_ARRAY_BUFFER, self._points_vbo)
+                if count > self._points_capacity:
+                    # Reallocate with headroom; later growth fits via glBufferSubData
+                    self._points_capacity = 2 * count
+                    glBufferData(GL_ARRAY_BUFFER, self._points_capacity * row, None, GL_DYNAMIC_DRAW)
+                    self._points_synced = 0
+                chunk = points[self._points_synced:]
+                glBufferSubData(GL_ARRAY_BUFFER, self._points_synced * row, chunk.nbytes, chunk)
+                self._points_synced = count
+        glDrawArrays(mode, 0, count)
+        self._unbind_geometry(name)
 
     def _draw_axes(self) -> None:
         """Draw XYZ axes when no toolpath loaded."""
-        # X axis - Red
-        glUniform4f(self._uniform_color, 0.9, 0.25, 0.2, 1.0)
-        axes = np.ascontiguousarray(AXES_VERTICES[:6], dtype=np.float32)
-        glEnableVertexAttribArray(self._attr_position)
-        glVertexAttribPointer(self._attr_position, 3, GL_FLOAT, False, 0, axes)
-        glDrawArrays(GL_LINES, 0, 2)
-        glDisableVertexAttribArray(self._attr_position)
-        
-        # Y axis - Green
-        glUniform4f(self._uniform_color, 0.2, 0.85, 0.3, 1.0)
-        axes = np.ascontiguousarray(AXES_VERTICES[6:12], dtype=np.float32)
-        glEnableVertexAttribArray(self._attr_position)
-        glVertexAttribPointer(self._attr_position, 3, GL_FLOAT, False, 0, axes)
-        glDrawArrays(GL_LINES, 0, 2)
-        glDisableVertexAttribArray(self._attr_position)
-        
-        # Z axis - Blue
-        glUniform4f(self._uniform_color, 0.25, 0.5, 0.95, 1.0)
-        axes = np.ascontiguousarray(AXES_VERTICES[12:], dtype=np.float32)
-        glEnableVertexAttribArray(self._attr_position)
-        glVertexAttribPointer(self._attr_position, 3, GL_FLOAT, False, 0, axes)
-        glDrawArrays(GL_LINES, 0, 2)
-        glDisableVertexAttribArray(self._attr_position)
+        # Colors come per vertex: X red, Y green, Z blue
+        self._set_color(1.0, 1.0, 1.0, 1.0)
+        self._bind_geometry("axes")
+        glDrawArrays(GL_LINES, 0, len(_AXES_INTERLEAVED))
+        self._unbind_geometry("axes")
 
     def mousePressEvent(self, event):
         self._last_pos = event.position()
 
     def mouseMoveEvent(self, event):
-        if self._last_pos is None:
+        last = self._last_pos
+        if last is None:
             return
         pos = event.position()
-        dx = pos.x() - self._last_pos.x()
-        dy = pos.y() - self._last_pos.y()
-        if event.buttons() & Qt.MouseButton.LeftButton:
+        dx = pos.x() - last.x()
+        dy = pos.y() - last.y()
+        buttons = event.buttons()
+        before = self._camera()
+        if buttons & Qt.MouseButton.LeftButton:
             self._rot_y += dx * 0.5
-            self._rot_x += dy * 0.5
-            self._rot_x = max(-90, min(90, self._rot_x))
-        elif event.buttons() & Qt.MouseButton.RightButton:
+            self._rot_x = max(-90, min(90, self._rot_x + dy * 0.5))
+        elif buttons & Qt.MouseButton.RightButton:
             self._pan_x -= dx * 0.5
             self._pan_y += dy * 0.5
         self._last_pos = pos
-        self.update()
+        if self._camera() != before:
+            self._camera_dirty = True
+            if not self._repaint_timer.isActive():
+                self._repaint_timer.start()
 
     def mouseReleaseEvent(self, event):
         self._last_pos = None
 
     def wheelEvent(self, event):
         delta = event.angleDelta().y()
+        before = self._camera()
         if delta > 0:
             self._zoom *= 0.9
         else:
             self._zoom *= 1.1
         self._zoom = max(0.01, min(100.0, self._zoom))
-        self.update()
+        self._camera_moved(before)
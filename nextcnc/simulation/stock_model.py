@@ -14,6 +14,33 @@ from enum import Enum
 import numpy as np
 from numpy.typing import NDArray
 
+from nextcnc.core.parser import Segments
+
+
+def _aligned_full(shape: Tuple[int, ...], fill_value: float, dtype, align: int = 64) -> NDArray:
+    """
+    np.full() whose data starts on an align-byte boundary (NumPy only
+    guarantees 16), so whole cache lines / vector loads cover the rows.
+    """
+    dtype = np.dtype(dtype)
+    size = int(np.prod(shape))
+    raw = np.empty(size * dtype.itemsize + align, dtype=np.uint8)
+    offset = -raw.ctypes.data % align
+    array = raw[offset:offset + size * dtype.itemsize].view(dtype).reshape(shape)
+    array.fill(fill_value)
+    return array
+
+
+def _grow_box(box: Optional[List[int]], gx0: int, gx1: int, gy0: int, gy1: int) -> List[int]:
+    """Inclusive (gx0, gx1, gy0, gy1) box grown to cover the given cells (new if box is None)."""
+    if box is None:
+        return [gx0, gx1, gy0, gy1]
+    box[0] = min(box[0], gx0)
+    box[1] = max(box[1], gx1)
+    box[2] = min(box[2], gy0)
+    box[3] = max(box[3], gy1)
+    return box
+
 
 class ToolType(Enum):
     """Supported tool types."""
@@ -22,6 +49,18 @@ class ToolType(Enum):
     BULLNOSE = "bullnose"
 
 
+@dataclass
+class ToolStamp:
+    """
+    Grid cells a cutter footprint may cover, as offsets from the cell
+    under the tool center. Conservative: every cell that can lie within
+    the radius for a center anywhere in (or clamped to) that cell.
+    """
+    grid_radius: int
+    dx_idx: NDArray[np.int64]
+    dy_idx: NDArray[np.int64]
+
+
 @dataclass
 class Tool:
     """CNC Tool definition."""
@@ -31,11 +70,29 @@ class Tool:
     diameter: float  # mm
     length: float    # mm
     corner_radius: float = 0.0  # For bullnose
+    _stamps: dict = field(default_factory=dict, init=False, repr=False, compare=False)
     
     @property
     def radius(self) -> float:
         """Tool radius."""
         return self.diameter / 2.0
+    
+    def get_stamp(self, resolution: float) -> ToolStamp:
+        """Footprint stamp of this tool on a grid of the given resolution (cached)."""
+        radius = self.radius
+        key = (resolution, radius)
+        stamp = self._stamps.get(key)
+        if stamp is None:
+            grid_radius = int(radius / resolution) + 1
+            offsets = np.arange(-grid_radius, grid_radius + 1)
+            # The center sits within one cell of the offset-0 node, so a cell
+            # can only be reached if its node is within radius + 1 cell per axis
+            gap = np.maximum(np.abs(offsets) - 1, 0) * resolution
+            reach = radius * (1.0 + 1e-9) + 1e-9
+            dx_idx, dy_idx = np.nonzero(gap[:, None] ** 2 + gap[None, :] ** 2 <= reach * reach)
+            stamp = ToolStamp(grid_radius, dx_idx - grid_radius, dy_idx - grid_radius)
+            self._stamps[key] = stamp
+        return stamp
 
 
 @dataclass
@@ -75,7 +132,7 @@ class StockConfig:
     def estimate_performance(self) -> dict:
         """Estimate performance impact."""
         total_cells = self.nx * self.ny
-        estimated_memory_mb = (total_cells * 8) / (1024 * 1024)
+        estimated_memory_mb = (total_cells * 4) / (1024 * 1024)  # float32 cells
         status = "OK" if total_cells < 50_000 else "WARNING" if total_cells < 200_000 else "HEAVY"
         return {
             "total_xy_cells": total_cells,
@@ -114,44 +171,149 @@ class TriDexelBoard:
     Uses 3 orthogonal Z-buffers for better accuracy.
     """
     
+    # Unit offsets of the 8 is_air_cut() samples, 45 degrees apart
+    _AIR_CUT_ANGLES = np.array([0, np.pi/4, np.pi/2, 3*np.pi/4, np.pi, 5*np.pi/4, 3*np.pi/2, 7*np.pi/4])
+    _AIR_COS = np.cos(_AIR_CUT_ANGLES)
+    _AIR_SIN = np.sin(_AIR_CUT_ANGLES)
+    # Side, in board cells, of the square tiles get_stock_mesh() refreshes
+    _MESH_TILE = 32
+    
     def __init__(self, config: StockConfig):
         self.config = config
+        # Grid sizes, fixed by the board shapes (StockConfig recomputes them
+        # on every access)
+        self._nx, self._ny, self._nz = config.nx, config.ny, config.nz
         
         # XY-board: Z height at each (x, y)
-        # Stores top Z value
-        self.xy_board: NDArray[np.float64] = np.full(
+        # Stores top Z value; float32 is far finer than any machining
+        # tolerance and halves the memory the cutter sweeps through
+        # (C order, 64-byte aligned)
+        self.xy_board: NDArray[np.float32] = _aligned_full(
             (config.nx, config.ny), 
             config.origin_z + config.height,
-            dtype=np.float64
-        )
-        
-        # XZ-board: Y depth at each (x, z) - for side visibility
-        self.xz_board: NDArray[np.float64] = np.full(
-            (config.nx, config.nz),
-            config.origin_y + config.depth,
-            dtype=np.float64
+            dtype=np.float32
         )
         
-        # YZ-board: X depth at each (y, z)
-        self.yz_board: NDArray[np.float64] = np.full(
-            (config.ny, config.nz),
-            config.origin_x + config.width,
-            dtype=np.float64
-        )
+        # Side boards (see xz_board / yz_board), allocated on first access
+        self._xz_board: Optional[NDArray[np.float32]] = None
+        self._yz_board: Optional[NDArray[np.float32]] = None
         
         # Material removal tracking
         self.total_removed_volume: float = 0.0
-        self.cut_points: List[Tuple[float, float, float]] = []
+        # Tool positions of cutting apply_cutter() calls: the first
+        # _cut_count rows of a buffer that grows by doubling
+        self._cut_buffer: NDArray[np.float64] = np.empty((1024, 3), dtype=np.float64)
+        self._cut_count: int = 0
+        
+        # xy_board cells changed since the last take_dirty_ranges(), as an
+        # inclusive (gx0, gx1, gy0, gy1) box; everything is dirty until the
+        # first call
+        self._dirty_box: Optional[List[int]] = None
+        self._all_dirty: bool = True
+        # Every xy_board cell cut since creation / the last reset(), as the
+        # same kind of box; reset() restores only these cells
+        self._cut_box: Optional[List[int]] = None
+        
+        # Upper bound of xy_board: exact after a refresh, then only lowered
+        # by cuts, so still safe for rejecting positions above all material
+        self._max_height: float = float(self.xy_board.max()) if self.xy_board.size else config.origin_z
+        self._cuts_since_max: int = 0
+        
+        # World x / y of every grid column and row, as grid_to_world() gives
+        self._cell_x: NDArray[np.float64] = config.origin_x + np.arange(self._nx) * config.resolution
+        self._cell_y: NDArray[np.float64] = config.origin_y + np.arange(self._ny) * config.resolution
+        
+        # get_stock_mesh() result, built on the first call: (rows, cols, 4, 3)
+        # vertices, indices and the mesh cells' corner grid indices. Later
+        # calls only refresh the heights of the _MESH_TILE tiles, as
+        # (gx // _MESH_TILE, gy // _MESH_TILE), changed in between.
+        self._mesh_vertices: Optional[NDArray[np.float64]] = None
+        self._mesh_indices: Optional[NDArray[np.int32]] = None
+        self._mesh_corners: Optional[tuple] = None
+        self._mesh_dirty_tiles: set = set()
+    
+    @property
+    def xz_board(self) -> NDArray[np.float32]:
+        """XZ-board: Y depth at each (x, z) - for side visibility."""
+        if self._xz_board is None:
+            self._xz_board = np.full(
+                (self._nx, self._nz),
+                self.config.origin_y + self.config.depth,
+                dtype=np.float32
+            )
+        return self._xz_board
+    
+    @property
+    def yz_board(self) -> NDArray[np.float32]:
+        """YZ-board: X depth at each (y, z)."""
+        if self._yz_board is None:
+            self._yz_board = np.full(
+                (self._ny, self._nz),
+                self.config.origin_x + self.config.width,
+                dtype=np.float32
+            )
+        return self._yz_board
+    
+    @property
+    def cut_points(self) -> NDArray[np.float64]:
+        """(N, 3) tool positions at which apply_cutter() removed material."""
+        return self._cut_buffer[:self._cut_count]
+    
+    def _add_cut_point(self, x: float, y: float, z: float) -> None:
+        if self._cut_count == len(self._cut_buffer):
+            grown = np.empty((2 * len(self._cut_buffer), 3), dtype=np.float64)
+            grown[:self._cut_count] = self._cut_buffer
+            self._cut_buffer = grown
+        self._cut_buffer[self._cut_count] = (x, y, z)
+        self._cut_count += 1
+    
+    def _mark_dirty(self, gx0: int, gx1: int, gy0: int, gy1: int) -> None:
+        """Grow the dirty and cut boxes to cover xy_board cells [gx0..gx1] x [gy0..gy1]."""
+        self._dirty_box = _grow_box(self._dirty_box, gx0, gx1, gy0, gy1)
+        self._cut_box = _grow_box(self._cut_box, gx0, gx1, gy0, gy1)
+        
+        # Mesh tiles to refresh, once there is a mesh to refresh
+        if self._mesh_vertices is not None:
+            tile = self._MESH_TILE
+            self._mesh_dirty_tiles.update(
+                (tx, ty)
+                for tx in range(gx0 // tile, gx1 // tile + 1)
+                for ty in range(gy0 // tile, gy1 // tile + 1)
+            )
+    
+    def reset(self) -> None:
+        """
+        Restore the uncut stock in place. Only the cut cells are rewritten
+        and marked dirty, and the mesh layout is kept, so the next
+        take_dirty_ranges() covers just the cut area instead of asking
+        for a full re-upload.
+        """
+        cfg = self.config
+        top = self.xy_board.dtype.type(cfg.origin_z + cfg.height)
+        box = self._cut_box
+        if box is not None:
+            gx0, gx1, gy0, gy1 = box
+            self.xy_board[gx0:gx1 + 1, gy0:gy1 + 1] = top
+            self._mark_dirty(gx0, gx1, gy0, gy1)
+        self._cut_box = None
+        self._xz_board = None
+        self._yz_board = None
+        self.total_removed_volume = 0.0
+        self._cut_count = 0
+        self._max_height = float(top) if self.xy_board.size else cfg.origin_z
+        self._cuts_since_max = 0
     
     def world_to_grid(self, x: float, y: float, z: float) -> Tuple[int, int, int]:
         """Convert world coordinates to grid indices."""
-        gx = int((x - self.config.origin_x) / self.config.resolution)
-        gy = int((y - self.config.origin_y) / self.config.resolution)
-        gz = int((z - self.config.origin_z) / self.config.resolution)
+        cfg = self.config
+        res = cfg.resolution
+        gx = int((x - cfg.origin_x) / res)
+        gy = int((y - cfg.origin_y) / res)
+        gz = int((z - cfg.origin_z) / res)
         return (
-            np.clip(gx, 0, self.config.nx - 1),
-            np.clip(gy, 0, self.config.ny - 1),
-            np.clip(gz, 0, self.config.nz - 1),
+            min(max(gx, 0), self._nx - 1),
+            min(max(gy, 0), self._ny - 1),
+            min(max(gz, 0), self._nz - 1),
         )
     
     def grid_to_world(self, gx: int, gy: int, gz: int) -> Tuple[float, float, float]:
@@ -174,11 +336,14 @@ class TriDexelBoard:
         """
         gx, gy, _ = self.world_to_grid(x, y, 0)
         
+        # Compare at board precision so a no-op store counts as no removal
+        new_z = self.xy_board.dtype.type(new_z)
         old_z = self.xy_board[gx, gy]
         if new_z < old_z:
-            removed = old_z - new_z
+            removed = float(old_z - new_z)
             self.xy_board[gx, gy] = new_z
             self.total_removed_volume += removed * self.config.resolution ** 2
+            self._mark_dirty(gx, gx, gy, gy)
             return removed
         return 0.0
     
@@ -189,134 +354,255 @@ class TriDexelBoard:
         
         Returns: Volume of material removed
         """
-        if z >= self.config.origin_z + self.config.height:
+        # Hot path: bind attributes and config fields once
+        cfg = self.config
+        board = self.xy_board
+        if z >= cfg.origin_z + cfg.height:
             return 0.0  # Tool above stock
         
         radius = tool.radius
         z_cut = z - tool.length  # Tool tip Z
         
-        # Grid range for tool
-        gx, gy, _ = self.world_to_grid(x, y, 0)
-        grid_radius = int(radius / self.config.resolution) + 1
-        
-        total_removed = 0.0
-        
-        # Iterate over grid cells within tool radius
-        # Use squared distance to avoid sqrt calculation
+        # Every effective height is >= the tip, so nothing is cut if the tip
+        # is at or above all material (board-wide, then under the tool)
+        z_tip = board.dtype.type(z_cut)
+        if z_tip >= self._max_height:
+            return 0.0
+        
+        # Grid cells the tool can reach around its center cell
+        # (world_to_grid inlined)
+        res = cfg.resolution
+        nx, ny = self._nx, self._ny
+        gx = min(max(int((x - cfg.origin_x) / res), 0), nx - 1)
+        gy = min(max(int((y - cfg.origin_y) / res), 0), ny - 1)
+        stamp = tool.get_stamp(res)
+        grid_radius = stamp.grid_radius
+        window = board[
+            max(gx - grid_radius, 0):gx + grid_radius + 1,
+            max(gy - grid_radius, 0):gy + grid_radius + 1,
+        ]
+        if z_tip >= window.max():
+            return 0.0
+        cx = gx + stamp.dx_idx
+        cy = gy + stamp.dy_idx
+        if gx < grid_radius or gy < grid_radius or gx + grid_radius >= nx or gy + grid_radius >= ny:
+            inside = (cx >= 0) & (cx < nx) & (cy >= 0) & (cy < ny)
+            cx, cy = cx[inside], cy[inside]
+        
+        # Squared distance from the tool axis for every stamp cell
         radius_sq = radius * radius
+        dist_sq = np.take(self._cell_x, cx) - x
+        dist_sq *= dist_sq
+        dy_sq = np.take(self._cell_y, cy) - y
+        dy_sq *= dy_sq
+        dist_sq += dy_sq
+        
+        # One specialized kernel per call; bullnose is cut like a flat endmill
+        cells = cx * ny + cy
+        if tool.tool_type == ToolType.BALL_ENDMILL:
+            total_removed = self._cut_ball(cells, dist_sq, radius_sq, z_cut)
+        else:
+            total_removed = self._cut_flat(cells, dist_sq, radius_sq, z_tip)
         
-        for dx in range(-grid_radius, grid_radius + 1):
-            for dy in range(-grid_radius, grid_radius + 1):
-                cx, cy = gx + dx, gy + dy
-                
-                # Check bounds
-                if cx < 0 or cx >= self.config.nx or cy < 0 or cy >= self.config.ny:
-                    continue
-                
-                # Calculate world distance from tool center (squared)
-                wx, wy, _ = self.grid_to_world(cx, cy, 0)
-                dist_sq = (wx - x) ** 2 + (wy - y) ** 2
-                
-                if dist_sq <= radius_sq:
-                    # Remove material at this column
-                    if tool.tool_type == ToolType.BALL_ENDMILL:
-                        # Ball endmill: tool tip is spherical
-                        dist = np.sqrt(dist_sq)
-                        h_adjust = np.sqrt(max(0, radius_sq - dist_sq))
-                        effective_z = z_cut + h_adjust
-                    else:
-                        # Flat endmill: constant height
-                        effective_z = z_cut
-                    
-                    old_z = self.xy_board[cx, cy]
-                    if effective_z < old_z:
-                        self.xy_board[cx, cy] = max(effective_z, self.config.origin_z)
-                        removed = old_z - self.xy_board[cx, cy]
-                        total_removed += removed
-        
-        removed_volume = total_removed * self.config.resolution ** 2
+        removed_volume = total_removed * res ** 2
         self.total_removed_volume += removed_volume
         
         if total_removed > 0:
-            self.cut_points.append((x, y, z))
+            self._add_cut_point(x, y, z)
+            self._cuts_since_max += 1
+            if self._cuts_since_max >= 256:
+                self._max_height = float(board.max())
+                self._cuts_since_max = 0
+            self._mark_dirty(
+                max(gx - grid_radius, 0), min(gx + grid_radius, nx - 1),
+                max(gy - grid_radius, 0), min(gy + grid_radius, ny - 1),
+            )
         
         return removed_volume
     
+    # Cutter kernels: lower the flat-indexed board cells within the radius to
+    # the tool profile, but not below the stock bottom, and return the summed
+    # height removed. Heights are compared at board precision, so re-cutting
+    # a column to the depth it already has removes nothing. Stamp cells are
+    # distinct, so a plain scatter is the per-column min update.
+    
+    def _cut_flat(self, cells: NDArray[np.int64], dist_sq: NDArray[np.float64],
+                  radius_sq: float, z_tip: np.floating) -> float:
+        """Flat endmill: one constant height under the whole footprint."""
+        board = self.xy_board.reshape(-1)
+        old_z = board[cells]
+        cut = (dist_sq <= radius_sq) & (z_tip < old_z)
+        new_z = max(z_tip, board.dtype.type(self.config.origin_z))
+        old_z = old_z[cut]
+        board[cells[cut]] = new_z
+        return float(np.sum(old_z - new_z, dtype=np.float64))
+    
+    def _cut_ball(self, cells: NDArray[np.int64], dist_sq: NDArray[np.float64],
+                  radius_sq: float, z_cut: float) -> float:
+        """Ball endmill: spherical tip, profile evaluated only inside the radius."""
+        board = self.xy_board.reshape(-1)
+        inside = dist_sq <= radius_sq
+        cells = cells[inside]
+        effective_z = (z_cut + np.sqrt(radius_sq - dist_sq[inside])).astype(board.dtype)
+        old_z = board[cells]
+        cut = effective_z < old_z
+        old_z = old_z[cut]
+        new_z = np.maximum(effective_z[cut], board.dtype.type(self.config.origin_z))
+        board[cells[cut]] = new_z
+        return float(np.sum(old_z - new_z, dtype=np.float64))
+    
+    def is_above_material(self, z: float) -> bool:
+        """True if height z is above every column of the board (cheap bound check)."""
+        return self.xy_board.dtype.type(z) > self._max_height
+    
     def is_air_cut(self, x: float, y: float, z: float, tool: Tool) -> bool:
         """
         Check if tool at position would be air cutting.
         Returns True if tool is not touching material.
         """
-        z_cut = z - tool.length
-        
-        # Sample a few points within tool radius
-        radius = tool.radius
-        angles = [0, np.pi/4, np.pi/2, 3*np.pi/4, np.pi, 5*np.pi/4, 3*np.pi/2, 7*np.pi/4]
-        
-        for angle in angles:
-            sx = x + radius * 0.5 * np.cos(angle)
-            sy = y + radius * 0.5 * np.sin(angle)
-            height = self.get_height_at(sx, sy)
-            
-            if z_cut <= height:
-                return False  # Tool is cutting material
-        
-        return True  # Air cut
+        return bool(self.air_cut_mask(np.array([[x, y, z]]), tool)[0])
+    
+    def air_cut_mask(self, positions: NDArray[np.float64], tool: Tool) -> NDArray[np.bool_]:
+        """is_air_cut() for each row of an (N, 3) array of tool positions."""
+        # At board precision, like apply_cutter
+        board = self.xy_board
+        z_cut = (positions[:, 2:3] - tool.length).astype(board.dtype)
+        if len(z_cut) == 0 or self.is_above_material(z_cut.min()):
+            return np.ones(len(z_cut), dtype=bool)
+        
+        # Sample 8 points at half the tool radius, all in one lookup
+        cfg = self.config
+        res = cfg.resolution
+        half_radius = tool.radius * 0.5
+        gx = ((positions[:, 0:1] + half_radius * self._AIR_COS - cfg.origin_x) / res).astype(np.int64)
+        gy = ((positions[:, 1:2] + half_radius * self._AIR_SIN - cfg.origin_y) / res).astype(np.int64)
+        heights = board[np.clip(gx, 0, self._nx - 1), np.clip(gy, 0, self._ny - 1)]
+        
+        # Air cut unless the tip reaches material at any sample
+        return ~np.any(z_cut <= heights, axis=1)
+    
+    def _mesh_step(self) -> int:
+        """LOD step of get_stock_mesh() - larger grids = bigger steps."""
+        total_cells = (self._nx - 1) * (self._ny - 1)
+        if total_cells > 100_000:
+            return 4
+        elif total_cells > 25_000:
+            return 2
+        return 1
+    
+    def take_dirty_ranges(self) -> Optional[List[Tuple[int, int]]]:
+        """
+        Vertex ranges of get_stock_mesh() that may have changed since the
+        previous call, as (offset, count) pairs in vertices; [] if nothing
+        changed, None if the whole mesh must be treated as new.
+        Resets the tracking.
+        """
+        box, all_dirty = self._dirty_box, self._all_dirty
+        self._dirty_box = None
+        self._all_dirty = False
+        if all_dirty:
+            return None
+        if box is None:
+            return []
+        
+        # Mesh cell (col, row) samples board cells col*step and col*step + step
+        # (clamped), so a changed board cell touches at most two columns/rows
+        step = self._mesh_step()
+        ncols = len(range(0, self._nx - 1, step))
+        nrows = len(range(0, self._ny - 1, step))
+        if ncols == 0 or nrows == 0:
+            return []
+        gx0, gx1, gy0, gy1 = box
+        c0 = max(gx0 // step - 1, 0)
+        c1 = min(gx1 // step, ncols - 1)
+        r0 = max(gy0 // step - 1, 0)
+        r1 = min(gy1 // step, nrows - 1)
+        if c0 > c1 or r0 > r1:
+            return []
+        # 4 vertices per mesh cell, rows of ncols cells
+        count = (c1 - c0 + 1) * 4
+        return [((row * ncols + c0) * 4, count) for row in range(r0, r1 + 1)]
     
     def get_stock_mesh(self) -> Tuple[NDArray[np.float64], NDArray[np.int32]]:
         """
         Generate optimized mesh for rendering.
         Uses LOD (Level of Detail) based on grid size.
         Returns (vertices, indices) for triangle mesh.
+        
+        The arrays are kept by the board and updated in place by later
+        calls; copy them to hold on to this state.
         """
-        # Use step size for LOD - larger grids = bigger steps
-        total_cells = (self.config.nx - 1) * (self.config.ny - 1)
-        if total_cells > 100_000:
-            step = 4
-        elif total_cells > 25_000:
-            step = 2
-        else:
-            step = 1
-        
-        vertices = []
-        indices = []
-        
-        # Generate vertices with step size
-        for gy in range(0, self.config.ny - 1, step):
-            for gx in range(0, self.config.nx - 1, step):
-                # Get heights at corners (use current cell)
-                z00 = self.xy_board[gx, gy]
-                
-                # Next cells (clamp to bounds)
-                gx_next = min(gx + step, self.config.nx - 1)
-                gy_next = min(gy + step, self.config.ny - 1)
-                
-                z10 = self.xy_board[gx_next, gy]
-                z01 = self.xy_board[gx, gy_next]
-                z11 = self.xy_board[gx_next, gy_next]
-                
-                # World positions
-                x0, y0, _ = self.grid_to_world(gx, gy, 0)
-                x1, y1, _ = self.grid_to_world(gx_next, gy_next, 0)
-                
-                # Create two triangles per cell
-                base_idx = len(vertices)
-                
-                # Vertices (x, y, z)
-                vertices.extend([
-                    [x0, y0, z00],
-                    [x1, y0, z10],
-                    [x1, y1, z11],
-                    [x0, y1, z01],
-                ])
-                
-                # Triangle indices
-                indices.extend([
-                    [base_idx, base_idx + 1, base_idx + 2],
-                    [base_idx, base_idx + 2, base_idx + 3],
-                ])
-        
-        return np.array(vertices, dtype=np.float64), np.array(indices, dtype=np.int32)
+        if self._mesh_vertices is None:
+            self._build_stock_mesh()
+        elif self._mesh_dirty_tiles:
+            self._refresh_stock_mesh()
+        return self._mesh_vertices.reshape(-1, 3), self._mesh_indices
+    
+    def _build_stock_mesh(self) -> None:
+        """Build the full get_stock_mesh() arrays."""
+        step = self._mesh_step()
+        cfg = self.config
+        nx, ny, res = self._nx, self._ny, cfg.resolution
+        
+        # Corner grid indices of every mesh cell; the far corner is clamped
+        gx = np.arange(0, nx - 1, step)
+        gy = np.arange(0, ny - 1, step)
+        gx_next = np.minimum(gx + step, nx - 1)
+        gy_next = np.minimum(gy + step, ny - 1)
+        x0 = cfg.origin_x + gx * res
+        x1 = cfg.origin_x + gx_next * res
+        y0 = cfg.origin_y + gy * res
+        y1 = cfg.origin_y + gy_next * res
+        
+        # 4 vertices per cell, cells in rows of constant gy:
+        # (x0, y0, z00), (x1, y0, z10), (x1, y1, z11), (x0, y1, z01)
+        vertices = np.empty((len(gy), len(gx), 4, 3), dtype=np.float64)
+        for corner, (xs, ys) in enumerate(((x0, y0), (x1, y0), (x1, y1), (x0, y1))):
+            vertices[:, :, corner, 0] = xs[None, :]
+            vertices[:, :, corner, 1] = ys[:, None]
+        
+        # Two triangles per cell
+        base = 4 * np.arange(len(gx) * len(gy), dtype=np.int32)
+        indices = base[:, None, None] + np.array([[0, 1, 2], [0, 2, 3]], dtype=np.int32)
+        
+        self._mesh_vertices = vertices
+        self._mesh_indices = indices.reshape(-1, 3)
+        self._mesh_corners = (gx, gx_next, gy, gy_next)
+        self._mesh_dirty_tiles.clear()
+        self._fill_mesh_heights(0, len(gx), 0, len(gy))
+    
+    def _fill_mesh_heights(self, c0: int, c1: int, r0: int, r1: int) -> None:
+        """Copy board heights into mesh columns [c0, c1) of rows [r0, r1)."""
+        gx, gx_next, gy, gy_next = self._mesh_corners
+        board = self.xy_board
+        heights = self._mesh_vertices[r0:r1, c0:c1, :, 2]
+        for corner, (cx, cy) in enumerate((
+            (gx, gy), (gx_next, gy), (gx_next, gy_next), (gx, gy_next),
+        )):
+            heights[:, :, corner] = board[np.ix_(cx[c0:c1], cy[r0:r1])].T
+    
+    def _refresh_stock_mesh(self) -> None:
+        """Refresh the mesh heights over the dirty tiles."""
+        tiles = self._mesh_dirty_tiles
+        self._mesh_dirty_tiles = set()
+        rows, cols = self._mesh_vertices.shape[:2]
+        tile = self._MESH_TILE
+        # Past about a quarter of the board, one pass over all of it wins
+        if len(tiles) * tile * tile * 4 >= self._nx * self._ny:
+            self._fill_mesh_heights(0, cols, 0, rows)
+            return
+        
+        # As in take_dirty_ranges(), board cell g is a corner of mesh
+        # columns/rows g // step - 1 and g // step (clamped)
+        step = self._mesh_step()
+        for tx, ty in tiles:
+            gx0, gy0 = tx * tile, ty * tile
+            c0 = max(gx0 // step - 1, 0)
+            c1 = min((gx0 + tile - 1) // step, cols - 1)
+            r0 = max(gy0 // step - 1, 0)
+            r1 = min((gy0 + tile - 1) // step, rows - 1)
+            if c0 <= c1 and r0 <= r1:
+                self._fill_mesh_heights(c0, c1 + 1, r0, r1 + 1)
     
     def get_stats(self) -> dict:
         """Get simulation statistics."""
@@ -355,8 +641,8 @@ class StockSimulator:
         self.current_tool = tool
     
     def reset(self) -> None:
-        """Reset stock to initial state."""
-        self.board = TriDexelBoard(self.config)
+        """Reset stock to initial state (the board is restored in place)."""
+        self.board.reset()
         self.air_cut_segments = []
         self.cut_segments = []
     
@@ -372,6 +658,10 @@ class StockSimulator:
         Returns:
             Simulation stats for this move
         """
+        return self._simulate_move(start, end, feed, owned=False)
+    
+    def _simulate_move(self, start: NDArray, end: NDArray, feed: float, owned: bool) -> dict:
+        """simulate_move(); owned=True records start/end as given instead of copies."""
         if self.current_tool is None:
             return {"error": "No tool set"}
         
@@ -387,28 +677,38 @@ class StockSimulator:
         total_removed = 0.0
         was_air_cut = True
         
-        for i in range(steps + 1):
-            t = i / steps
-            pos = start + t * (end - start)
-            
-            # Check air cut
-            if self.board.is_air_cut(pos[0], pos[1], pos[2], self.current_tool):
-                if not was_air_cut:
-                    # Transition to air cut
-                    pass
-            else:
-                was_air_cut = False
-                # Remove material
-                removed = self.board.apply_cutter(
-                    pos[0], pos[1], pos[2], self.current_tool
-                )
-                total_removed += removed
+        # The tip is lowest at an end of the move (the margin covers the
+        # interpolation rounding); above all material the whole move is an
+        # air cut, as for rapids over the stock
+        lowest_tip = min(float(start[2]), float(end[2])) - self.current_tool.length
+        if self.board.is_above_material(lowest_tip - 1e-6):
+            positions = np.empty((0, 3))
+        else:
+            # All sample positions of the move at once
+            t = np.arange(steps + 1) / steps
+            positions = start + t[:, None] * (end - start)
+        
+        # Cutting only lowers the board, so a step that is an air cut
+        # before the move stays one; the others are checked again only
+        # once an earlier step of this move has removed material
+        candidates = np.flatnonzero(~self.board.air_cut_mask(positions, self.current_tool))
+        board_changed = False
+        for x, y, z in positions[candidates].tolist():
+            if board_changed and self.board.is_air_cut(x, y, z, self.current_tool):
+                continue
+            was_air_cut = False
+            # Remove material
+            removed = self.board.apply_cutter(x, y, z, self.current_tool)
+            total_removed += removed
+            board_changed = board_changed or removed > 0
         
         # Track segment type
+        if not owned:
+            start, end = start.copy(), end.copy()
         if was_air_cut:
-            self.air_cut_segments.append((start.copy(), end.copy()))
+            self.air_cut_segments.append((start, end))
         else:
-            self.cut_segments.append((start.copy(), end.copy()))
+            self.cut_segments.append((start, end))
         
         return {
             "removed_volume": total_removed,
@@ -418,35 +718,54 @@ class StockSimulator:
     
     def simulate_toolpath(
         self, 
-        segments: list,
+        segments: Segments | list,
         tool: Tool,
-        on_progress: Optional[callable] = None
+        on_progress: Optional[callable] = None,
+        should_stop: Optional[callable] = None,
     ) -> dict:
         """
         Simulate complete toolpath.
         
         Args:
-            segments: List of toolpath segments from parser
+            segments: Segments from the parser (read column-wise, no
+                per-segment dicts) or a list of segment dicts
             tool: Tool to use
-            on_progress: Callback(progress_pct)
+            on_progress: Callback(progress_pct), called once per whole
+                percent reached (at most ~100 times, whatever the segment count)
+            should_stop: Callback() -> bool, checked at the same whole-percent
+                points; True stops the simulation there
         
         Returns:
-            Final simulation stats
+            Final simulation stats (of the moves simulated, if stopped early)
         """
         self.reset()
         self.set_tool(tool)
         
         total_segments = len(segments)
         
-        for i, seg in enumerate(segments):
-            start = np.array(seg["start"])
-            end = np.array(seg["end"])
-            feed = seg.get("feedrate", 0)
-            
-            self.simulate_move(start, end, feed)
+        # Pack the moves once into private (N, 3) arrays; their rows are
+        # views the segment lists can keep without a copy per move
+        if isinstance(segments, Segments):
+            starts = np.array(segments.starts, dtype=np.float64)
+            ends = np.array(segments.ends, dtype=np.float64)
+            # Missing feed (NaN) -> 0
+            feeds = np.nan_to_num(segments.feedrates, nan=0.0).tolist()
+        else:
+            starts = np.array([seg["start"] for seg in segments], dtype=np.float64).reshape(-1, 3)
+            ends = np.array([seg["end"] for seg in segments], dtype=np.float64).reshape(-1, 3)
+            feeds = [seg.get("feedrate", 0) for seg in segments]
+        
+        last_pct = -1
+        for i, (start, end, feed) in enumerate(zip(starts, ends, feeds)):
+            self._simulate_move(start, end, feed, owned=True)
             
-            if on_progress:
-                on_progress((i + 1) / total_segments * 100)
+            pct = (i + 1) / total_segments * 100
+            if int(pct) != last_pct:
+                last_pct = int(pct)
+                if on_progress:
+                    on_progress(pct)
+                if should_stop is not None and should_stop():
+                    break
         
         return self.get_stats()
     
@@ -457,6 +776,14 @@ class StockSimulator:
         stats["cut_segments"] = len(self.cut_segments)
         return stats
     
-    def get_mesh_for_render(self) -> Optional[Tuple[NDArray, NDArray]]:
-        """Get mesh data for OpenGL rendering."""
-        return self.board.get_stock_mesh()
+    def get_mesh_for_render(self, with_dirty_ranges: bool = False) -> Optional[tuple]:
+        """
+        Get mesh data for OpenGL rendering: (vertices, indices), or with
+        with_dirty_ranges=True (vertices, indices, dirty_ranges) where
+        dirty_ranges is TriDexelBoard.take_dirty_ranges() - the vertex
+        ranges changed since the previous such call (None = all).
+        """
+        vertices, indices = self.board.get_stock_mesh()
+        if with_dirty_ranges:
+            return vertices, indices, self.board.take_dirty_ranges()
+        return vertices, indices
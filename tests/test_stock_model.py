@@ -0,0 +1,72 @@
+"""
+Tests for the stock model's incremental (dirty-range) mesh updates.
+"""
+
+import numpy as np
+
+from nextcnc.simulation.stock_model import StockConfig, StockSimulator, Tool, ToolType
+
+
+def _setup() -> tuple[StockSimulator, Tool, list]:
+    sim = StockSimulator(StockConfig(width=100.0, depth=100.0, height=20.0,
+                                     origin_x=0.0, origin_y=0.0, origin_z=0.0,
+                                     resolution=1.0))
+    tool = Tool(tool_id=1, name="D6 Flat", tool_type=ToolType.FLAT_ENDMILL,
+                diameter=6.0, length=0.0)
+    # One short slot in a corner of the stock
+    segments = [{"start": (10.0, 10.0, 15.0), "end": (30.0, 10.0, 15.0), "feedrate": 500.0}]
+    return sim, tool, segments
+
+
+def _apply_ranges(uploaded: np.ndarray, vertices: np.ndarray, ranges: list) -> int:
+    """Copy the dirty ranges into uploaded, as the renderer's glBufferSubData does."""
+    copied = 0
+    for offset, count in ranges:
+        uploaded[offset:offset + count] = vertices[offset:offset + count]
+        copied += count
+    return copied
+
+
+def test_first_mesh_is_a_full_upload():
+    sim, tool, segments = _setup()
+    sim.simulate_toolpath(segments, tool)
+    _, _, ranges = sim.get_mesh_for_render(with_dirty_ranges=True)
+    assert ranges is None
+
+
+def test_rerun_uploads_only_the_cut_area():
+    sim, tool, segments = _setup()
+    sim.simulate_toolpath(segments, tool)
+    vertices, indices, _ = sim.get_mesh_for_render(with_dirty_ranges=True)
+    uploaded = vertices.copy()
+    n_indices = len(indices)
+
+    # Same stock again, as the GUI does when the simulation is rerun
+    sim.simulate_toolpath(segments, tool)
+    vertices, indices, ranges = sim.get_mesh_for_render(with_dirty_ranges=True)
+    assert ranges is not None and ranges
+    assert len(indices) == n_indices
+    copied = _apply_ranges(uploaded, vertices, ranges)
+    assert 0 < copied < len(vertices) // 4
+    np.testing.assert_array_equal(uploaded, vertices)
+
+
+def test_reset_then_rerun_matches_a_fresh_simulation():
+    sim, tool, segments = _setup()
+    first = sim.simulate_toolpath(segments, tool)
+    vertices, _, _ = sim.get_mesh_for_render(with_dirty_ranges=True)
+    uploaded = vertices.copy()
+
+    sim.reset()
+    vertices, _, ranges = sim.get_mesh_for_render(with_dirty_ranges=True)
+    _apply_ranges(uploaded, vertices, ranges)
+    top = sim.config.origin_z + sim.config.height
+    assert np.all(uploaded[:, 2] == top)
+    assert sim.get_stats()["removed_volume_mm3"] == 0.0
+
+    second = sim.simulate_toolpath(segments, tool)
+    fresh, fresh_tool, _ = _setup()
+    expected = fresh.simulate_toolpath(segments, fresh_tool)
+    assert second["removed_volume_mm3"] == first["removed_volume_mm3"]
+    assert second == expected
+    np.testing.assert_array_equal(sim.board.xy_board, fresh.board.xy_board)